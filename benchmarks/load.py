@@ -0,0 +1,274 @@
+"""Concurrent-session load test of the gallery pages, fully in-process.
+
+Each simulated session is a Streamlit ``AppTest`` on its own thread: it opens
+a page, then scrubs its sliders, nudging one a few steps at a time and
+waiting an exponentially distributed think-time between reruns. For every
+page and concurrency level, the report gives:
+
+* rerun latency percentiles (p50/p95/p99, with p95 relative to the lowest
+  level)
+* throughput and the CPU time per rerun
+* peak resident memory
+
+It also writes JSON results for comparing concurrency curves across changes::
+
+    python -m benchmarks.load                                   # snowflake, lorenz, rossler at 1, 2, 4 sessions
+    python -m benchmarks.load --pages lorenz --sessions 1 4 16 --scrubs 10 --think 0.5
+    python -m benchmarks.load --think 0 --out /tmp/saturated.json   # no think-time: saturation
+
+Sessions share one runtime, so they share the in-process caches like a real
+server process would, and the on-disk array cache too. Pass ``--cache`` an
+empty directory to measure cold starts. Latency includes AppTest's own parse
+of each run's output, a few milliseconds. The pages' trace log is off unless
+``MATHSVIS_TRACE_LOG`` is set.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINES = ROOT / "benchmarks" / "baselines"
+
+PAGES = ("snowflake", "lorenz", "rossler")
+SESSIONS = (1, 2, 4)
+SCRUBS = 5          # slider moves per session, after opening the page
+THINK_S = 1.0       # mean think-time between reruns
+MAX_STEPS = 3       # a scrub moves a slider by up to this many steps
+TIMEOUT_S = 120.0   # per rerun
+SAMPLE_S = 0.05     # RSS sampling interval
+
+
+def rss_bytes():
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def cpu_seconds():
+    t = os.times()
+    return t.user + t.system
+
+
+class PeakRSS:
+    """Samples RSS on a background thread while in use; ``peak`` in bytes."""
+
+    def __init__(self, interval=SAMPLE_S):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __enter__(self):
+        self.peak = rss_bytes()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+@contextmanager
+def shared_runtime():
+    """One mock runtime for every session.
+
+    ``AppTest`` installs a fresh mock ``Runtime`` for each run and removes it
+    afterwards, so with several sessions running at once, one session's
+    teardown would pull the runtime out from under another's script. Here
+    every run sees the same runtime, including its ``st.cache_data`` storage.
+    """
+    from unittest.mock import MagicMock, patch
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    # Each run sets and restores this option; overlapping runs would restore it early.
+    saved = config.get_option("global.appTest")
+    config.set_option("global.appTest", True)
+    try:
+        with patch.object(Runtime, "instance", return_value=runtime), \
+                patch.object(Runtime, "exists", return_value=True):
+            yield runtime
+    finally:
+        config.set_option("global.appTest", saved)
+
+
+def _scrubbable(at):
+    """Sliders and select sliders a user could drag (single-valued, enabled)."""
+    widgets = [*at.slider, *at.select_slider]
+    return [w for w in widgets if not w.disabled and not isinstance(w.value, (tuple, list))]
+
+
+def _nudge(widget, rng):
+    """Move ``widget`` a few steps from its current value, as a short drag would."""
+    steps = rng.choice([-1, 1]) * rng.randint(1, MAX_STEPS)
+    if widget.type == "select_slider":  # move along the (formatted) options
+        options = list(widget.options)
+        i = options.index(str(widget.value))
+        j = min(max(i + steps, 0), len(options) - 1)
+        if j == i:
+            j = min(max(i - steps, 0), len(options) - 1)
+        widget.set_value(type(widget.value)(options[j]))
+        return
+    value = widget.value + steps * widget.step
+    if not widget.min <= value <= widget.max:
+        value = widget.value - steps * widget.step  # bounce off the end of the track
+    value = min(max(value, widget.min), widget.max)
+    widget.set_value(type(widget.value)(round(value, 10)))
+
+
+def _rerun(at, kind, samples, timeout):
+    t0 = time.perf_counter()
+    try:
+        at.run(timeout=timeout)
+        error = at.exception[0].value if len(at.exception) else None
+    except Exception as exc:  # e.g. a rerun exceeding the timeout
+        error = f"{type(exc).__name__}: {exc}"
+    samples.append({"kind": kind, "ms": (time.perf_counter() - t0) * 1000, "error": error})
+    return error is None
+
+
+def session(path, seed, scrubs, think_s, timeout, samples):
+    """One visitor: arrive, open the page, then scrub its sliders (or, on a
+    page without any, reload it)."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    # Arrivals spread over one think-time, so sessions do not move in lockstep.
+    time.sleep(rng.uniform(0, think_s))
+    at = AppTest.from_file(str(path), default_timeout=timeout)
+    if not _rerun(at, "open", samples, timeout):
+        return
+    for _ in range(scrubs):
+        if think_s:
+            time.sleep(min(rng.expovariate(1 / think_s), 5 * think_s))
+        widgets = _scrubbable(at)
+        if widgets:
+            _nudge(rng.choice(widgets), rng)
+            _rerun(at, "scrub", samples, timeout)
+        else:
+            at = AppTest.from_file(str(path), default_timeout=timeout)
+            _rerun(at, "open", samples, timeout)
+
+
+def _percentile(values, q):
+    import numpy as np
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+def run_level(path, sessions, scrubs, think_s, timeout, seed):
+    """``sessions`` concurrent visitors of one page; returns its result row."""
+    samples = []
+    threads = [threading.Thread(target=session, args=(path, seed + i, scrubs, think_s, timeout, samples),
+                                name=f"load-{path.stem}-{i}", daemon=True)
+               for i in range(sessions)]
+    rss0, cpu0, t0 = rss_bytes(), cpu_seconds(), time.perf_counter()
+    with PeakRSS() as rss:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    wall, cpu = time.perf_counter() - t0, cpu_seconds() - cpu0
+
+    ms = [s["ms"] for s in samples]
+    errors = [s["error"] for s in samples if s["error"]]
+    return {
+        "page": path.stem,
+        "sessions": sessions,
+        "reruns": len(samples),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50_ms": _percentile(ms, 50),
+        "p95_ms": _percentile(ms, 95),
+        "p99_ms": _percentile(ms, 99),
+        "open_p50_ms": _percentile([s["ms"] for s in samples if s["kind"] == "open"], 50),
+        "reruns_per_s": len(samples) / wall,
+        "cpu_ms_per_rerun": cpu * 1000 / max(len(samples), 1),
+        "cpu_cores": cpu / wall,
+        "rss_peak_mb": rss.peak / 2**20,
+        "rss_growth_mb": (rss.peak - rss0) / 2**20,
+        "wall_s": wall,
+    }
+
+
+def report(rows):
+    """Concurrency curves as a Markdown table, one block of rows per page."""
+    lines = ["| page | sessions | reruns | errors | p50 ms | p95 ms | p99 ms | p95 ×base | reruns/s "
+             "| CPU ms/rerun | cores | peak RSS MB |",
+             "|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|"]
+    base = {}
+    for r in rows:
+        base.setdefault(r["page"], r["p95_ms"])
+        lines.append(f"| {r['page']} | {r['sessions']} | {r['reruns']} | {r['errors']} | {r['p50_ms']:.0f} "
+                     f"| {r['p95_ms']:.0f} | {r['p99_ms']:.0f} | {r['p95_ms'] / base[r['page']]:.2f} "
+                     f"| {r['reruns_per_s']:.2f} | {r['cpu_ms_per_rerun']:.0f} | {r['cpu_cores']:.2f} "
+                     f"| {r['rss_peak_mb']:.0f} |")
+    errors = [f"{r['page']} ×{r['sessions']}: {r['first_error']}" for r in rows if r["first_error"]]
+    return "\n".join(lines + [f"\n⚠️ {e}" for e in errors])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    stems = sorted(p.stem for p in (ROOT / "pages").glob("*.py"))
+    parser.add_argument("--pages", nargs="*", default=list(PAGES), choices=stems)
+    parser.add_argument("--sessions", nargs="*", type=int, default=list(SESSIONS),
+                        help="concurrency levels to measure (default: 1 2 4)")
+    parser.add_argument("--scrubs", type=int, default=SCRUBS, help=f"slider moves per session (default {SCRUBS})")
+    parser.add_argument("--think", type=float, default=THINK_S,
+                        help=f"mean think-time between reruns in seconds (default {THINK_S})")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_S, help="per-rerun timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache", help="on-disk array cache directory (default: the app's)")
+    parser.add_argument("--out", type=Path, default=BASELINES / "load.json")
+    args = parser.parse_args(argv)
+
+    # Both are read when the pages first import utils.
+    os.environ.setdefault("MATHSVIS_TRACE_LOG", "")
+    if args.cache:
+        os.environ["MATHSVIS_ARRAY_CACHE"] = args.cache
+    os.chdir(ROOT)
+
+    rows = []
+    with shared_runtime():
+        for stem in args.pages:
+            for n in sorted(args.sessions):
+                row = run_level(ROOT / "pages" / f"{stem}.py", n, args.scrubs, args.think, args.timeout, args.seed)
+                rows.append(row)
+                print(f"  {stem:20s} ×{n:<3d} {row['reruns']:4d} reruns  p50 {row['p50_ms']:8.0f} ms  "
+                      f"p95 {row['p95_ms']:8.0f} ms  p99 {row['p99_ms']:8.0f} ms  "
+                      f"{row['cpu_cores']:5.2f} cores  {row['rss_peak_mb']:7.0f} MB", flush=True)
+
+    print()
+    print(report(rows))
+    from benchmarks.suite import environment
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps({"env": environment(), "config": {
+        k: v for k, v in vars(args).items() if k != "out"}, "results": rows}, indent=2))
+    print(f"\nsaved {len(rows)} results to {args.out}")
+    return 1 if any(r["errors"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(ROOT))
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Micro-benchmarks for the compute kernels and each page's Plotly figure.
+
+``run`` times every kernel on small / medium / large parameter sets
+(median wall time over a few repeats, plus peak traced memory from a
+separate run) and, for every page, the cost of building its ``go.Figure``
+and serialising it to JSON. ``compare`` flags regressions between two
+result files.
+
+    python -m benchmarks.suite run                          # -> benchmarks/baselines/latest.json
+    python -m benchmarks.suite run --kernels lorenz fern --sizes small --no-figures
+    python -m benchmarks.suite compare                      # reference.json vs latest.json
+    python -m benchmarks.suite compare old.json new.json --threshold 0.2
+
+``compare`` exits with status 1 if any metric regressed beyond the threshold.
+
+Everything runs offline; figures are captured with Streamlit's ``AppTest``.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINES = ROOT / "benchmarks" / "baselines"
+
+# kernel -> size -> parameter overrides on top of the kernel defaults
+CASES = {
+    "lorenz": {"small": dict(steps=2_000), "medium": dict(steps=10_000), "large": dict(steps=50_000)},
+    "rossler": {"small": dict(steps=5_000), "medium": dict(steps=30_000), "large": dict(steps=100_000)},
+    "fern": {"small": dict(n_points=10_000, seed=0), "medium": dict(n_points=50_000, seed=0),
+             "large": dict(n_points=200_000, seed=0)},
+    "snowflake": {"small": dict(n_particles=100, seed=0), "medium": dict(n_particles=300, seed=0),
+                  "large": dict(n_particles=1000, seed=0)},
+    "klein": {"small": dict(u_steps=50, v_steps=50), "medium": dict(u_steps=100, v_steps=100),
+              "large": dict(u_steps=200, v_steps=200)},
+    "surface": {"small": dict(resolution=20), "medium": dict(resolution=40), "large": dict(resolution=80)},
+    "trefoil": {"small": dict(u_steps=50, v_steps=50), "medium": dict(u_steps=100, v_steps=100),
+                "large": dict(u_steps=300, v_steps=300)},
+    "snowflake_surface": {"small": dict(u_steps=60, v_steps=60), "medium": dict(u_steps=120, v_steps=120),
+                          "large": dict(u_steps=400, v_steps=400)},
+}
+SIZES = ("small", "medium", "large")
+
+# Metrics compared by ``compare`` (lower is better for all of them)
+METRICS = ("wall_s", "peak_mb", "build_s", "json_s", "json_mb")
+
+# Stop repeating a case once this much time has been spent on it
+TIME_BUDGET_S = 2.0
+
+# Timing differences below this are treated as noise by ``compare``
+NOISE_FLOOR_S = 0.002
+
+
+def time_call(func, repeat=5):
+    """Median and min wall time of ``func()`` over up to ``repeat`` runs."""
+    times = []
+    t_start = time.perf_counter()
+    while len(times) < repeat:
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+        if time.perf_counter() - t_start > TIME_BUDGET_S:
+            break
+    return {"wall_s": statistics.median(times), "min_s": min(times), "runs": len(times)}
+
+
+def peak_memory_mb(func):
+    """Peak traced allocation of one ``func()`` call (NumPy buffers included)."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def bench_kernels(kernels, sizes, repeat):
+    from compute.kernels import KERNELS
+
+    results = {}
+    for name in kernels:
+        for size in sizes:
+            params = CASES[name][size]
+            call = lambda: KERNELS[name](**params)  # noqa: E731
+            res = time_call(call, repeat)
+            res["peak_mb"] = peak_memory_mb(call)
+            results[f"kernel/{name}/{size}"] = res
+            print(f"  {name:18s} {size:6s} {res['wall_s'] * 1000:10.2f} ms  {res['peak_mb']:8.2f} MB")
+    return results
+
+
+def bench_figures(pages, repeat):
+    import plotly.graph_objects as go
+    from utils.thumbnails import capture_figure
+
+    results = {}
+    for page in pages:
+        spec = capture_figure(page)
+        if spec is None:
+            continue
+        build = time_call(lambda: go.Figure(spec), repeat)
+        fig = go.Figure(spec)
+        ser = time_call(fig.to_json, repeat)
+        res = {"build_s": build["wall_s"], "json_s": ser["wall_s"], "json_mb": len(fig.to_json()) / 1e6}
+        results[f"figure/{page.stem}"] = res
+        print(f"  {page.stem:24s} build {res['build_s'] * 1000:8.2f} ms  "
+              f"json {res['json_s'] * 1000:8.2f} ms  {res['json_mb']:6.2f} MB")
+    return results
+
+
+def environment():
+    import numpy as np
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def compare(old, new, threshold, noise_floor=NOISE_FLOOR_S):
+    """Return rows of (case, metric, old, new, ratio, regressed) for shared metrics."""
+    rows = []
+    for case, new_res in sorted(new["results"].items()):
+        old_res = old["results"].get(case)
+        if not old_res:
+            continue
+        for metric in METRICS:
+            if metric in new_res and metric in old_res and old_res[metric] > 0:
+                before, after = old_res[metric], new_res[metric]
+                ratio = after / before
+                regressed = ratio > 1 + threshold
+                if metric.endswith("_s") and after - before < noise_floor:
+                    regressed = False
+                rows.append((case, metric, before, after, ratio, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the suite and store results as JSON")
+    run.add_argument("--kernels", nargs="*", default=list(CASES), choices=list(CASES))
+    run.add_argument("--sizes", nargs="*", default=list(SIZES), choices=SIZES)
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--no-figures", action="store_true", help="skip page figure benchmarks")
+    run.add_argument("--out", type=Path, default=BASELINES / "latest.json")
+
+    cmp = sub.add_parser("compare", help="compare two result files")
+    cmp.add_argument("baseline", type=Path, nargs="?", default=BASELINES / "reference.json")
+    cmp.add_argument("current", type=Path, nargs="?", default=BASELINES / "latest.json")
+    cmp.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown (default 0.10)")
+    cmp.add_argument("--noise-floor", type=float, default=NOISE_FLOOR_S,
+                     help=f"ignore timing changes smaller than this many seconds (default {NOISE_FLOOR_S})")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        print("Kernels")
+        results = bench_kernels(args.kernels, args.sizes, args.repeat)
+        if not args.no_figures:
+            from utils.registry import PAGES
+            print("Figures")
+            results.update(bench_figures([ROOT / p.path for p in PAGES], args.repeat))
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps({"env": environment(), "results": results}, indent=2))
+        print(f"saved {len(results)} results to {args.out}")
+        return 0
+
+    old, new = json.loads(args.baseline.read_text()), json.loads(args.current.read_text())
+    rows = compare(old, new, args.threshold, args.noise_floor)
+    for case, metric, before, after, ratio, regressed in rows:
+        flag = "❌ REGRESSION" if regressed else ("✅ faster" if ratio < 1 - args.threshold else "")
+        print(f"{case:36s} {metric:8s} {before:12.5g} -> {after:12.5g}  x{ratio:5.2f}  {flag}")
+    n_bad = sum(r[-1] for r in rows)
+    print(f"\n{n_bad} regression(s) beyond {args.threshold:.0%} in {len(rows)} comparisons")
+    return 1 if n_bad else 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(ROOT))
+    sys.exit(main())
@@ -0,0 +1,32 @@
+import numpy as np
+
+
+def solve_lorenz(sigma=10.0, rho=28.0, beta=8/3, dt=0.01, steps=10_000, initial=(0.1, 0.0, 0.0)):
+    """Forward-Euler Lorenz trajectory of ``steps`` points starting at
+    ``initial``; returns x, y, z."""
+    x, y, z = np.zeros(steps), np.zeros(steps), np.zeros(steps)
+    x[0], y[0], z[0] = initial
+    s, r, b = float(sigma), float(rho), float(beta)
+    for i in range(steps - 1):
+        dx = s * (y[i] - x[i])
+        dy = x[i] * (r - z[i]) - y[i]
+        dz = x[i] * y[i] - b * z[i]
+        x[i+1] = x[i] + dx * dt
+        y[i+1] = y[i] + dy * dt
+        z[i+1] = z[i] + dz * dt
+    return x, y, z
+
+
+def solve_rossler(a=0.2, b=0.2, c=5.7, dt=0.01, steps=30_000, initial=(0.1, 0.0, 0.0)):
+    """Forward-Euler Rössler trajectory of ``steps`` points starting at
+    ``initial``; returns x, y, z."""
+    x, y, z = np.zeros(steps), np.zeros(steps), np.zeros(steps)
+    x[0], y[0], z[0] = initial
+    for i in range(steps - 1):
+        dx = -y[i] - z[i]
+        dy = x[i] + a * y[i]
+        dz = b + z[i] * (x[i] - c)
+        x[i+1] = x[i] + dx * dt
+        y[i+1] = y[i] + dy * dt
+        z[i+1] = z[i] + dz * dt
+    return x, y, z
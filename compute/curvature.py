@@ -0,0 +1,126 @@
+"""Curvature fields of a parametric surface sampled on a (u, v) grid.
+
+The first and second fundamental forms come from central differences of the
+``x, y, z`` grids, all at once with array slicing. The grid is first padded
+with one ghost layer on every side, so the same five-point stencils apply
+at the edges too:
+
+* a closed edge (the last row or column repeats the first) wraps around,
+  skipping the duplicate;
+* a closed edge whose repeat is reversed, as where the Klein bottle meets
+  itself with the opposite orientation, wraps around reversed;
+* an open edge is extrapolated quadratically, which makes its central
+  difference the second-order one-sided difference.
+
+Differences are taken in grid-index units. Curvatures do not depend on the
+parametrisation, so the spacing of ``u`` and ``v`` never needs to be known::
+
+    fields = curvature_fields(*trefoil_surface(u_steps=400, v_steps=400))
+    fields["K"], fields["H"]   # Gaussian and mean curvature, one per vertex
+
+A 400 x 400 grid takes a few tens of milliseconds.
+"""
+import numpy as np
+
+SEAM_TOL = 1e-6   # of the bounding-box diagonal: edges this close are one seam
+DEGENERATE = 1e-12  # EG - F² below this fraction of its median: no tangent plane
+UMBILIC = 1e-3      # k1 - k2 below this fraction of |H|: no principal direction
+
+# Edge kinds of each grid axis, as returned by ``seams``
+OPEN, PERIODIC, FLIPPED = "open", "periodic", "flipped"
+
+
+def seams(P, tol=SEAM_TOL):
+    """How each axis of the ``(3, rows, cols)`` grid ``P`` closes up:
+    ``(rows kind, cols kind)``, each ``OPEN``, ``PERIODIC`` or ``FLIPPED``."""
+    extent = float(np.linalg.norm(P.max(axis=(1, 2)) - P.min(axis=(1, 2)))) or 1.0
+    kinds = []
+    for first, last in ((P[:, 0, :], P[:, -1, :]), (P[:, :, 0], P[:, :, -1])):
+        if np.abs(first - last).max() <= tol * extent:
+            kinds.append(PERIODIC)
+        elif np.abs(first - last[:, ::-1]).max() <= tol * extent:
+            kinds.append(FLIPPED)
+        else:
+            kinds.append(OPEN)
+    return tuple(kinds)
+
+
+def _pad(P, axis, kind):
+    """``P`` with one ghost layer on each side of ``axis`` (1 or 2)."""
+    take = lambda i: np.take(P, [i], axis=axis)  # noqa: E731
+    if kind == OPEN:
+        before = 3 * take(0) - 3 * take(1) + take(2)
+        after = 3 * take(-1) - 3 * take(-2) + take(-3)
+    else:
+        # The last slice duplicates the first: the neighbours across the
+        # seam are the second and the second-to-last.
+        before, after = take(-2), take(1)
+        if kind == FLIPPED:
+            other = 3 - axis
+            before, after = np.flip(before, axis=other), np.flip(after, axis=other)
+    return np.concatenate([before, P, after], axis=axis)
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _cross(a, b):
+    return np.stack([a[1] * b[2] - a[2] * b[1],
+                     a[2] * b[0] - a[0] * b[2],
+                     a[0] * b[1] - a[1] * b[0]])
+
+
+def _unit(a):
+    norm = np.sqrt(_dot(a, a))
+    return np.divide(a, norm, out=np.zeros_like(a), where=norm > 0)
+
+
+def curvature_fields(x, y, z):
+    """Gaussian, mean and principal curvatures of a ``(rows, cols)`` surface grid.
+
+    Returns a dict of float32 grids: ``K``, ``H``, ``k1 >= k2`` and the unit
+    principal directions ``d1`` and ``d2`` as ``(rows, cols, 3)`` arrays.
+    The signs of ``H``, ``k1`` and ``k2`` follow the normal ``Xu x Xv``
+    (u along columns, v along rows). Points without a tangent plane (a pole,
+    a collapsed edge) are NaN; at umbilics, where every direction is
+    principal, the directions are zero.
+    """
+    P = np.stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(z, dtype=float)])
+    if min(P.shape[1:]) < 3:
+        raise ValueError(f"curvature needs at least a 3 x 3 grid, got {P.shape[1]} x {P.shape[2]}")
+    rows, cols = seams(P)
+    Q = _pad(_pad(P, 1, rows), 2, cols)
+
+    C = Q[:, 1:-1, 1:-1]
+    left, right = Q[:, 1:-1, :-2], Q[:, 1:-1, 2:]
+    down, up = Q[:, :-2, 1:-1], Q[:, 2:, 1:-1]
+    Xu, Xv = (right - left) / 2, (up - down) / 2
+    Xuu, Xvv = right - 2 * C + left, up - 2 * C + down
+    Xuv = (Q[:, 2:, 2:] - Q[:, 2:, :-2] - Q[:, :-2, 2:] + Q[:, :-2, :-2]) / 4
+    n = _unit(_cross(Xu, Xv))
+
+    E, F, G = _dot(Xu, Xu), _dot(Xu, Xv), _dot(Xv, Xv)
+    L, M, N = _dot(Xuu, n), _dot(Xuv, n), _dot(Xvv, n)
+    det = E * G - F * F
+    det[det <= DEGENERATE * np.median(det)] = np.nan
+    K = (L * N - M * M) / det
+    H = (E * N - 2 * F * M + G * L) / (2 * det)
+    root = np.sqrt(np.maximum(H * H - K, 0))
+    k1, k2 = H + root, H - root
+
+    # (a, b) with (II - k1 I)(a, b) = 0, from whichever row of the 2 x 2
+    # system is better conditioned; a Xu + b Xv is the direction in space.
+    a1, b1 = M - k1 * F, k1 * E - L
+    a2, b2 = N - k1 * G, k1 * F - M
+    first = a1 * a1 + b1 * b1 >= a2 * a2 + b2 * b2
+    a, b = np.where(first, a1, a2), np.where(first, b1, b2)
+    d1 = _unit(np.nan_to_num(a * Xu + b * Xv))
+    d1[:, root <= UMBILIC * np.abs(H)] = 0
+    d2 = _cross(n, d1)
+
+    grids = dict(K=K, H=H, k1=k1, k2=k2)
+    fields = {name: g.astype(np.float32) for name, g in grids.items()}
+    fields["d1"] = np.moveaxis(d1, 0, -1).astype(np.float32)
+    fields["d2"] = np.moveaxis(d2, 0, -1).astype(np.float32)
+    return fields
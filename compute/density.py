@@ -0,0 +1,125 @@
+"""Invariant measure of a flow as a voxel histogram of visits.
+
+Millions of samples never exist at once: an ensemble of ``walkers`` copies
+of the flow, started near points of one seed trajectory so they start on
+the attractor, is stepped together with the same forward-Euler scheme as
+``compute.attractors`` and binned ``chunk`` steps at a time with one
+``np.bincount``. Memory is set by ``walkers * chunk`` and the voxel grid,
+whatever the number of samples, and the result is a fixed-size
+``(resolution,) * 3`` array of visit counts::
+
+    counts, bounds = lorenz_density(steps=10_000_000, resolution=48)
+
+For an ergodic attractor, time averages along one long trajectory and
+ensemble averages over walkers on it agree, so the counts approximate the
+same invariant measure a single run of ``steps`` would, some twenty times
+faster. The walkers must first forget that they started close together,
+which takes longer the weaker the chaos (see ``iter_density``).
+"""
+import numpy as np
+
+from compute.attractors import solve_lorenz, solve_rossler
+
+WALKERS = 1024
+CHUNK = 256        # steps per walker between histogram updates
+TRANSIENT = 20.0   # time units of the seed trajectory dropped first
+SEED_TIME = 200.0  # time units of the seed trajectory the walkers start along (and the grid covers)
+JITTER = 1e-3      # of the seed trajectory's extent: walkers start this far off it
+PADDING = 0.05     # of the seed trajectory's extent, added to each side of the grid
+
+
+def _lorenz_step(x, y, z, sigma, rho, beta, dt):
+    return (x + sigma * (y - x) * dt,
+            y + (x * (rho - z) - y) * dt,
+            z + (x * y - beta * z) * dt)
+
+
+def _rossler_step(x, y, z, a, b, c, dt):
+    return (x - (y + z) * dt,
+            y + (x + a * y) * dt,
+            z + (b + z * (x - c)) * dt)
+
+
+def iter_density(solve, step, params, dt, steps, resolution, mixing, walkers=WALKERS, chunk=CHUNK):
+    """Yield ``(progress, (counts, bounds))`` after every chunk of steps.
+
+    ``solve`` integrates the seed trajectory and ``step`` advances arrays of
+    states by one step; ``params`` are passed to both. Walkers run for
+    ``mixing`` time units before counting starts: long enough for their
+    initial jitter to grow to the size of the attractor (a dozen or so
+    e-folding times of the largest Lyapunov exponent). ``counts`` is an
+    int64 ``(resolution,) * 3`` array indexed ``[x, y, z]`` and ``bounds``
+    the ``(2, 3)`` lower and upper corners of the grid. Samples that leave
+    the grid are dropped. Raises ValueError, before the first yield, if the
+    seed trajectory diverges (the grid would have no finite bounds).
+    """
+    walkers = max(1, min(walkers, steps))
+    transient, seed_steps = int(TRANSIENT / dt), int(SEED_TIME / dt)
+    with np.errstate(over="ignore", invalid="ignore"):
+        seed = np.array(solve(**params, dt=dt, steps=transient + seed_steps))[:, transient:]
+    if not np.isfinite(seed).all():
+        values = ", ".join(f"{k}={v:g}" for k, v in params.items())
+        raise ValueError(f"the trajectory diverges for {values} with dt={dt:g}; "
+                         "try other parameters or a smaller time step")
+    lo, hi = seed.min(axis=1), seed.max(axis=1)
+    pad = PADDING * np.maximum(hi - lo, 1e-9)
+    bounds = np.array([lo - pad, hi + pad])
+    scale = resolution / (bounds[1] - bounds[0])
+
+    # Copies of one trajectory would stay copies: jitter them, then let chaos
+    # spread them over the attractor before counting.
+    rng = np.random.default_rng(0)
+    x, y, z = seed[:, np.linspace(0, seed_steps - 1, walkers).astype(int)] + rng.normal(0, JITTER, (3, walkers)) * (hi - lo)[:, None]
+    for _ in range(int(mixing / dt)):
+        x, y, z = step(x, y, z, **params, dt=dt)
+    counts = np.zeros(resolution ** 3, dtype=np.int64)
+    per_walker = -(-steps // walkers)
+    # Samples of the current chunk, one row per step (the last may be partial)
+    samples = np.empty((3, chunk, walkers))
+    done = 0
+    for start in range(0, per_walker, chunk):
+        n = min(chunk, per_walker - start)
+        for t in range(n):
+            x, y, z = step(x, y, z, **params, dt=dt)
+            samples[0, t], samples[1, t], samples[2, t] = x, y, z
+        if start + n == per_walker:  # trim the last chunk to exactly ``steps`` samples
+            n_last = steps - done - (n - 1) * walkers
+            samples[:, n - 1, n_last:] = np.nan
+        cells = np.floor((samples[:, :n] - bounds[0][:, None, None]) * scale[:, None, None])
+        inside = ((cells >= 0) & (cells < resolution)).all(axis=0)
+        cells = cells[:, inside].astype(np.int64)
+        counts += np.bincount((cells[0] * resolution + cells[1]) * resolution + cells[2],
+                              minlength=resolution ** 3)
+        done = min(done + n * walkers, steps)
+        if done < steps:
+            yield done / steps, (counts.reshape((resolution,) * 3), bounds)
+    yield 1.0, (counts.reshape((resolution,) * 3), bounds)
+
+
+def _density(iterator):
+    for _, result in iterator:
+        pass
+    return result
+
+
+def lorenz_density(sigma=10.0, rho=28.0, beta=8/3, dt=0.01, steps=5_000_000, resolution=48):
+    """Visits of ``steps`` Lorenz samples in a ``resolution**3`` voxel grid;
+    returns counts and bounds (see ``iter_density``)."""
+    return _density(iter_lorenz_density(sigma, rho, beta, dt, steps, resolution))
+
+
+def iter_lorenz_density(sigma=10.0, rho=28.0, beta=8/3, dt=0.01, steps=5_000_000, resolution=48):
+    # Largest Lyapunov exponent about 0.9
+    return iter_density(solve_lorenz, _lorenz_step, dict(sigma=sigma, rho=rho, beta=beta), dt, steps, resolution,
+                        mixing=20.0)
+
+
+def rossler_density(a=0.2, b=0.2, c=5.7, dt=0.01, steps=5_000_000, resolution=48):
+    """Visits of ``steps`` Rössler samples in a ``resolution**3`` voxel grid;
+    returns counts and bounds (see ``iter_density``)."""
+    return _density(iter_rossler_density(a, b, c, dt, steps, resolution))
+
+
+def iter_rossler_density(a=0.2, b=0.2, c=5.7, dt=0.01, steps=5_000_000, resolution=48):
+    # Largest Lyapunov exponent about 0.07
+    return iter_density(solve_rossler, _rossler_step, dict(a=a, b=b, c=c), dt, steps, resolution, mixing=200.0)
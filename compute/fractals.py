@@ -0,0 +1,277 @@
+import random
+
+import numpy as np
+
+# Barnsley fern: (probability, [a, b, c, d, e, f]) with
+# x' = a*x + b*y + e,  y' = c*x + d*y + f
+FERN_MAPS = [
+    (0.01, [0, 0, 0, 0.16, 0, 0]),                # Stem (1%)
+    (0.85, [0.85, 0.04, -0.04, 0.85, 0, 1.6]),    # Main stem (85%)
+    (0.07, [0.2, -0.26, 0.23, 0.22, 0, 1.6]),     # Left side (7%)
+    (0.07, [-0.15, 0.28, 0.26, 0.24, 0, 0.44]),   # Right side (7%)
+]
+
+
+def barnsley_fern(n_points=50000, seed=None):
+    """Chaos-game points of the Barnsley fern; returns x, y."""
+    for _, (x, y) in iter_fern(n_points, seed=seed):
+        pass
+    return x, y
+
+
+def iter_fern(n_points=50000, seed=None, chunk=10_000):
+    """Yield ``(progress, (x, y))`` every ``chunk`` points; each x, y is a
+    prefix of the same orbit ``barnsley_fern`` returns."""
+    rng = np.random.default_rng(seed)
+    x = np.zeros(n_points)
+    y = np.zeros(n_points)
+    rands = rng.random(n_points)
+
+    for i in range(1, n_points):
+        # Choose transformation based on probabilities
+        rand = rands[i]
+        cumulative = 0
+        for prob, coeffs in FERN_MAPS:
+            cumulative += prob
+            if rand <= cumulative:
+                a, b, c, d, e, f = coeffs
+                x[i] = a * x[i-1] + b * y[i-1] + e
+                y[i] = c * x[i-1] + d * y[i-1] + f
+                break
+        if (i + 1) % chunk == 0 and i + 1 < n_points:
+            yield (i + 1) / n_points, (x[:i+1], y[:i+1])
+
+    yield 1.0, (x, y)
+
+
+# A box containing the whole fern attractor (x0, x1, y0, y1)
+FERN_BOUNDS = (-2.2, 2.7, 0.0, 10.0)
+
+
+def fern_viewport(x0, x1, y0, y1, target=200_000, seed=0, shrink=0.7):
+    """About ``target`` fern points inside the viewport ``[x0, x1] × [y0, y1]``.
+
+    Walks the IFS address tree: a node is a composition of maps, and its
+    image of ``FERN_BOUNDS`` bounds every attractor point below it, so nodes
+    whose box misses the viewport are dropped with their whole subtree.
+    Boxes larger than a shrinking threshold are split until there are
+    ``target`` nodes, then each node emits the image of one attractor point.
+    The work depends on the viewport and target, not on the zoom depth.
+    """
+    rng = np.random.default_rng(seed)
+    maps = np.array([coeffs for _, coeffs in FERN_MAPS], dtype=float)
+    A = maps[:, [0, 1, 2, 3]].reshape(-1, 2, 2)
+    t = maps[:, [4, 5]]
+    bx0, bx1, by0, by1 = FERN_BOUNDS
+    centre = np.array([(bx0 + bx1) / 2, (by0 + by1) / 2])
+    half = np.array([(bx1 - bx0) / 2, (by1 - by0) / 2])
+    samples = np.stack(barnsley_fern(4096, seed=seed), axis=1)[64:]  # points on the attractor
+
+    def visible(M, v):
+        c = M @ centre + v
+        h = np.abs(M) @ half
+        keep = (c[:, 0] + h[:, 0] >= x0) & (c[:, 0] - h[:, 0] <= x1) & \
+               (c[:, 1] + h[:, 1] >= y0) & (c[:, 1] - h[:, 1] <= y1)
+        return M[keep], v[keep], h[keep].max(axis=1)
+
+    # Each node is p -> M @ p + v; start from the identity
+    M, v, size = visible(np.eye(2)[None], np.zeros((1, 2)))
+    eps = size.max() if len(size) else 0.0
+    while 0 < len(M) < target and eps > 0:
+        eps *= shrink
+        split = size > eps
+        if not split.any():
+            continue
+        Ms, vs = M[split], v[split]
+        # Children T∘f_i: p -> (M A_i) p + (M t_i + v)
+        Mc = np.einsum("nij,kjl->nkil", Ms, A).reshape(-1, 2, 2)
+        vc = (np.einsum("nij,kj->nki", Ms, t) + vs[:, None]).reshape(-1, 2)
+        Mc, vc, sc = visible(Mc, vc)
+        M, v, size = (np.concatenate([M[~split], Mc]), np.concatenate([v[~split], vc]),
+                      np.concatenate([size[~split], sc]))
+
+    if len(M) > target:
+        keep = rng.choice(len(M), target, replace=False)
+        M, v = M[keep], v[keep]
+    pts = np.einsum("nij,nj->ni", M, samples[rng.integers(len(samples), size=len(M))]) + v
+    in_view = (pts[:, 0] >= x0) & (pts[:, 0] <= x1) & (pts[:, 1] >= y0) & (pts[:, 1] <= y1)
+    return pts[in_view, 0], pts[in_view, 1]
+
+
+def generate_snowflake(n_particles=1000, stickiness=0.8, chaos=0.1, symmetry=6, twist=0.0, depth=30, seed=None):
+    """Symmetric random-walk aggregation; returns an (n, 3) array of points.
+
+    ``seed`` drives a private ``random.Random`` stream, so runs are
+    reproducible and independent across processes.
+    """
+    for _, points in iter_snowflake(n_particles, stickiness, chaos, symmetry, twist, depth, seed):
+        pass
+    return points
+
+
+def iter_snowflake(n_particles=1000, stickiness=0.8, chaos=0.1, symmetry=6, twist=0.0, depth=30, seed=None,
+                   chunk=10):
+    """Yield ``(progress, points)`` after every ``chunk`` walkers, ending with
+    the array ``generate_snowflake`` returns."""
+    rng = random.Random(seed)
+    # Seed at origin
+    points = [(0.0, 0.0, 0.0)]
+    occupied = set([(0, 0)])
+
+    # Launch random walkers
+    for n in range(1, n_particles + 1):
+        # Start walker on circle of radius ~depth
+        angle = rng.uniform(0, 2*np.pi)
+        r = depth * 0.9 + rng.uniform(-2, 2)
+        x, y = r * np.cos(angle), r * np.sin(angle)
+
+        for _ in range(5000):  # max steps
+            # Random step + chaos
+            dx = rng.uniform(-1, 1) + rng.gauss(0, chaos)
+            dy = rng.uniform(-1, 1) + rng.gauss(0, chaos)
+            x, y = x + dx, y + dy
+
+            # Reflect into 60° wedge (for 6-fold symmetry)
+            theta = np.arctan2(y, x) % (2*np.pi/symmetry)
+            r = np.hypot(x, y)
+            x_wedge = r * np.cos(theta)
+            y_wedge = r * np.sin(theta)
+
+            # Snap to grid
+            ix, iy = int(round(x_wedge)), int(round(y_wedge))
+            if (ix, iy) in occupied:
+                if rng.random() < stickiness:
+                    # Add all symmetric copies
+                    for k in range(symmetry):
+                        ang = 2*np.pi * k / symmetry + twist
+                        x_out = x_wedge * np.cos(ang) - y_wedge * np.sin(ang)
+                        y_out = x_wedge * np.sin(ang) + y_wedge * np.cos(ang)
+                        # Slight Z variation for 3D effect
+                        z = 0.2 * np.sin(5 * ang) * rng.gauss(0, 0.1)
+                        points.append((x_out, y_out, z))
+                    break
+            if r > depth * 1.2 or r < 1:
+                break  # escape or too close
+        if n % chunk == 0 and n < n_particles:
+            yield n / n_particles, np.array(points)
+
+    yield 1.0, np.array(points)
+
+
+# Reiter's snow crystal automaton on a hexagonal lattice. Cells are in axial
+# coordinates (i, j), centred at (i - j/2, j * sqrt(3)/2), with these neighbours:
+HEX_STEPS = np.array([(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1)])
+
+
+def _hex_xy(i, j):
+    return i - j / 2, j * (np.sqrt(3) / 2)
+
+
+def _to_wedge(i, j):
+    """Images of axial cells under the 12 symmetries of the hexagon that lie
+    in the wedge ``0 <= 2j <= i`` (between 0° and 30°)."""
+    i, j = np.array(i, dtype=np.int64), np.array(j, dtype=np.int64)
+    out_i, out_j = i.copy(), j.copy()
+    todo = np.ones(i.shape, dtype=bool)
+    for _ in range(6):
+        for a, b in ((i, j), (i - j, -j)):  # the cell and its mirror image in the 0° axis
+            hit = todo & (b >= 0) & (2 * b <= a)
+            out_i[hit], out_j[hit] = a[hit], b[hit]
+            todo &= ~hit
+        i, j = i - j, i  # rotate by 60°
+    return out_i, out_j
+
+
+def reiter_snowflake(alpha=1.0, beta=0.4, gamma=0.001, radius=200, generations=4000):
+    """Reiter's hexagonal cellular automaton for snow crystals.
+
+    Every cell holds water ``s``; ice is ``s >= 1``. Ice cells and their
+    neighbours are receptive: they keep their water and gain ``gamma`` per
+    generation. The water of all other cells diffuses with constant
+    ``alpha``, and cells outside a disk of ``radius`` cells stay at the
+    background level ``beta``. Growth stops after ``generations`` or when
+    the ice reaches the edge.
+
+    Returns ``(x, y, generation)``: the centres of the ice cells (unit
+    spacing) and the generation each one froze in.
+    """
+    for _, crystal in iter_reiter_snowflake(alpha, beta, gamma, radius, generations):
+        pass
+    return crystal
+
+
+def iter_reiter_snowflake(alpha=1.0, beta=0.4, gamma=0.001, radius=200, generations=4000, every=100):
+    """Yield ``(progress, (x, y, generation))`` every ``every`` generations,
+    ending with the crystal ``reiter_snowflake`` returns.
+
+    The state is symmetric under the 12 symmetries of the hexagon, so only
+    the cells of one 30° wedge are stored, as flat arrays. Each wedge cell
+    has its six neighbours precomputed as indices into the wedge (a
+    neighbour across a mirror line is its mirror image), with the cells
+    beyond the disk mapped to one extra slot held at ``beta``; a generation
+    is then a handful of whole-array gathers and sums over about
+    ``radius**2 / 3`` cells.
+    """
+    # --- the wedge and its neighbour table ---
+    i_max = int(np.ceil(2 * radius / np.sqrt(3))) + 1
+    i, j = np.meshgrid(np.arange(i_max + 1), np.arange(i_max // 2 + 1), indexing="ij")
+    x, y = _hex_xy(i, j)
+    inside = (2 * j <= i) & (np.hypot(x, y) <= radius)
+    wi, wj = i[inside], j[inside]
+    n = len(wi)
+    slot = np.full(i.shape, n, dtype=np.int64)  # wedge index of each (i, j); n is outside
+    slot[wi, wj] = np.arange(n)
+
+    ni, nj = _to_wedge(wi[:, None] + HEX_STEPS[:, 0], wj[:, None] + HEX_STEPS[:, 1])
+    in_table = ni <= i_max
+    neighbours = np.full(ni.shape, n, dtype=np.int64)
+    neighbours[in_table] = slot[ni[in_table], nj[in_table]]
+    edge = (neighbours == n).any(axis=1)
+
+    # --- the full disk, each cell pointing at its wedge image ---
+    fi, fj = np.meshgrid(np.arange(-i_max, i_max + 1), np.arange(-i_max, i_max + 1), indexing="ij")
+    fx, fy = _hex_xy(fi, fj)
+    in_disk = np.hypot(fx, fy) <= radius
+    fx, fy = fx[in_disk], fy[in_disk]
+    full = slot[_to_wedge(fi[in_disk], fj[in_disk])]
+
+    def crystal():
+        ice = born[full] >= 0
+        return fx[ice], fy[ice], born[full][ice]
+
+    # --- the automaton ---
+    neighbours = np.ascontiguousarray(neighbours.T, dtype=np.int32)  # one row per direction
+    s = np.full(n + 1, beta)
+    s[0] = 1.0  # the seed: the centre cell
+    born = np.full(n + 1, -1, dtype=np.int32)
+    born[0] = 0
+    receptive = np.zeros(n + 1, dtype=bool)
+    receptive[neighbours[:, 0]] = receptive[0] = True
+    receptive[n] = False
+    diffusing = np.empty(n + 1)
+    total = np.empty(n)
+    for g in range(1, generations + 1):
+        # Receptive cells keep their water and gain gamma; the rest diffuses
+        # as u + alpha/2 * (mean of the six neighbours - u).
+        kept = np.where(receptive[:n], s[:n] + gamma, 0.0)
+        np.copyto(diffusing[:n], s[:n])
+        diffusing[:n][receptive[:n]] = 0.0
+        diffusing[n] = beta
+        np.take(diffusing, neighbours[0], out=total)
+        for row in neighbours[1:]:
+            total += diffusing[row]
+        total -= 6 * diffusing[:n]
+        total *= alpha / 12
+        total += diffusing[:n]
+        s[:n] = total + kept
+        frozen = np.flatnonzero((s[:n] >= 1) & (born[:n] < 0))
+        if len(frozen):
+            born[frozen] = g
+            receptive[neighbours[:, frozen]] = True
+            receptive[n] = False
+            if edge[frozen].any():
+                break
+        if g % every == 0 and g < generations:
+            yield g / generations, crystal()
+
+    yield 1.0, crystal()
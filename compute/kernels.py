@@ -0,0 +1,51 @@
+from dataclasses import dataclass, field
+from typing import Callable
+
+from compute.attractors import solve_lorenz, solve_rossler
+from compute.density import lorenz_density, rossler_density
+from compute.fractals import barnsley_fern, generate_snowflake, reiter_snowflake
+from compute.surfaces import (bernoulli_surface, cylindrical_wire, function_surface, klein_bottle,
+                              klein_bottle_4d, snowflake_surface, spiral_surface, trefoil_surface)
+
+
+@dataclass(frozen=True)
+class Kernel:
+    """A pure compute function, the names of the arrays it returns and its
+    default parameters (the ones the corresponding page opens with)."""
+    func: Callable
+    outputs: tuple
+    defaults: dict = field(default_factory=dict)
+
+    def __call__(self, **params):
+        result = self.func(**{**self.defaults, **params})
+        if len(self.outputs) == 1:
+            result = (result,)
+        return dict(zip(self.outputs, result))
+
+
+KERNELS = {
+    "lorenz": Kernel(solve_lorenz, ("x", "y", "z"),
+                     dict(sigma=10.0, rho=28.0, beta=8/3, dt=0.01, steps=10_000)),
+    "rossler": Kernel(solve_rossler, ("x", "y", "z"),
+                      dict(a=0.2, b=0.2, c=5.7, dt=0.01, steps=30_000)),
+    "lorenz_density": Kernel(lorenz_density, ("counts", "bounds"),
+                             dict(sigma=10.0, rho=28.0, beta=8/3, dt=0.01, steps=5_000_000, resolution=48)),
+    "rossler_density": Kernel(rossler_density, ("counts", "bounds"),
+                              dict(a=0.2, b=0.2, c=5.7, dt=0.01, steps=5_000_000, resolution=48)),
+    "fern": Kernel(barnsley_fern, ("x", "y"), dict(n_points=50_000)),
+    "snowflake": Kernel(generate_snowflake, ("points",),
+                        dict(n_particles=1000, stickiness=0.8, chaos=0.1, symmetry=6, twist=0.0, depth=30)),
+    "reiter": Kernel(reiter_snowflake, ("x", "y", "generation"),
+                     dict(alpha=1.0, beta=0.4, gamma=0.001, radius=200, generations=4000)),
+    "klein": Kernel(klein_bottle, ("x", "y", "z"),
+                    dict(immersion="Classic", twist=1.0, radius=2.0, neck_scale=1.0, u_steps=100, v_steps=100)),
+    "klein_4d": Kernel(klein_bottle_4d, ("x", "y", "z", "w"),
+                       dict(radius=2.0, neck_scale=1.0, u_steps=100, v_steps=100)),
+    "trefoil": Kernel(trefoil_surface, ("x", "y", "z"), dict(u_steps=100, v_steps=100)),
+    "snowflake_surface": Kernel(snowflake_surface, ("x", "y", "z"), dict(u_steps=120, v_steps=120)),
+    "helical_cylinder": Kernel(cylindrical_wire, ("x", "y", "z"), dict(wire_radius=0.08, turns=2.5, height=3)),
+    "spiral": Kernel(spiral_surface, ("t", "x", "y", "z"), dict(n_points=100)),
+    "bernoulli": Kernel(bernoulli_surface, ("x", "n", "X", "N", "Z"), dict(n_points=50, max_order=5)),
+    "surface": Kernel(function_surface, ("x", "y", "z"),
+                      dict(expr="np.sin(x) * np.cos(y)", x_range=3.0, y_range=3.0, resolution=40)),
+}
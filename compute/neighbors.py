@@ -0,0 +1,193 @@
+"""Fixed-radius neighbours on a uniform grid: recurrences and correlation sums.
+
+``GridIndex`` buckets points into cubes of side ``cell`` and sorts them by
+cube, so every occupied cube is a contiguous run of the sorted points. Two
+points closer than ``radius <= cell`` lie in the same or in adjacent cubes;
+adjacent occupied cubes are found with one ``searchsorted`` per neighbour
+offset (only half of the ``3**d - 1`` offsets, so each pair of cubes is met
+once), and the candidate pairs of every pair of cubes are expanded and
+tested in chunks of at most ``max_pairs``. Work grows with the number of
+candidate pairs, which for a trajectory at a small radius is close to linear
+in the number of points, and memory is bounded by the chunk size.
+
+On top of the pair stream:
+
+* ``correlation_sum`` counts pairs under many radii at once (one histogram
+  of the pair distances against the sorted radii), and
+  ``correlation_dimension`` fits the Grassberger–Procaccia D2 to it;
+* ``recurrence_image`` bins the recurrence matrix ``|x_i - x_j| < eps`` into
+  blocks of time indices, exact when there are fewer points than pixels.
+
+A 100 000-point Lorenz trajectory takes a few seconds.
+"""
+import itertools
+
+import numpy as np
+
+from compute.dimension import DimensionFit, linear_fit
+
+MAX_PAIRS = 1 << 21   # candidate pairs tested per chunk (about 100 MB of temporaries)
+REACH = 2             # cubes of side radius / REACH: fewer candidates than cubes of side radius
+THEILER = 10          # pairs this close in time are left out of correlation sums
+
+# Radii of correlation sums, as fractions of the attractor diameter.
+RADIUS_RANGE = (5e-4, 0.01)
+N_RADII = 16
+# Fit only radii with at least this many pairs, and below this fraction of all pairs.
+MIN_PAIRS = 100
+MAX_FRACTION = 0.05
+
+
+def _as_points(points):
+    points = np.asarray(points, dtype=float)
+    return points[:, None] if points.ndim == 1 else points
+
+
+def diameter(points):
+    """Diagonal of the bounding box of ``points``."""
+    points = _as_points(points)
+    return float(np.linalg.norm(points.max(axis=0) - points.min(axis=0)))
+
+
+class GridIndex:
+    """``points`` (an (n, d) array) bucketed into cubes of side ``cell``."""
+
+    def __init__(self, points, cell, reach=1):
+        points = _as_points(points)
+        if not cell > 0:
+            raise ValueError(f"cell side must be positive, got {cell}")
+        n, d = points.shape
+        # Cube coordinates start at 1, so the neighbours of every cube have
+        # non-negative coordinates and keys never wrap.
+        q = np.floor((points - points.min(axis=0)) / cell).astype(np.int64) + reach
+        dims = q.max(axis=0) + 1 + reach
+        if np.prod(dims.astype(float)) >= 2 ** 62:
+            raise ValueError(f"cell side {cell:g} is too small for the extent of the points")
+        strides = np.ones(d, dtype=np.int64)
+        for axis in range(d - 2, -1, -1):
+            strides[axis] = strides[axis + 1] * dims[axis + 1]
+        keys = q @ strides
+        self.order = np.argsort(keys, kind="stable")
+        self.points = points[self.order]
+        self._columns = [np.ascontiguousarray(c) for c in self.points.T]
+        self.cell = float(cell)
+        self.reach = reach
+        self.cells, self.starts, self.counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+        offsets = np.array(list(itertools.product(range(-reach, reach + 1), repeat=d))) @ strides
+        self._offsets = offsets[offsets > 0]
+
+    def __len__(self):
+        return len(self.points)
+
+    def cell_pairs(self):
+        """Indices ``(a, b)`` into ``cells`` of every occupied cube paired with
+        itself and with each adjacent occupied cube, each pair once."""
+        n_cells = len(self.cells)
+        a, b = [np.arange(n_cells)], [np.arange(n_cells)]
+        for offset in self._offsets:
+            target = self.cells + offset
+            pos = np.minimum(np.searchsorted(self.cells, target), n_cells - 1)
+            hit = np.flatnonzero(self.cells[pos] == target)
+            a.append(hit)
+            b.append(pos[hit])
+        return np.concatenate(a), np.concatenate(b)
+
+    def pairs(self, radius, max_pairs=MAX_PAIRS):
+        """Yield ``(i, j, dist)`` chunks covering every pair ``i < j`` of
+        original point indices closer than ``radius``."""
+        if radius > self.reach * self.cell:
+            raise ValueError(f"radius {radius:g} exceeds the reach of the index ({self.reach * self.cell:g})")
+        a, b = self.cell_pairs()
+        count_b = self.counts[b]
+        sizes = self.counts[a] * count_b
+        ends = np.cumsum(sizes)
+        # Chunk boundaries in cube pairs; a single large cube pair may exceed max_pairs.
+        bounds = np.unique(np.searchsorted(ends, np.arange(max_pairs, ends[-1], max_pairs), side="right"))
+        r2 = radius * radius
+        index = np.int32 if len(self) < 2 ** 31 else np.int64
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(a)]):
+            if lo == hi:
+                continue
+            # Per candidate: its cube pair's first points and width, then its
+            # offset within the pair, split into row and column.
+            size = sizes[lo:hi]
+            width = np.repeat(count_b[lo:hi].astype(index), size)
+            local = np.arange(ends[hi - 1] - (ends[lo - 1] if lo else 0), dtype=index)
+            local -= np.repeat((ends[lo:hi] - size - (ends[lo - 1] if lo else 0)).astype(index), size)
+            row, col = np.divmod(local, width)
+            i = row + np.repeat(self.starts[a[lo:hi]].astype(index), size)
+            j = col + np.repeat(self.starts[b[lo:hi]].astype(index), size)
+            d2 = np.zeros(len(i))
+            for column in self._columns:
+                diff = column[i] - column[j]
+                d2 += diff * diff
+            keep = d2 < r2
+            keep &= (i < j) | np.repeat(a[lo:hi] != b[lo:hi], size)  # within a cube, each pair once
+            i, j = self.order[i[keep]], self.order[j[keep]]
+            yield np.minimum(i, j), np.maximum(i, j), np.sqrt(d2[keep])
+
+
+def neighbor_pairs(points, radius, max_pairs=MAX_PAIRS):
+    """Every pair ``i < j`` closer than ``radius`` as ``(i, j)`` index arrays:
+    the upper triangle of the recurrence matrix in coordinate form."""
+    chunks = list(GridIndex(points, radius / REACH, REACH).pairs(radius, max_pairs))
+    if not chunks:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate([c[0] for c in chunks]), np.concatenate([c[1] for c in chunks])
+
+
+def correlation_sum(points, radii, theiler=THEILER, max_pairs=MAX_PAIRS):
+    """Grassberger–Procaccia ``C(eps)`` for every ``eps`` in ``radii``, in one pass.
+
+    ``C(eps)`` is the fraction of pairs ``(i, j)`` with ``|i - j| > theiler``
+    closer than ``eps``. Returns ``(radii, C, pair counts)``, radii ascending.
+    """
+    points = _as_points(points)
+    radii = np.sort(np.asarray(radii, dtype=float))
+    n = len(points)
+    counts = np.zeros(len(radii) + 1, dtype=np.int64)
+    for i, j, dist in GridIndex(points, radii[-1] / REACH, REACH).pairs(radii[-1], max_pairs):
+        if theiler:
+            dist = dist[j - i > theiler]
+        counts += np.bincount(np.searchsorted(radii, dist, side="right"), minlength=len(radii) + 1)
+    counts = np.cumsum(counts)[:len(radii)]
+    total = max(n - theiler - 1, 0) * (n - theiler) / 2
+    return radii, counts / total if total else np.full(len(radii), np.nan), counts
+
+
+def correlation_dimension(points, radii=None, theiler=THEILER, min_pairs=MIN_PAIRS,
+                          max_fraction=MAX_FRACTION, max_pairs=MAX_PAIRS):
+    """D2 as the slope of ``log C(eps)`` against ``log eps``, as a ``DimensionFit``.
+
+    ``radii`` default to ``N_RADII`` log-spaced radii over ``RADIUS_RANGE`` of
+    the diameter; the fit uses those with at least ``min_pairs`` pairs and
+    ``C(eps) <= max_fraction``.
+    """
+    if radii is None:
+        radii = diameter(points) * np.geomspace(*RADIUS_RANGE, N_RADII)
+    eps, c, counts = correlation_sum(points, radii, theiler, max_pairs)
+    fit = (counts >= min_pairs) & (c <= max_fraction)
+    slope, intercept, r2 = linear_fit(np.log2(eps), np.log2(np.maximum(c, 1e-300)), fit)
+    return DimensionFit(slope, intercept, r2, eps, c, fit)
+
+
+def recurrence_image(points, radius, size=512, max_pairs=MAX_PAIRS):
+    """Recurrence rate of ``|x_i - x_j| < radius`` in blocks of time indices.
+
+    The ``n x n`` recurrence matrix is binned into ``min(size, n)`` blocks per
+    side; each pixel is the fraction of its pairs that recur (the diagonal,
+    each point with itself, included), so with ``n <= size`` pixels are the
+    0/1 matrix itself. Returns ``(image, edges)``: the image is symmetric,
+    ``edges`` the first time index of each block plus ``n``.
+    """
+    points = _as_points(points)
+    n = len(points)
+    size = min(size, n)
+    block = np.arange(n) * size // n
+    counts = np.zeros(size * size, dtype=np.int64)
+    for i, j, _ in GridIndex(points, radius / REACH, REACH).pairs(radius, max_pairs):
+        counts += np.bincount(block[i] * size + block[j], minlength=size * size)
+    counts = counts.reshape(size, size)
+    members = np.bincount(block, minlength=size)
+    image = (counts + counts.T + np.diag(members)) / np.outer(members, members)
+    return image, np.r_[np.searchsorted(block, np.arange(size)), n]
@@ -0,0 +1,269 @@
+import ast
+
+import numpy as np
+
+# Bₙ(x) coefficients, lowest power first
+BERNOULLI_COEFFS = [
+    [1],
+    [-1/2, 1],
+    [1/6, -1, 1],
+    [0, 1/2, -3/2, 1],
+    [-1/30, 0, 1, -2, 1],
+    [0, -1/6, 0, 5/3, -5/2, 1],
+]
+
+# Names available to user expressions in function_surface
+SURFACE_NAMESPACE = {"np": np, "sin": np.sin, "cos": np.cos, "exp": np.exp, "log": np.log}
+
+# Besides ufuncs, the only ``np.`` attributes an expression may use
+SURFACE_NP_EXTRAS = {"pi", "e", "where", "clip", "sinc"}
+
+# Limits on user expressions: source length, and estimated cost in
+# element operations (array-producing operations times grid cells)
+MAX_EXPRESSION_CHARS = 500
+MAX_EXPRESSION_COST = 1_000_000
+
+_EXPRESSION_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.keyword,
+    ast.Name, ast.Attribute, ast.Constant, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+)
+
+
+def klein_bottle(immersion="Classic", twist=1.0, radius=2.0, neck_scale=1.0, u_steps=100, v_steps=100):
+    """Klein bottle immersion in 3D ("Classic" or "Figure-8"); returns x, y, z grids."""
+    u = np.linspace(0, 2*np.pi, u_steps)
+    v = np.linspace(0, 2*np.pi, v_steps)
+    U, V = np.meshgrid(u, v)
+
+    if immersion == "Classic":
+        # Standard immersion (self-intersecting 'neck')
+        x = (radius + np.cos(U/2 + twist*np.pi) * np.sin(V) - np.sin(U/2 + twist*np.pi) * np.sin(2*V)) * np.cos(U)
+        y = (radius + np.cos(U/2 + twist*np.pi) * np.sin(V) - np.sin(U/2 + twist*np.pi) * np.sin(2*V)) * np.sin(U)
+        z = neck_scale * (np.sin(U/2 + twist*np.pi) * np.sin(V) + np.cos(U/2 + twist*np.pi) * np.sin(2*V))
+    else:  # Figure-8 immersion (Robert Israel parametrisation — smoother)
+        R = radius
+        a = neck_scale
+        x = (R + a * np.cos(V/2) * np.sin(U) - a * np.sin(V/2) * np.sin(2*U)) * np.cos(V)
+        y = (R + a * np.cos(V/2) * np.sin(U) - a * np.sin(V/2) * np.sin(2*U)) * np.sin(V)
+        z = a * np.sin(V/2) * np.sin(U) + a * np.cos(V/2) * np.sin(2*U)
+
+    return x, y, z
+
+
+def klein_bottle_4d(radius=2.0, neck_scale=1.0, u_steps=100, v_steps=100):
+    """Klein bottle embedded in 4D without self-intersection; returns x, y, z, w grids.
+
+    A circle of radius ``neck_scale`` is swept around a circle of radius
+    ``radius`` while turning half a revolution in the (z, w) plane, so the
+    3D tube's crossing is pulled apart along w.
+    """
+    u = np.linspace(0, 2*np.pi, u_steps)
+    v = np.linspace(0, 2*np.pi, v_steps)
+    U, V = np.meshgrid(u, v)
+    ring = radius + neck_scale * np.cos(V)
+    x = ring * np.cos(U)
+    y = ring * np.sin(U)
+    z = neck_scale * np.sin(V) * np.cos(U/2)
+    w = neck_scale * np.sin(V) * np.sin(U/2)
+    return x, y, z, w
+
+
+# Coordinate planes a 4D rotation can turn in
+ROTATION_PLANES = ("xw", "yw", "zw", "xy", "xz", "yz")
+
+
+def rotation_frames(points, plane="xw", n_frames=64, distance=3.0):
+    """Project one full turn of 4D ``points`` in ``plane`` to 3D, one frame per angle.
+
+    ``points`` is (x, y, z, w), arrays of any common shape. All frames are
+    rotated in a single ``einsum`` and put through a perspective projection
+    from a 4D eye at ``distance`` times the points' largest radius on the w
+    axis. Returns a float32 array of shape (n_frames, 3, *grid shape).
+    """
+    i, j = ("xyzw".index(axis) for axis in plane)
+    shape = np.shape(points[0])
+    P = np.stack([np.asarray(c, dtype=np.float32).ravel() for c in points])
+
+    angles = np.linspace(0, 2*np.pi, n_frames, endpoint=False)
+    R = np.zeros((n_frames, 4, 4), dtype=np.float32)
+    R[:, range(4), range(4)] = 1
+    R[:, i, i] = R[:, j, j] = np.cos(angles)
+    R[:, i, j] = -np.sin(angles)
+    R[:, j, i] = np.sin(angles)
+    rotated = np.einsum("fij,jn->fin", R, P)
+
+    eye = np.float32(distance * np.sqrt((P ** 2).sum(axis=0)).max())
+    frames = rotated[:, :3] * (eye / (eye - rotated[:, 3:]))
+    return frames.reshape(n_frames, 3, *shape)
+
+
+def trefoil_surface(u_range=(0, 2*np.pi), v_range=(0, 2*np.pi), u_steps=50, v_steps=50):
+    """Tube around a trefoil-like knot; returns x, y, z grids."""
+    u = np.linspace(u_range[0], u_range[1], u_steps)
+    v = np.linspace(v_range[0], v_range[1], v_steps)
+    U, V = np.meshgrid(u, v)
+
+    x = (4 * (1 + 0.25 * np.sin(3 * V)) + np.cos(U)) * np.cos(2 * V)
+    y = (4 * (1 + 0.25 * np.sin(3 * V)) + np.cos(U)) * np.sin(2 * V)
+    z = np.sin(U) + 2 * np.cos(3 * V)
+
+    return x, y, z
+
+
+def snowflake_surface(u_steps=120, v_steps=120):
+    """6-fold snowflake-inspired ribbon surface; returns x, y, z grids."""
+    u = np.linspace(0, 2*np.pi, u_steps)
+    v = np.linspace(0, 2*np.pi, v_steps)
+    U, V = np.meshgrid(u, v)
+
+    # 🌨️ Snowflake-inspired modulations:
+    # - 6-fold symmetry in radial arm (sin(6V))
+    # - Delicate branching (cos(12V) * exp(-|cos(U)|))
+    # - Icicle tips (sin(U) sharpens at poles)
+    R = 4 * (1 + 0.3 * np.sin(6 * V) + 0.1 * np.cos(12 * V) * np.exp(-np.abs(np.cos(U))))
+    x = R * np.cos(2 * V)
+    y = R * np.sin(2 * V)
+    z = np.sin(U) * (1 + 0.4 * np.cos(6 * V))  # 6-point vertical ripple
+
+    return x, y, z
+
+
+def cylindrical_wire(radius=0.1, turns=3, height=4, steps=200, wire_radius=0.05):
+    """Tube of radius ``wire_radius`` around a helix; returns x, y, z grids."""
+    # Central helix
+    t = np.linspace(0, turns * 2*np.pi, steps)
+    x_center = np.cos(t)
+    y_center = np.sin(t)
+    z_center = (height / (turns * 2*np.pi)) * t
+
+    # Tangent, Normal, Binormal vectors (Frenet frame approximation)
+    dx = -np.sin(t)
+    dy = np.cos(t)
+    dz = height / (turns * 2*np.pi) * np.ones_like(t)
+
+    # Normalize tangent
+    T = np.vstack([dx, dy, dz])
+    T = T / np.linalg.norm(T, axis=0)
+
+    # Approximate normal (avoiding |T| issues)
+    N = np.vstack([-np.cos(t), -np.sin(t), np.zeros_like(t)])
+    N = N / np.linalg.norm(N, axis=0)
+
+    # Binormal = T × N
+    B = np.cross(T.T, N.T).T
+
+    # Tube surface
+    v = np.linspace(0, 2*np.pi, 30)
+    X, V = np.meshgrid(x_center, v)
+    Y, _ = np.meshgrid(y_center, v)
+    Z, _ = np.meshgrid(z_center, v)
+
+    # Add circular cross-section
+    X_tube = X + wire_radius * (N[0] * np.cos(V) + B[0] * np.sin(V))
+    Y_tube = Y + wire_radius * (N[1] * np.cos(V) + B[1] * np.sin(V))
+    Z_tube = Z + wire_radius * (N[2] * np.cos(V) + B[2] * np.sin(V))
+
+    return X_tube, Y_tube, Z_tube
+
+
+def spiral_surface(n_points=100):
+    """Archimedes-like spiral folded into a square grid; returns t, x, y, z."""
+    t = np.linspace(0, 4*np.pi, n_points)
+    r = 1 + 0.5 * np.sin(3*t)
+    x = r * np.cos(t)
+    y = r * np.sin(t)
+    z = t / (2*np.pi)
+    return t, x, y, z
+
+
+def bernoulli_surface(n_points=50, max_order=5):
+    """Bₙ(x) on [0, 1] for n = 0..max_order; returns x, n_vals, X, N, Z."""
+    x = np.linspace(0, 1, n_points)
+    n_vals = np.arange(0, max_order + 1)
+    X, N = np.meshgrid(x, n_vals)
+    Z = np.stack([np.polynomial.polynomial.polyval(x, BERNOULLI_COEFFS[n]) for n in n_vals])
+    return x, n_vals, X, N, Z
+
+
+class _ExpressionChecker(ast.NodeTransformer):
+    """Rejects anything but arithmetic on known names and ``np`` ufuncs,
+    counts array operations, and turns integer literals into floats so that
+    power towers overflow at once instead of building huge integers."""
+
+    def __init__(self, names):
+        self.names = names
+        self.ops = 0
+
+    def generic_visit(self, node):
+        if not isinstance(node, _EXPRESSION_NODES):
+            raise ValueError(f"{type(node).__name__} is not allowed in expressions")
+        if isinstance(node, (ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call)):
+            self.ops += 1
+        return super().generic_visit(node)
+
+    def visit_Name(self, node):
+        if node.id not in self.names:
+            raise ValueError(f"unknown name {node.id!r}")
+        return node
+
+    def visit_Attribute(self, node):
+        attr = node.attr
+        if not (isinstance(node.value, ast.Name) and node.value.id == "np") or attr.startswith("_") or not (
+                isinstance(getattr(np, attr, None), np.ufunc) or attr in SURFACE_NP_EXTRAS):
+            raise ValueError(f"{ast.unparse(node)} is not allowed in expressions")
+        return node
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError("only numeric constants are allowed in expressions")
+        return ast.copy_location(ast.Constant(float(node.value)), node)
+
+
+class ExpressionError(RuntimeError):
+    """An accepted ``function_surface`` expression failed while evaluating."""
+
+
+def compile_expression(expr, cells=1):
+    """Check a ``function_surface`` expression and compile it.
+
+    Raises ValueError for disallowed syntax or names, or if the expression
+    would cost more than ``MAX_EXPRESSION_COST`` element operations on a
+    grid of ``cells`` points.
+    """
+    if len(expr) > MAX_EXPRESSION_CHARS:
+        raise ValueError(f"expression is longer than {MAX_EXPRESSION_CHARS} characters")
+    checker = _ExpressionChecker(set(SURFACE_NAMESPACE) | {"x", "y"})
+    tree = ast.fix_missing_locations(checker.visit(ast.parse(expr, mode="eval")))
+    cost = checker.ops * cells
+    if cost > MAX_EXPRESSION_COST:
+        raise ValueError(f"estimated cost of {cost:,} element operations exceeds {MAX_EXPRESSION_COST:,}")
+    return compile(tree, "<expression>", "eval")
+
+
+def function_surface(expr, x_range=3.0, y_range=3.0, resolution=40):
+    """Evaluate ``z = f(x, y)`` on a square grid; returns X, Y, Z.
+
+    Only arithmetic, numpy ufuncs and a few elementary functions are
+    visible to ``expr`` (see ``compile_expression``). Raises ValueError if
+    the expression is rejected, and ExpressionError if it fails while
+    evaluating or does not yield a grid.
+    """
+    x = np.linspace(-x_range, x_range, resolution)
+    y = np.linspace(-y_range, y_range, resolution)
+    X, Y = np.meshgrid(x, y)
+    try:
+        code = compile_expression(expr, X.size)
+    except SyntaxError as e:
+        raise ValueError(f"SyntaxError: {e.msg}") from e
+    try:
+        Z = eval(code, {"__builtins__": {}}, {**SURFACE_NAMESPACE, "x": X, "y": Y})
+        Z = np.asarray(Z, dtype=float)
+        if Z.shape != X.shape:  # e.g. a constant expression
+            Z = np.broadcast_to(Z, X.shape).copy()
+    except MemoryError:
+        raise
+    except Exception as e:
+        raise ExpressionError(f"{type(e).__name__}: {e}") from e
+    return X, Y, Z
@@ -0,0 +1,217 @@
+"""Incremental store for integrated trajectories.
+
+A trajectory is identified by its solver, parameters, ``dt`` and initial
+state. The store keeps the computed prefix, so a request for more steps
+integrates only the missing tail from the last stored state (Euler steps are
+deterministic, so the result is identical to a full run) and a request for
+fewer steps is a view. Buffers grow geometrically, which keeps scrubbing a
+steps slider at O(Δsteps) amortised.
+
+Very long trajectories are moved to ``np.memmap`` files once they pass
+``spill_steps`` and are integrated ``chunk_steps`` at a time, so their working
+set stays bounded. Least-recently-used trajectories are dropped when the
+in-memory or on-disk total passes its byte budget.
+
+Integration runs under a lock per trajectory, not the store's own lock, so
+sessions asking for other trajectories (or for a prefix already stored)
+are never held up behind a long run.
+
+Solvers must accept ``dt``, ``steps`` and ``initial`` keyword arguments and
+return one array per state component, e.g. ``compute.attractors.solve_lorenz``.
+"""
+import functools
+import inspect
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+MAX_BYTES = 256 << 20          # in-memory budget
+MAX_DISK_BYTES = 4 << 30       # budget for spilled trajectories
+SPILL_STEPS = 2_000_000        # trajectories longer than this live on disk
+CHUNK_STEPS = 1 << 20          # integration chunk for long runs
+MIN_CAPACITY = 1024
+GROWTH = 1.5
+
+
+class _Trajectory:
+    """Growable per-component buffers; ``length`` points are valid."""
+
+    def __init__(self, n_components, dtype):
+        self.arrays = [np.empty(0, dtype) for _ in range(n_components)]
+        self.length = 0
+        self.path = None  # directory of .dat files once spilled
+        self.busy = False  # being extended; not evicted meanwhile
+
+    @property
+    def capacity(self):
+        return len(self.arrays[0])
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.arrays)
+
+    def last_state(self):
+        return tuple(float(a[self.length - 1]) for a in self.arrays)
+
+    def reserve(self, need, spill_steps, spill_root):
+        if need <= self.capacity:
+            return
+        capacity = max(need, int(self.capacity * GROWTH), MIN_CAPACITY)
+        if self.path is None and capacity > spill_steps:
+            self.path = Path(tempfile.mkdtemp(prefix="traj-", dir=spill_root))
+        if self.path is None:
+            grown = [np.empty(capacity, a.dtype) for a in self.arrays]
+            for new, old in zip(grown, self.arrays):
+                new[:self.length] = old[:self.length]
+        else:
+            grown = []
+            for i, old in enumerate(self.arrays):
+                file = self.path / f"{i}.dat"
+                if isinstance(old, np.memmap):
+                    old.flush()
+                with open(file, "ab") as fh:
+                    fh.truncate(capacity * old.itemsize)
+                new = np.memmap(file, dtype=old.dtype, mode="r+", shape=(capacity,))
+                if not isinstance(old, np.memmap):
+                    new[:self.length] = old[:self.length]
+                grown.append(new)
+        self.arrays = grown
+
+    def views(self, steps):
+        out = []
+        for a in self.arrays:
+            v = a[:steps].view()
+            v.flags.writeable = False
+            out.append(v)
+        return tuple(out)
+
+    def drop(self):
+        self.arrays = []
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+class TrajectoryStore:
+    """Thread-safe LRU store of trajectory prefixes."""
+
+    def __init__(self, max_bytes=MAX_BYTES, max_disk_bytes=MAX_DISK_BYTES,
+                 spill_steps=SPILL_STEPS, chunk_steps=CHUNK_STEPS, spill_dir=None):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.spill_steps = spill_steps
+        self.chunk_steps = chunk_steps
+        self.spill_dir = spill_dir
+        self._entries = OrderedDict()
+        self._key_locks = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def nbytes(self, on_disk=False):
+        return sum(t.nbytes for t in self._entries.values() if (t.path is not None) == on_disk)
+
+    def trajectory(self, solver, steps, dt, initial, **params):
+        """``solver(**params, dt=dt, steps=steps, initial=initial)``, reusing and
+        extending any stored prefix. Returns read-only views."""
+        initial = tuple(float(v) for v in initial)
+        key = (solver.__module__, solver.__qualname__, tuple(sorted(params.items())), float(dt), initial)
+        with self._lock:
+            traj = self._entries.get(key)
+            if traj is not None and traj.length >= steps:
+                self._entries.move_to_end(key)
+                return traj.views(steps)
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                # extended by another session while we waited, or evicted
+                traj = self._entries.get(key)
+                if traj is not None:
+                    traj.busy = True
+            try:
+                traj = self._extend(traj, solver, steps, dt, initial, params)
+            except BaseException:
+                if traj is not None:
+                    with self._lock:
+                        traj.busy = False
+                raise
+            with self._lock:
+                traj.busy = False
+                self._entries[key] = traj
+                self._entries.move_to_end(key)
+                self._evict()
+                return traj.views(steps)
+
+    def _extend(self, traj, solver, steps, dt, initial, params):
+        if traj is None:
+            first = solver(**params, dt=dt, steps=min(steps, self.chunk_steps), initial=initial)
+            traj = _Trajectory(len(first), first[0].dtype)
+            self._append(traj, first, 0)
+        while traj.length < steps:
+            n = min(steps - traj.length, self.chunk_steps)
+            tail = solver(**params, dt=dt, steps=n + 1, initial=traj.last_state())
+            self._append(traj, tail, 1)
+        return traj
+
+    def _append(self, traj, arrays, skip):
+        n = len(arrays[0]) - skip
+        traj.reserve(traj.length + n, self.spill_steps, self.spill_dir)
+        for buf, a in zip(traj.arrays, arrays):
+            buf[traj.length:traj.length + n] = a[skip:]
+        traj.length += n
+
+    def _evict(self):
+        # The most recent entry (last in the dict) is always kept, and so are
+        # entries being extended. A key's lock goes with its entry unless it
+        # is held; a session already waiting on it may then integrate
+        # alongside a newcomer, which costs time but not correctness.
+        for on_disk, budget in ((False, self.max_bytes), (True, self.max_disk_bytes)):
+            total = self.nbytes(on_disk)
+            for key in list(self._entries)[:-1]:
+                if total <= budget:
+                    break
+                traj = self._entries[key]
+                if (traj.path is not None) == on_disk and not traj.busy:
+                    total -= traj.nbytes
+                    del self._entries[key]
+                    traj.drop()
+                    lock = self._key_locks.get(key)
+                    if lock is not None and not lock.locked():
+                        del self._key_locks[key]
+
+    def clear(self):
+        with self._lock:
+            for key, traj in list(self._entries.items()):
+                if not traj.busy:
+                    traj.drop()
+                    del self._entries[key]
+            self._key_locks = {k: v for k, v in self._key_locks.items() if v.locked()}
+
+    def cached(self, solver):
+        """Wrap ``solver`` so calls with its usual signature go through the store."""
+        signature = inspect.signature(solver)
+
+        @functools.wraps(solver)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            steps, dt, initial = params.pop("steps"), params.pop("dt"), params.pop("initial")
+            return self.trajectory(solver, steps, dt, initial, **params)
+        return wrapper
+
+
+@functools.lru_cache(maxsize=1)
+def shared_store():
+    """The store shared by every session of this server process.
+
+    Built once and looked up without touching Streamlit: wrapping the class
+    in ``st.cache_resource`` on every rerun re-reads its source for the cache
+    key, which costs a module parse per rerun and can fail outright when
+    sessions parse concurrently on Python 3.11.
+    """
+    return TrajectoryStore()
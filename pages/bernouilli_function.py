@@ -1,30 +1,13 @@
 import streamlit as st
 import plotly.graph_objects as go
-import numpy as np
-from utils.plotting import plotly_config, apply_plotly_template
+from utils.plotting import plotly_chart, apply_plotly_template, add_download_buttons
+from compute.surfaces import bernoulli_surface
+from utils.instrument import start_trace, finish_trace, timed_kernel
 
 st.title("🌀 Bernouilli Polynomials")
-# Create meshgrid for 3D surface
-x = np.linspace(0, 1, 50)
-n_vals = np.arange(0, 6)
-X, N = np.meshgrid(x, n_vals)
 
-# Create the 3D surface data
-Z = np.zeros_like(X)
-for i, n in enumerate(n_vals):
-    for j, x_val in enumerate(x):
-        if n == 0:
-            Z[i,j] = 1
-        elif n == 1:
-            Z[i,j] = x_val - 0.5
-        elif n == 2:
-            Z[i,j] = x_val**2 - x_val + 1/6
-        elif n == 3:
-            Z[i,j] = x_val**3 - 3*x_val**2/2 + x_val/2
-        elif n == 4:
-            Z[i,j] = x_val**4 - 2*x_val**3 + x_val**2 - 1/30
-        elif n == 5:
-            Z[i,j] = x_val**5 - 5*x_val**4/2 + 5*x_val**3/3 - x_val/6
+start_trace("bernouilli_function")
+x, n_vals, X, N, Z = timed_kernel(bernoulli_surface)()
 
 # Create 3D surface plot
 fig = go.Figure(data=[go.Surface(
@@ -46,5 +29,15 @@ fig.update_layout(
     width=800,
     height=600
 )
-st.plotly_chart(fig, width='stretch', config=plotly_config())
+plotly_chart(fig, width='stretch')
+
+# --- Export ---
+st.divider()
+st.subheader("📁 Export & Info")
+add_download_buttons({
+    "x_points": len(x),
+    "max_order": int(n_vals[-1])
+}, "bernoulli", arrays={"x": X, "n": N, "B": Z})
 #fig.show()
+
+finish_trace()
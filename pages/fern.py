@@ -1,73 +1,106 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-from utils.plotting import plotly_config, apply_plotly_template, add_download_buttons, run_ollama_command
-from functools import lru_cache
+from utils.plotting import plotly_chart, apply_plotly_template, add_download_buttons, add_dimension_report
+from compute.fractals import FERN_BOUNDS, barnsley_fern as compute_fern, fern_viewport, iter_fern
+from utils.instrument import start_trace, finish_trace, timed_kernel
+from utils.array_cache import disk_cache
+from utils.progressive import progressive, preview_to
 
 st.title("🌀 Barnsley Fern")
 
-def barnsley_fern(n_points=50000):
-    # Initialize arrays for x and y coordinates
-    x = np.zeros(n_points)
-    y = np.zeros(n_points)
-    
-    # Barnsley fern transformation probabilities and coefficients
-    # Each transformation has a probability and 6 coefficients (a-f)
-    transformations = [
-        (0.01, [0, 0, 0, 0.16, 0, 0]),      # Stem (1%)
-        (0.85, [0.85, 0.04, -0.04, 0.85, 0, 1.6]),  # Main stem (85%)
-        (0.07, [0.2, -0.26, 0.23, 0.22, 0, 1.6]),   # Left side (7%)
-        (0.07, [-0.15, 0.28, 0.26, 0.24, 0, 0.44])  # Right side (7%)
-    ]
-    
-    # Generate points
-    for i in range(1, n_points):
-        # Choose transformation based on probabilities
-        rand = np.random.random()
-        cumulative = 0
-        for prob, coeffs in transformations:
-            cumulative += prob
-            if rand <= cumulative:
-                a, b, c, d, e, f = coeffs
-                x[i] = a * x[i-1] + b * y[i-1] + e
-                y[i] = c * x[i-1] + d * y[i-1] + f
-                break
-    
-    return x, y
+# --- Deep zoom state: a stack of viewports (x0, x1, y0, y1); empty = whole fern ---
+if "fern_views" not in st.session_state:
+    st.session_state.fern_views = []
+views = st.session_state.fern_views
 
-# Generate fern points
-x, y = barnsley_fern(50000)
+col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+with col1:
+    zoom = st.select_slider("Zoom per click", options=[2, 4, 8, 16], value=4)
+with col2:
+    target = st.select_slider("Points per view", options=[50_000, 100_000, 200_000], value=200_000)
+with col3:
+    if st.button("🔍 Zoom out", disabled=not views):
+        views.pop()
+with col4:
+    if st.button("↺ Reset", disabled=not views):
+        views.clear()
+
+# A click on the previous chart zooms in around the clicked point. Each
+# depth gets its own chart key, so a stale selection never re-applies.
+event = st.session_state.get(f"fern_chart_{len(views)}")
+clicked = event.get("selection", {}).get("points") if event else None
+if clicked:
+    x0, x1, y0, y1 = views[-1] if views else FERN_BOUNDS
+    cx, cy = clicked[0]["x"], clicked[0]["y"]
+    hw, hh = (x1 - x0) / (2 * zoom), (y1 - y0) / (2 * zoom)
+    views.append((cx - hw, cx + hw, cy - hh, cy + hh))
+view = views[-1] if views else None
+magnification = (FERN_BOUNDS[3] - FERN_BOUNDS[2]) / (view[3] - view[2]) if view else 1
 
 # Create the plot
-fig = go.Figure()
+def build_figure(points):
+    x, y = points
+    fig = go.Figure()
+
+    # Add scatter plot with green color
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        mode='markers',
+        marker=dict(
+            color='green',
+            size=1,
+            opacity=0.6
+        ),
+        showlegend=False
+    ))
+
+    # Update layout for better visualization
+    apply_plotly_template(fig)
+    fig.update_layout(
+        title="Green Fractal Fern" + (f" — ×{magnification:,.0f}" if view else ""),
+        xaxis_title="X Coordinate",
+        yaxis_title="Y Coordinate",
+        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+        width=800,
+        height=600,
+        plot_bgcolor='black'
+    )
+    if view:
+        fig.update_xaxes(range=view[:2])
+        fig.update_yaxes(range=view[2:])
+    return fig
 
-# Add scatter plot with green color
-fig.add_trace(go.Scatter(
-    x=x,
-    y=y,
-    mode='markers',
-    marker=dict(
-        color='green',
-        size=1,
-        opacity=0.6
-    ),
-    showlegend=False
-))
+barnsley_fern = disk_cache(compute_fern)
+points_in_view = timed_kernel(fern_viewport, cache=disk_cache)
 
-# Update layout for better visualization
-apply_plotly_template(fig)
-fig.update_layout(
-    title="Green Fractal Fern",
-    xaxis_title="X Coordinate",
-    yaxis_title="Y Coordinate",
-    xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-    yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-    width=800,
-    height=600,
-    plot_bgcolor='black'
-)
+start_trace("fern", n_points=50000, view=view, target=target)
+chart = st.empty()
+if view is None:
+    # Whole fern: the chaos-game orbit, drawn as it grows on a cold cache
+    x, y = progressive(barnsley_fern, iter_fern, preview_to(chart, build_figure, width='content'), 50000)
+else:
+    # Zoomed: regenerate points inside the viewport only, at constant density
+    x, y = points_in_view(*view, target=target)
 
 # Show the plot
-st.plotly_chart(fig, width='content', config=plotly_config())
+with chart:
+    plotly_chart(build_figure((x, y)), width='content', key=f"fern_chart_{len(views)}",
+                 on_select="rerun", selection_mode="points")
+st.caption("🔍 Click the fern to zoom in around that point"
+           + (f" · depth {len(views)}, ×{magnification:,.0f}, {len(x):,} points in view" if view else ""))
+
+# --- Fractal dimension (the fern's box-counting dimension is about 1.7-1.8) ---
+add_dimension_report(np.column_stack((x, y)), key="fern")
+
+# --- Export ---
+st.divider()
+st.subheader("📁 Export & Info")
+add_download_buttons({"n_points": len(x), "view": list(view) if view else "full"}, "fern",
+                     arrays={"x": x, "y": y})
 
 #fig.show()
+
+finish_trace()
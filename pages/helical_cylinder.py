@@ -1,58 +1,23 @@
 import streamlit as st
 import plotly.graph_objects as go
-import numpy as np
-from utils.plotting import plotly_config, apply_plotly_template, add_download_buttons
-from functools import lru_cache
+from utils.plotting import (plotly_chart, apply_plotly_template, add_download_buttons, add_mesh_download_buttons,
+                            add_curvature_controls)
+from compute.surfaces import cylindrical_wire
+from utils.instrument import start_trace, finish_trace, timed_kernel
+from utils.array_cache import disk_cache
 
 st.title("🌀 Helical Cylinder")
 
-
-def cylindrical_wire(radius=0.1, turns=3, height=4, steps=200, wire_radius=0.05):
-    # Central helix
-    t = np.linspace(0, turns * 2*np.pi, steps)
-    x_center = np.cos(t)
-    y_center = np.sin(t)
-    z_center = (height / (turns * 2*np.pi)) * t
-
-    # Create tube around helix (Frenet frame approximation)
-    # Tangent, Normal, Binormal vectors
-    dx = -np.sin(t)
-    dy = np.cos(t)
-    dz = height / (turns * 2*np.pi) * np.ones_like(t)
-    
-    # Normalize tangent
-    T = np.vstack([dx, dy, dz])
-    T_norm = np.linalg.norm(T, axis=0)
-    T = T / T_norm
-
-    # Approximate normal (avoiding |T| issues)
-    N = np.vstack([-np.cos(t), -np.sin(t), np.zeros_like(t)])
-    N_norm = np.linalg.norm(N, axis=0)
-    N = N / N_norm
-
-    # Binormal = T × N
-    B = np.cross(T.T, N.T).T
-
-    # Tube surface
-    v = np.linspace(0, 2*np.pi, 30)
-    X, V = np.meshgrid(x_center, v)
-    Y, _ = np.meshgrid(y_center, v)
-    Z, _ = np.meshgrid(z_center, v)
-
-    # Add circular cross-section
-    X_tube = X + wire_radius * (N[0] * np.cos(V) + B[0] * np.sin(V))
-    Y_tube = Y + wire_radius * (N[1] * np.cos(V) + B[1] * np.sin(V))
-    Z_tube = Z + wire_radius * (N[2] * np.cos(V) + B[2] * np.sin(V))
-
-    return X_tube, Y_tube, Z_tube
-
 # Generate
-x, y, z = cylindrical_wire(wire_radius=0.08, turns=2.5, height=3)
-
-fig = go.Figure(data=go.Surface(
-    x=x, y=y, z=z,
-    colorscale=[[0, 'gold'], [1, 'goldenrod']],  # metallic wire
-    showscale=False,
+start_trace("helical_cylinder", wire_radius=0.08, turns=2.5, height=3)
+x, y, z = timed_kernel(cylindrical_wire, cache=disk_cache)(wire_radius=0.08, turns=2.5, height=3)
+values, style, overlays = add_curvature_controls(x, y, z, key="helical_cylinder")
+colour = dict(colorscale=[[0, 'gold'], [1, 'goldenrod']], showscale=False)  # metallic wire
+colour.update(style)
+
+fig = go.Figure(data=[go.Surface(
+    x=x, y=y, z=z, surfacecolor=values,
+    **colour,
     lighting=dict(
         ambient=0.4,
         diffuse=0.8,
@@ -61,7 +26,7 @@ fig = go.Figure(data=go.Surface(
         fresnel=0.8
     ),
     lightposition=dict(x=5, y=5, z=5)
-))
+), *overlays])
 apply_plotly_template(fig)
 fig.update_layout(
     title="🌀 Cylindrical Wire (3D Tube)",
@@ -76,5 +41,17 @@ fig.update_layout(
     paper_bgcolor='rgb(10,15,30)',
     width=800, height=600
 )
-st.plotly_chart(fig, width='content', config=plotly_config())
-#fig.show()
\ No newline at end of file
+plotly_chart(fig, width='content')
+
+# --- Export ---
+st.divider()
+st.subheader("📁 Export & Info")
+add_download_buttons({
+    "wire_radius": 0.08,
+    "turns": 2.5,
+    "height": 3
+}, "helical_cylinder", arrays={"x": x, "y": y, "z": z})
+add_mesh_download_buttons(x, y, z, "helical_cylinder")
+#fig.show()
+
+finish_trace()
@@ -1,8 +1,11 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-from utils.plotting import plotly_config, apply_plotly_template, add_download_buttons
-from functools import lru_cache
+from utils.plotting import (plotly_chart, apply_plotly_template, add_download_buttons, add_mesh_download_buttons,
+                            surface_mesh3d, add_curvature_controls)
+from compute.surfaces import klein_bottle, klein_bottle_4d, rotation_frames, ROTATION_PLANES
+from utils.instrument import start_trace, finish_trace, timed_kernel
+from utils.array_cache import disk_cache
 
 st.title("🌀 Klein Bottle")
 
@@ -17,15 +20,17 @@ if mode == "Lesson: The Impossible Bottle":
       - Reduce **Twist** → see symmetry emerge  
       - Switch to *Figure-8* → smoother neck  
       - Toggle *Wireframe* → see the "pinch"  
-    📚 A true Klein bottle needs 4D to avoid self-intersection!
+    📚 A true Klein bottle needs 4D to avoid self-intersection — pick *4D embedding* and watch it turn.
     """, icon="🔍")
 
 # --- Parameter controls ---
 with st.expander("🎛️ Geometry & Resolution", expanded=False):
     col1, col2 = st.columns(2)
     with col1:
-        immersion = st.selectbox("Immersion type", ["Classic", "Figure-8"], index=0)
-        twist = st.slider("Twist (phase offset)", 0.0, 2.0, 1.0 if immersion == "Classic" else 0.5, step=0.05)
+        immersion = st.selectbox("Immersion type", ["Classic", "Figure-8", "4D embedding"], index=0)
+        is_4d = immersion == "4D embedding"
+        if not is_4d:
+            twist = st.slider("Twist (phase offset)", 0.0, 2.0, 1.0 if immersion == "Classic" else 0.5, step=0.05)
         radius = st.slider("Main radius", 0.5, 3.0, 2.0, step=0.1)
         neck_scale = st.slider("Neck scale", 0.2, 2.0, 1.0, step=0.1)
     with col2:
@@ -33,6 +38,15 @@ with st.expander("🎛️ Geometry & Resolution", expanded=False):
         v_steps = st.slider("V resolution", 30, 200, 100, step=10)
         opacity = st.slider("Opacity", 0.3, 1.0, 0.85, step=0.05)
 
+if is_4d:
+    with st.expander("🌌 4D Rotation", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        rotation_plane = col1.selectbox("Rotation plane", ROTATION_PLANES, index=0,
+                                        help="Planes with w turn the bottle through 4D; the others are ordinary 3D rotations")
+        n_frames = col2.slider("Frames per turn", 24, 120, 64, step=8)
+        distance = col3.slider("4D camera distance", 1.5, 6.0, 3.0, step=0.5,
+                               help="Perspective from w: closer exaggerates depth along the fourth axis")
+
 with st.expander("🎨 Visual Style", expanded=False):
     col1, col2 = st.columns(2)
     with col1:
@@ -41,40 +55,44 @@ with st.expander("🎨 Visual Style", expanded=False):
         show_wireframe = st.toggle("Wireframe", value=True)
     with col2:
         show_contours = st.toggle("Contour lines", value=False)
-        animate_rotation = st.toggle("🔄 Auto-rotate", value=False)
-
-# --- Cached parametrisation ---
-@lru_cache(maxsize=8)
-def klein_bottle_cached(immersion, twist, radius, neck_scale, u_steps, v_steps):
-    u = np.linspace(0, 2*np.pi, u_steps)
-    v = np.linspace(0, 2*np.pi, v_steps)
-    U, V = np.meshgrid(u, v)
-    
-    if immersion == "Classic":
-        # Standard immersion (self-intersecting 'neck')
-        x = (radius + np.cos(U/2 + twist*np.pi) * np.sin(V) - np.sin(U/2 + twist*np.pi) * np.sin(2*V)) * np.cos(U)
-        y = (radius + np.cos(U/2 + twist*np.pi) * np.sin(V) - np.sin(U/2 + twist*np.pi) * np.sin(2*V)) * np.sin(U)
-        z = neck_scale * (np.sin(U/2 + twist*np.pi) * np.sin(V) + np.cos(U/2 + twist*np.pi) * np.sin(2*V))
-    else:  # Figure-8 immersion (Robert Israel parametrisation — smoother)
-        R = radius
-        a = neck_scale
-        x = (R + a * np.cos(V/2) * np.sin(U) - a * np.sin(V/2) * np.sin(2*U)) * np.cos(V)
-        y = (R + a * np.cos(V/2) * np.sin(U) - a * np.sin(V/2) * np.sin(2*U)) * np.sin(V)
-        z = a * np.sin(V/2) * np.sin(U) + a * np.cos(V/2) * np.sin(2*U)
-    
-    return x, y, z
-
-x, y, z = klein_bottle_cached(immersion, twist, radius, neck_scale, u_steps, v_steps)
+        animate_rotation = st.toggle("🔄 Auto-rotate", value=False, disabled=is_4d,
+                                     help="The 4D embedding animates its own rotation")
+        weld_seams = st.toggle("🧵 Weld seams", value=False, disabled=is_4d or (show_wireframe and show_contours),
+                               help="An indexed mesh with the seam vertices merged: smooth shading across the seams, twice the download")
+
+# --- Cached parametrisation (on disk, survives reruns and restarts) ---
+klein_bottle_cached = timed_kernel(klein_bottle, cache=disk_cache)
+klein_bottle_4d_cached = timed_kernel(klein_bottle_4d, cache=disk_cache)
+rotation_frames_timed = timed_kernel(rotation_frames)
+
+if is_4d:
+    start_trace("klein", immersion=immersion, radius=radius, neck_scale=neck_scale, u_steps=u_steps,
+                v_steps=v_steps, plane=rotation_plane, n_frames=n_frames, distance=distance)
+    x, y, z, w = klein_bottle_4d_cached(radius, neck_scale, u_steps, v_steps)
+    # Every frame's 3D shadow in one batch; frame 0 is the unrotated view.
+    frames_3d = rotation_frames_timed((x, y, z, w), rotation_plane, n_frames, distance)
+    px, py, pz = frames_3d[0]
+else:
+    start_trace("klein", immersion=immersion, twist=twist, radius=radius, neck_scale=neck_scale,
+                u_steps=u_steps, v_steps=v_steps, animate=animate_rotation)
+    x, y, z = klein_bottle_cached(immersion, twist, radius, neck_scale, u_steps, v_steps)
+    px, py, pz = x, y, z
+    values, style, overlays = add_curvature_controls(x, y, z, key="klein")
 
 # --- Build surface ---
 surface_kwargs = dict(
-    x=x, y=y, z=z,
+    x=px, y=py, z=pz,
     colorscale=colorscale,
     opacity=opacity,
     lighting=dict(ambient=0.7, diffuse=0.8, specular=0.3, roughness=0.5),
     lightposition=dict(x=100, y=200, z=0),
     showscale=False
 )
+if is_4d:
+    # Colour by the fourth coordinate: the sheets that cross in 3D differ in w.
+    surface_kwargs.update(surfacecolor=w.astype(np.float32), cmin=float(w.min()), cmax=float(w.max()))
+elif values is not None:
+    surface_kwargs.update(surfacecolor=values, **style)
 
 if show_wireframe:
     surface_kwargs.update(
@@ -85,10 +103,38 @@ if show_wireframe:
         )
     )
 
-fig = go.Figure(data=go.Surface(**surface_kwargs))
+if is_4d or (show_wireframe and show_contours) or not weld_seams:
+    # The surface grid, sent as float32 (typed arrays): the smallest payload,
+    # and the one animation frames and contour lines need
+    for axis in "xyz":
+        surface_kwargs[axis] = np.asarray(surface_kwargs[axis], dtype=np.float32)
+    fig = go.Figure(data=go.Surface(**surface_kwargs))
+else:
+    # Closed in u and v: an indexed mesh with the seams welded
+    surface_kwargs.pop("contours", None)
+    surface_kwargs["intensity"] = surface_kwargs.pop("surfacecolor", None)
+    fig = go.Figure(data=surface_mesh3d(surface_kwargs.pop("x"), surface_kwargs.pop("y"), surface_kwargs.pop("z"),
+                                        **surface_kwargs))
+if not is_4d:
+    fig.add_traces(overlays)
 
 # --- Animation: rotation ---
-if animate_rotation:
+if is_4d:
+    # Frames carry only float32 geometry (sent as typed arrays); colour and
+    # styling stay on the base trace.
+    fig.frames = [go.Frame(data=[go.Surface(x=fx, y=fy, z=fz)], traces=[0], name=str(i))
+                  for i, (fx, fy, fz) in enumerate(frames_3d)]
+    fig.update_layout(
+        updatemenus=[dict(
+            type="buttons",
+            buttons=[dict(label="▶ Play", method="animate",
+                          args=[None, {"frame": {"duration": 50, "redraw": True}, "transition": {"duration": 0},
+                                       "fromcurrent": True, "mode": "immediate"}]),
+                     dict(label="⏸ Pause", method="animate",
+                          args=[[None], {"frame": {"duration": 0, "redraw": False}, "mode": "immediate"}])]
+        )]
+    )
+elif animate_rotation:
     # Add smooth camera rotation
     frames = []
     for i, theta in enumerate(np.linspace(0, 2*np.pi, 48)):
@@ -120,8 +166,18 @@ fig.update_layout(
     height=650,
     margin=dict(l=0, r=0, t=50, b=0)
 )
+if is_4d:
+    # Fixed axes across all frames, or the scene would rescale as the shadow turns.
+    lo, hi = frames_3d.min(axis=(0, 2, 3)), frames_3d.max(axis=(0, 2, 3))
+    fig.update_layout(
+        title=f"Klein Bottle — 4D embedding, turning in the {rotation_plane} plane",
+        scene=dict(
+            xaxis_range=[lo[0], hi[0]], yaxis_range=[lo[1], hi[1]], zaxis_range=[lo[2], hi[2]],
+            aspectmode='manual', aspectratio=dict(zip("xyz", (hi - lo) / (hi - lo).max()))
+        )
+    )
 
-st.plotly_chart(fig, width='stretch', config=plotly_config())
+plotly_chart(fig, width='stretch')
 
 # --- Export & info ---
 st.divider()
@@ -130,20 +186,33 @@ st.subheader("📐 Geometry & Export")
 # Sample a few points for metadata
 n = min(5, len(x.ravel()))
 sample_z = z.ravel()[:n]
-add_download_buttons({
+params = {
     "immersion": immersion,
-    "twist": twist,
     "radius": radius,
     "neck_scale": neck_scale,
     "u_steps": u_steps,
     "v_steps": v_steps,
     "z_min": float(z.min()),
     "z_max": float(z.max()),
-    "self_intersection": "Yes (in 3D)"  # always true here!
-}, "klein")
+}
+if is_4d:
+    params.update(rotation_plane=rotation_plane, n_frames=n_frames, distance=distance,
+                  w_min=float(w.min()), w_max=float(w.max()), self_intersection="No (in 4D)")
+    arrays = {"x": x, "y": y, "z": z, "w": w}
+else:
+    params.update(twist=twist, self_intersection="Yes (in 3D)")  # always true for an immersion
+    arrays = {"x": x, "y": y, "z": z}
+add_download_buttons(params, "klein", arrays=arrays)
+# Meshes are 3D: export the projection shown in the first frame.
+add_mesh_download_buttons(px, py, pz, "klein")
 
 # --- Fun fact / teaching note ---
 st.caption("""
 💡 **Fun fact**: The Klein bottle has *no inside or outside* — like a Möbius strip, but closed.
 In 4D, it can exist without self-intersection. Here, the 'neck' passes through the 'body' — an artifact of 3D projection.
-""")
\ No newline at end of file
+""" if not is_4d else """
+💡 **Fun fact**: Colour is the fourth coordinate *w*. Where the shadow's tube passes through itself, the two sheets
+have different colours: they are apart in 4D. Rotating in a plane with *w* turns the bottle through the fourth dimension.
+""")
+
+finish_trace()
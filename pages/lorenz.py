@@ -1,7 +1,15 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-from utils.plotting import plotly_config, apply_plotly_template, add_download_buttons, run_ollama_command
+from utils.plotting import (plotly_chart, apply_plotly_template, add_download_buttons, add_recurrence_report,
+                            density_volume_figure)
+from utils.llm import run_ollama_command
+from compute.attractors import solve_lorenz as compute_lorenz
+from compute.trajectories import shared_store
+from compute.density import lorenz_density, iter_lorenz_density
+from utils.array_cache import disk_cache
+from utils.instrument import start_trace, finish_trace, timed_kernel
+from utils.progressive import stream, refine, preview_to, progressive
 #from functools import lru_cache
 
 st.title("🌀 Lorenz Attractor")
@@ -22,105 +30,154 @@ with st.expander("🎛️ Parameters", expanded=False):
     with col5:
         steps = st.slider("Steps", 500, 20_000, 10_000, step=500)
 
-#@lru_cache(maxsize=16)
-def solve_lorenz(sigma, rho, beta, dt, steps):
-    x, y, z = np.zeros(steps), np.zeros(steps), np.zeros(steps)
-    x[0], y[0], z[0] = 0.1, 0.0, 0.0
-    s, r, b = float(sigma), float(rho), float(beta)
-    for i in range(steps - 1):
-        dx = s * (y[i] - x[i])
-        dy = x[i] * (r - z[i]) - y[i]
-        dz = x[i] * y[i] - b * z[i]
-        x[i+1] = x[i] + dx * dt
-        y[i+1] = y[i] + dy * dt
-        z[i+1] = z[i] + dz * dt
-    return x, y, z
-
-x, y, z = solve_lorenz(sigma, rho, beta, dt, steps)
+# --- View ---
+# Past a few tens of thousands of steps a line is a scribble; the density
+# view bins millions of samples into voxels instead.
+DENSITY = "🧊 Density volume"
+view = st.radio("View", ["🌀 Trajectory", DENSITY], horizontal=True, label_visibility="collapsed")
+if view == DENSITY:
+    col1, col2 = st.columns(2)
+    samples = col1.select_slider("Samples", options=[1_000_000, 2_000_000, 5_000_000, 10_000_000, 20_000_000],
+                                 value=5_000_000, format_func=lambda n: f"{n // 1_000_000}M")
+    resolution = col2.select_slider("Voxels per axis", options=[32, 48, 64], value=48)
 
 # --- Animation toggle ---
-animate = st.toggle("⏯️ Animate trajectory (slower)", value=False)
-
-if animate:
-    # Use frames for animation — efficient for ≤5k points
-    max_frames = min(200, len(x) // 50)
-    step_interval = len(x) // max_frames
-    frames = []
-    for i in range(1, max_frames + 1):
-        end = i * step_interval
-        frames.append(go.Frame(
-            data=[go.Scatter3d(x=x[:end], y=y[:end], z=z[:end])],
-            name=str(end)
-        ))
+animate = view != DENSITY and st.toggle("⏯️ Animate trajectory (slower)", value=False)
+
+# --- Figure ---
+def build_figure(xyz):
+    x, y, z = xyz
+    if animate:
+        # Use frames for animation — efficient for ≤5k points
+        max_frames = min(200, len(x) // 50)
+        step_interval = len(x) // max_frames
+        frames = []
+        for i in range(1, max_frames + 1):
+            end = i * step_interval
+            frames.append(go.Frame(
+                data=[go.Scatter3d(x=x[:end], y=y[:end], z=z[:end])],
+                name=str(end)
+            ))
+    
+        fig = go.Figure(
+            data=[go.Scatter3d(
+                x=x[:1], y=y[:1], z=z[:1],
+                mode='lines',
+                line=dict(color=z[:1], colorscale='Plasma', width=2),
+                hovertemplate='X: %{x:.2f}<br>Y: %{y:.2f}<br>Z: %{z:.2f}<extra></extra>'
+            )],
+            frames=frames
+        )
     
-    fig = go.Figure(
-        data=[go.Scatter3d(
-            x=x[:1], y=y[:1], z=z[:1],
+        fig.update_layout(
+            updatemenus=[dict(
+                type="buttons",
+                showactive=False,
+                buttons=[dict(label="▶ Play",
+                              method="animate",
+                              args=[None, {"frame": {"duration": 30, "redraw": True},
+                                           "fromcurrent": True, "transition": {"duration": 0}}]),
+                        dict(label="⏸ Pause",
+                             method="animate",
+                             args=[[None], {"frame": {"duration": 0, "redraw": False},
+                                            "mode": "immediate", "transition": {"duration": 0}}])]
+            )],
+            sliders=[{
+                "pad": {"b": 10, "t": 50},
+                "len": 0.9,
+                "x": 0.1,
+                "y": 0,
+                "steps": [{"args": [[f.name], {"frame": {"duration": 0, "redraw": True}, "mode": "immediate"}],
+                           "label": f.name, "method": "animate"} for f in frames]
+            }]
+        )
+    else:
+        # Static (fast) version
+        fig = go.Figure(data=go.Scatter3d(
+            x=x, y=y, z=z,
             mode='lines',
-            line=dict(color=z[:1], colorscale='Plasma', width=2),
+            line=dict(color=z, colorscale='Plasma', width=2),
             hovertemplate='X: %{x:.2f}<br>Y: %{y:.2f}<br>Z: %{z:.2f}<extra></extra>'
-        )],
-        frames=frames
-    )
-    
+        ))
+
+    apply_plotly_template(fig)
     fig.update_layout(
-        updatemenus=[dict(
-            type="buttons",
-            showactive=False,
-            buttons=[dict(label="▶ Play",
-                          method="animate",
-                          args=[None, {"frame": {"duration": 30, "redraw": True},
-                                       "fromcurrent": True, "transition": {"duration": 0}}]),
-                    dict(label="⏸ Pause",
-                         method="animate",
-                         args=[[None], {"frame": {"duration": 0, "redraw": False},
-                                        "mode": "immediate", "transition": {"duration": 0}}])]
-        )],
-        sliders=[{
-            "pad": {"b": 10, "t": 50},
-            "len": 0.9,
-            "x": 0.1,
-            "y": 0,
-            "steps": [{"args": [[f.name], {"frame": {"duration": 0, "redraw": True}, "mode": "immediate"}],
-                       "label": f.name, "method": "animate"} for f in frames]
-        }]
+        title=f"Lorenz Attractor (σ={sigma}, ρ={rho}, β={beta:.2f})",
+        scene=dict(
+            xaxis_title='X', yaxis_title='Y', zaxis_title='Z',
+            aspectmode='data',
+            camera=dict(eye=dict(x=1.2, y=1.2, z=0.8))
+        ),
+        height=600
     )
+    return fig
+
+def build_density_figure(result):
+    counts, bounds = result
+    fig = density_volume_figure(counts, bounds)
+    apply_plotly_template(fig)
+    fig.update_layout(title=f"Lorenz invariant measure (σ={sigma}, ρ={rho}, β={beta:.2f})", height=600)
+    return fig
+
+if view == DENSITY:
+    # Walkers are binned as they go, so memory and payload depend on the
+    # voxel grid only; voxels fill in while they run.
+    start_trace("lorenz", view="density", sigma=sigma, rho=rho, beta=beta, dt=dt, samples=samples,
+                resolution=resolution)
+    chart = st.empty()
+    try:
+        counts, bounds = progressive(disk_cache(lorenz_density), iter_lorenz_density,
+                                     preview_to(chart, build_density_figure), sigma, rho, beta, dt, samples, resolution)
+    except ValueError as e:  # a diverging trajectory has no grid to bin into
+        st.warning(f"⚠️ {e}")
+    else:
+        with chart:
+            plotly_chart(build_density_figure((counts, bounds)), width='stretch')
+
+        st.divider()
+        st.subheader("📁 Export & Info")
+        centres = [lo + (np.arange(resolution) + 0.5) * (hi - lo) / resolution for lo, hi in zip(*bounds)]
+        X, Y, Z = np.meshgrid(*centres, indexing="ij")
+        add_download_buttons({
+            "sigma": sigma,
+            "rho": rho,
+            "beta": beta,
+            "dt": dt,
+            "samples": samples,
+            "resolution": resolution,
+            "outside_grid": int(samples - counts.sum())
+        }, "lorenz_density", arrays={"x": X.ravel(), "y": Y.ravel(), "z": Z.ravel(), "visits": counts.ravel()})
 else:
-    # Static (fast) version
-    fig = go.Figure(data=go.Scatter3d(
-        x=x, y=y, z=z,
-        mode='lines',
-        line=dict(color=z, colorscale='Plasma', width=2),
-        hovertemplate='X: %{x:.2f}<br>Y: %{y:.2f}<br>Z: %{z:.2f}<extra></extra>'
-    ))
-
-apply_plotly_template(fig)
-fig.update_layout(
-    title=f"Lorenz Attractor (σ={sigma}, ρ={rho}, β={beta:.2f})",
-    scene=dict(
-        xaxis_title='X', yaxis_title='Y', zaxis_title='Z',
-        aspectmode='data',
-        camera=dict(eye=dict(x=1.2, y=1.2, z=0.8))
-    ),
-    height=600
-)
-
-st.plotly_chart(fig, width='stretch', config=plotly_config())
-#fig.write_image("lorenz_thumb.png", width=300, height=200)
-
-# --- Export & metadata ---
-st.divider()
-st.subheader("📁 Export & Info")
-add_download_buttons({
-    "sigma": sigma,
-    "rho": rho,
-    "beta": beta,
-    "dt": dt,
-    "steps": steps,
-    "x_final": float(x[-1]),
-    "y_final": float(y[-1]),
-    "z_final": float(z[-1])
-}, "lorenz")
+    # One store per server process: longer runs extend the stored prefix,
+    # shorter ones are views into it.
+    trajectories = shared_store()
+    solve_lorenz = timed_kernel(compute_lorenz, cache=trajectories.cached)
+    start_trace("lorenz", sigma=sigma, rho=rho, beta=beta, dt=dt, steps=steps, animate=animate)
+
+    # Coarse prefixes first: each refinement only integrates the new tail.
+    chart = st.empty()
+    x, y, z = stream(refine(lambda n: solve_lorenz(sigma, rho, beta, dt, n), steps, first=1000),
+                     preview_to(chart, build_figure))
+
+    with chart:
+        plotly_chart(build_figure((x, y, z)), width='stretch')
+    #fig.write_image("lorenz_thumb.png", width=300, height=200)
+
+    add_recurrence_report(np.column_stack((x, y, z)), key="lorenz")
+
+    # --- Export & metadata ---
+    st.divider()
+    st.subheader("📁 Export & Info")
+    add_download_buttons({
+        "sigma": sigma,
+        "rho": rho,
+        "beta": beta,
+        "dt": dt,
+        "steps": steps,
+        "x_final": float(x[-1]),
+        "y_final": float(y[-1]),
+        "z_final": float(z[-1])
+    }, "lorenz", arrays={"x": x, "y": y, "z": z})
 
 # --- Ollama AI helper (optional toggle) ---
 #if st.toggle("🤖 Ask AI for explanation (local Ollama)", value=False):
@@ -147,4 +204,4 @@ if question and st.button("➤ Submit", type="primary"):
 
     
 
-
+finish_trace()
@@ -1,7 +1,14 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-from utils.plotting import plotly_config, apply_plotly_template
+from utils.plotting import (plotly_chart, apply_plotly_template, add_download_buttons, add_recurrence_report,
+                            density_volume_figure)
+from compute.attractors import solve_rossler as compute_rossler
+from compute.density import rossler_density, iter_rossler_density
+from compute.trajectories import shared_store
+from utils.array_cache import disk_cache
+from utils.instrument import start_trace, finish_trace, timed_kernel
+from utils.progressive import progressive, preview_to
 
 st.title("🌀 Rössler Attractor")
 
@@ -14,49 +21,90 @@ c = 5.7
 dt = 0.01
 steps = 30000
 
-# Initialize arrays for x, y, z coordinates
-x = np.zeros(steps)
-y = np.zeros(steps)
-z = np.zeros(steps)
-
-# Initial conditions
-x[0] = 0.1
-y[0] = 0.0
-z[0] = 0.0
-
-# Integration using Euler's method
-for i in range(steps-1):
-    dx = -y[i] - z[i]
-    dy = x[i] + a * y[i]
-    dz = b + z[i] * (x[i] - c)
-    
-    x[i+1] = x[i] + dx * dt
-    y[i+1] = y[i] + dy * dt
-    z[i+1] = z[i] + dz * dt
-
-# Create 3D scatter plot
-fig = go.Figure(data=[go.Scatter3d(
-    x=x, y=y, z=z,
-    mode='lines',
-    line=dict(width=1, color=z, colorscale='Viridis'),
-    hovertemplate='<b>X:</b> %{x:.2f}<br><b>Y:</b> %{y:.2f}<br><b>Z:</b> %{z:.2f}<extra></extra>'
-)])
-
-# Update layout
-apply_plotly_template(fig)
-fig.update_layout(
-    title='Rössler Attractor',
-    scene=dict(
-        xaxis_title='X',
-        yaxis_title='Y',
-        zaxis_title='Z',
-        aspectmode='cube'
-    ),
-    width=800,
-    height=600,
-    margin=dict(l=50, r=50, b=50, t=100)
-)
-
-# Show the plot
-st.plotly_chart(fig, width='stretch', config=plotly_config())
+# Past a few tens of thousands of steps a line is a scribble; the density
+# view bins millions of samples into voxels instead.
+DENSITY = "🧊 Density volume"
+view = st.radio("View", ["🌀 Trajectory", DENSITY], horizontal=True, label_visibility="collapsed")
 
+def build_density_figure(result):
+    counts, bounds = result
+    fig = density_volume_figure(counts, bounds)
+    apply_plotly_template(fig)
+    fig.update_layout(title="Rössler invariant measure", height=600)
+    return fig
+
+if view == DENSITY:
+    col1, col2 = st.columns(2)
+    samples = col1.select_slider("Samples", options=[1_000_000, 2_000_000, 5_000_000, 10_000_000, 20_000_000],
+                                 value=5_000_000, format_func=lambda n: f"{n // 1_000_000}M")
+    resolution = col2.select_slider("Voxels per axis", options=[32, 48, 64], value=48)
+    start_trace("rossler", view="density", a=a, b=b, c=c, dt=dt, samples=samples, resolution=resolution)
+    chart = st.empty()
+    try:
+        counts, bounds = progressive(disk_cache(rossler_density), iter_rossler_density,
+                                     preview_to(chart, build_density_figure), a, b, c, dt, samples, resolution)
+    except ValueError as e:  # a diverging trajectory has no grid to bin into
+        st.warning(f"⚠️ {e}")
+    else:
+        with chart:
+            plotly_chart(build_density_figure((counts, bounds)), width='stretch')
+
+        st.divider()
+        st.subheader("📁 Export & Info")
+        centres = [lo + (np.arange(resolution) + 0.5) * (hi - lo) / resolution for lo, hi in zip(*bounds)]
+        X, Y, Z = np.meshgrid(*centres, indexing="ij")
+        add_download_buttons({
+            "a": a,
+            "b": b,
+            "c": c,
+            "dt": dt,
+            "samples": samples,
+            "resolution": resolution,
+            "outside_grid": int(samples - counts.sum())
+        }, "rossler_density", arrays={"x": X.ravel(), "y": Y.ravel(), "z": Z.ravel(), "visits": counts.ravel()})
+else:
+    trajectories = shared_store()
+    solve_rossler = timed_kernel(compute_rossler, cache=trajectories.cached)
+    start_trace("rossler", a=a, b=b, c=c, dt=dt, steps=steps)
+    x, y, z = solve_rossler(a, b, c, dt, steps)
+
+    # Create 3D scatter plot
+    fig = go.Figure(data=[go.Scatter3d(
+        x=x, y=y, z=z,
+        mode='lines',
+        line=dict(width=1, color=z, colorscale='Viridis'),
+        hovertemplate='<b>X:</b> %{x:.2f}<br><b>Y:</b> %{y:.2f}<br><b>Z:</b> %{z:.2f}<extra></extra>'
+    )])
+
+    # Update layout
+    apply_plotly_template(fig)
+    fig.update_layout(
+        title='Rössler Attractor',
+        scene=dict(
+            xaxis_title='X',
+            yaxis_title='Y',
+            zaxis_title='Z',
+            aspectmode='cube'
+        ),
+        width=800,
+        height=600,
+        margin=dict(l=50, r=50, b=50, t=100)
+    )
+
+    # Show the plot
+    plotly_chart(fig, width='stretch')
+
+    add_recurrence_report(np.column_stack((x, y, z)), key="rossler")
+
+    # --- Export ---
+    st.divider()
+    st.subheader("📁 Export & Info")
+    add_download_buttons({
+        "a": a,
+        "b": b,
+        "c": c,
+        "dt": dt,
+        "steps": steps
+    }, "rossler", arrays={"x": x, "y": y, "z": z})
+
+finish_trace()
@@ -1,12 +1,20 @@
+import math
+import time
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
-from utils.plotting import plotly_config, apply_plotly_template
-import random
+from utils.plotting import plotly_chart, apply_plotly_template, add_download_buttons, add_dimension_report
+from compute.fractals import generate_snowflake as compute_snowflake, iter_snowflake
+from compute.fractals import reiter_snowflake, iter_reiter_snowflake
+from utils.instrument import start_trace, finish_trace
+from utils.array_cache import disk_cache
+from utils.gallery import Gallery, spawn_seeds
+from utils.progressive import progressive, preview_to
+from utils.raster import render_figure
 
 st.title("❄️ Chaotic Snowflake Generator")
 
-mode = st.radio("Mode", ["Explorer", "Lesson: Why Are Snowflakes Unique?"], 
+mode = st.radio("Mode", ["Explorer", "Gallery", "Lesson: Why Are Snowflakes Unique?"], 
                 horizontal=True, label_visibility="collapsed")
 
 if mode == "Lesson: Why Are Snowflakes Unique?":
@@ -20,94 +28,229 @@ if mode == "Lesson: Why Are Snowflakes Unique?":
     """, icon="🔬")
 
 # --- Controls ---
+# Reiter's automaton grows a crystal on a hexagonal lattice from vapour
+# diffusion; its parameters take the places of the random walk's.
+REITER = "Crystal (Reiter automaton)"
+engine = "Random walk"
+if mode != "Gallery":
+    engine = st.radio("Engine", ["Random walk", REITER], horizontal=True)
+
 with st.expander("🎛️ Growth Parameters", expanded=False):
     col1, col2 = st.columns(2)
-    with col1:
-        n_particles = st.slider("Particles", 100, 5000, 1000, step=100)
-        stickiness = st.slider("Stickiness", 0.1, 1.0, 0.8, step=0.05)
-        chaos = st.slider("Chaos (per-step noise)", 0.0, 0.5, 0.1, step=0.02)
-    with col2:
-        symmetry = st.select_slider("Symmetry", options=[1, 2, 3, 6], value=6)
-        twist = st.slider("Twist (radians)", 0.0, np.pi, 0.0, step=0.1)
-        depth = st.slider("Max radius", 10, 50, 30, step=5)
-
-# --- Generate snowflake (cached) ---
-@st.cache_data(ttl=600)
-def generate_snowflake(n_particles, stickiness, chaos, symmetry, twist, depth):
-    # Seed at origin
-    points = [(0.0, 0.0, 0.0)]
-    occupied = set([(0, 0)])
-
-    # Launch random walkers
-    for _ in range(n_particles):
-        # Start walker on circle of radius ~depth
-        angle = random.uniform(0, 2*np.pi)
-        r = depth * 0.9 + random.uniform(-2, 2)
-        x, y = r * np.cos(angle), r * np.sin(angle)
-        
-        for _ in range(5000):  # max steps
-            # Random step + chaos
-            dx = random.uniform(-1, 1) + random.gauss(0, chaos)
-            dy = random.uniform(-1, 1) + random.gauss(0, chaos)
-            x, y = x + dx, y + dy
-            
-            # Reflect into 60° wedge (for 6-fold symmetry)
-            theta = np.arctan2(y, x) % (2*np.pi/symmetry)
-            r = np.hypot(x, y)
-            x_wedge = r * np.cos(theta)
-            y_wedge = r * np.sin(theta)
-            
-            # Snap to grid
-            ix, iy = int(round(x_wedge)), int(round(y_wedge))
-            if (ix, iy) in occupied:
-                if random.random() < stickiness:
-                    # Add all symmetric copies
-                    for k in range(symmetry):
-                        ang = 2*np.pi * k / symmetry + twist
-                        x_out = x_wedge * np.cos(ang) - y_wedge * np.sin(ang)
-                        y_out = x_wedge * np.sin(ang) + y_wedge * np.cos(ang)
-                        points.append((x_out, y_out, 0.0))
-                        # Optional: add slight Z variation for 3D effect
-                        z = 0.2 * np.sin(5 * ang) * random.gauss(0, 0.1)
-                        points[-1] = (x_out, y_out, z)
-                    break
-            if r > depth * 1.2 or r < 1:
-                break  # escape or too close
-
-    return np.array(points)
-
-points = generate_snowflake(n_particles, stickiness, chaos, symmetry, twist, depth)
-x, y, z = points[:,0], points[:,1], points[:,2]
+    if engine == REITER:
+        with col1:
+            generations = st.slider("Generations", 500, 10_000, 4000, step=500)
+            beta = st.slider("β (background vapour)", 0.3, 0.9, 0.4, step=0.05)
+            gamma = st.select_slider("γ (vapour added to the crystal)",
+                                     options=[0.0001, 0.0003, 0.001, 0.003, 0.01], value=0.001)
+        with col2:
+            alpha = st.slider("α (diffusion)", 0.5, 3.0, 1.0, step=0.1)
+            lattice = st.slider("Lattice radius (cells)", 50, 250, 200, step=25)
+    else:
+        with col1:
+            n_particles = st.slider("Particles", 100, 5000, 1000, step=100)
+            stickiness = st.slider("Stickiness", 0.1, 1.0, 0.8, step=0.05)
+            chaos = st.slider("Chaos (per-step noise)", 0.0, 0.5, 0.1, step=0.02)
+        with col2:
+            symmetry = st.select_slider("Symmetry", options=[1, 2, 3, 6], value=6)
+            twist = st.slider("Twist (radians)", 0.0, np.pi, 0.0, step=0.1)
+            depth = st.slider("Max radius", 10, 50, 30, step=5)
+
+if mode == "Gallery":
+    with st.expander("🖼️ Gallery", expanded=True):
+        col1, col2 = st.columns(2)
+        gallery_seed = col1.number_input("Gallery seed", 0, 1_000_000, 0,
+                                         help="Each flake gets its own random stream derived from this seed")
+        n_flakes = col2.select_slider("Flakes", options=[4, 9, 16, 25], value=9)
 
 # --- Plot ---
-fig = go.Figure(data=go.Scatter3d(
-    x=x, y=y, z=z,
-    mode='markers',
-    marker=dict(
-        size=3 + 2 * (z - z.min()),  # subtle size by height
-        color=z,
-        colorscale='Blues',
-        opacity=0.9
-    ),
-    hoverinfo='skip'
-))
-
-apply_plotly_template(fig)
-fig.update_layout(
-    title=f"❄️ {symmetry}-Fold Chaotic Snowflake",
-    scene=dict(
-        xaxis_title='', yaxis_title='', zaxis_title='',
-        aspectmode='data',
-        camera=dict(eye=dict(x=0, y=0, z=2.5)),  # top-down view
-        xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-        yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-        zaxis=dict(showgrid=False, zeroline=False, showticklabels=False)
-    ),
-    height=600,
-    margin=dict(l=0, r=0, t=50, b=0),
-    showlegend=False
-)
-
-st.plotly_chart(fig, width='stretch', config=plotly_config())
-
-st.caption("🌀 Real snowflakes grow via diffusion-limited aggregation — this is a chaotic, interactive homage.")
\ No newline at end of file
+def build_figure(points, title=None):
+    x, y, z = points[:,0], points[:,1], points[:,2]
+    fig = go.Figure(data=go.Scatter3d(
+        x=x, y=y, z=z,
+        mode='markers',
+        marker=dict(
+            size=3 + 2 * (z - z.min()),  # subtle size by height
+            color=z,
+            colorscale='Blues',
+            opacity=0.9
+        ),
+        hoverinfo='skip'
+    ))
+
+    apply_plotly_template(fig)
+    fig.update_layout(
+        title=title or f"❄️ {symmetry}-Fold Chaotic Snowflake",
+        scene=dict(
+            xaxis_title='', yaxis_title='', zaxis_title='',
+            aspectmode='data',
+            camera=dict(eye=dict(x=0, y=0, z=2.5)),  # top-down view
+            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            zaxis=dict(showgrid=False, zeroline=False, showticklabels=False)
+        ),
+        height=600,
+        margin=dict(l=0, r=0, t=50, b=0),
+        showlegend=False
+    )
+    return fig
+
+def thumbnail(points):
+    """A small top-down image of a flake, rasterised on the server."""
+    fig = go.Figure(go.Scatter(x=points[:, 0], y=points[:, 1], mode='markers',
+                               marker=dict(size=8, color=points[:, 2], colorscale='Blues')))
+    apply_plotly_template(fig)
+    return render_figure(fig, width=160, height=160)
+
+def add_flake_details(points, seed=None):
+    """Fractal dimension and export for the flake on show."""
+    # In-plane growth: 2D aggregation gives about 1.7
+    add_dimension_report(points[:, :2], key="snowflake")
+
+    st.divider()
+    st.subheader("📁 Export & Info")
+    add_download_buttons({
+        "n_particles": n_particles,
+        "stickiness": stickiness,
+        "chaos": chaos,
+        "symmetry": symmetry,
+        "twist": twist,
+        "depth": depth,
+        "seed": seed,
+        "n_points": len(points)
+    }, "snowflake", arrays={"x": points[:, 0], "y": points[:, 1], "z": points[:, 2]})
+
+def build_crystal_figure(crystal):
+    """The ice cells of a Reiter crystal, coloured by the generation they froze in."""
+    x, y, generation = crystal
+    # Axial rows are sqrt(3)/2 apart; odd rows sit half a cell to the side,
+    # which a one-cell-per-pixel image rounds away.
+    step = np.sqrt(3) / 2
+    rows = np.rint(y / step).astype(int) + lattice * 2
+    cols = np.floor(x).astype(int) + lattice
+    image = np.full((4 * lattice + 1, 2 * lattice + 1), np.nan, dtype=np.float32)
+    image[rows, cols] = generation
+    used = np.flatnonzero(~np.isnan(image).all(axis=1))
+    image = image[used[0]:used[-1] + 1] if len(used) else image[:1]
+    y0 = ((used[0] if len(used) else 0) - lattice * 2) * step
+    fig = go.Figure(go.Heatmap(z=image, x0=-lattice, dx=1, y0=y0, dy=step, colorscale="Blues_r",
+                               colorbar=dict(title="frozen at"), hoverongaps=False,
+                               hovertemplate="generation %{z:.0f}<extra></extra>"))
+    apply_plotly_template(fig)
+    fig.update_layout(
+        title=f"❄️ Reiter crystal (α={alpha}, β={beta}, γ={gamma}) — {len(x):,} cells",
+        xaxis=dict(visible=False, range=[-lattice, lattice]),
+        yaxis=dict(visible=False, range=[-lattice, lattice], scaleanchor="x"),
+        height=600,
+    )
+    return fig
+
+def add_crystal_details(crystal):
+    """Fractal dimension and export for a Reiter crystal."""
+    x, y, generation = crystal
+    add_dimension_report(np.column_stack((x, y)), key="snowflake")
+
+    st.divider()
+    st.subheader("📁 Export & Info")
+    add_download_buttons({
+        "engine": "reiter",
+        "alpha": alpha,
+        "beta": beta,
+        "gamma": gamma,
+        "radius": lattice,
+        "generations": generations,
+        "last_generation": int(generation.max()),
+        "n_cells": len(x)
+    }, "snowflake_crystal", arrays={"x": x, "y": y, "generation": generation})
+
+# --- Generate snowflake (cached on disk, shared by every server process) ---
+# A new flake grows in place: partial aggregates are drawn while walkers are
+# still being launched, and changing a slider abandons the run.
+generate_snowflake = disk_cache(compute_snowflake)
+grow_crystal = disk_cache(reiter_snowflake)
+if engine != REITER:
+    params = dict(n_particles=n_particles, stickiness=stickiness, chaos=chaos,
+                  symmetry=symmetry, twist=twist, depth=depth)
+
+if mode != "Gallery" and "snowflake_gallery" in st.session_state:
+    st.session_state.pop("snowflake_gallery").stop()
+
+if engine == REITER:
+    # The whole lattice advances each generation; snapshots stream to the chart.
+    crystal_params = dict(alpha=alpha, beta=beta, gamma=gamma, radius=lattice, generations=generations)
+    start_trace("snowflake", engine="reiter", **crystal_params)
+    chart = st.empty()
+    crystal = progressive(grow_crystal, iter_reiter_snowflake,
+                          preview_to(chart, build_crystal_figure), **crystal_params)
+    with chart:
+        plotly_chart(build_crystal_figure(crystal), width='stretch')
+    add_crystal_details(crystal)
+elif mode != "Gallery":
+    start_trace("snowflake", **params)
+    chart = st.empty()
+    points = progressive(generate_snowflake, iter_snowflake, preview_to(chart, build_figure),
+                         n_particles, stickiness, chaos, symmetry, twist, depth)
+
+    with chart:
+        plotly_chart(build_figure(points), width='stretch')
+    add_flake_details(points)
+else:
+    # --- Gallery: one flake per seed, grown in parallel by worker processes ---
+    start_trace("snowflake", mode="gallery", gallery_seed=gallery_seed, n_flakes=n_flakes, **params)
+    seeds = spawn_seeds(gallery_seed, n_flakes)
+    calls = [{**params, "seed": seed} for seed in seeds]
+
+    # The gallery outlives reruns (clicking a thumbnail must not restart it)
+    # and is replaced when the parameters change.
+    gallery = st.session_state.get("snowflake_gallery")
+    if gallery is None or gallery.calls != calls:
+        if gallery is not None:
+            gallery.stop()
+        gallery = st.session_state.snowflake_gallery = Gallery("snowflake", calls).start()
+
+    def open_flake(seed):
+        st.session_state.snowflake_open = seed
+
+    status = st.empty()
+    n_cols = math.ceil(math.sqrt(n_flakes))
+    cells = []
+    for row in range(0, n_flakes, n_cols):
+        cols = st.columns(n_cols)
+        cells += [col.empty() for col in cols[:n_flakes - row]]
+
+    # Full detail of the opened flake, read back from the cache
+    opened = st.session_state.get("snowflake_open")
+    if opened in seeds and seeds.index(opened) in gallery.ready:
+        i = seeds.index(opened)
+        points = generate_snowflake(**calls[i])
+        plotly_chart(build_figure(points, title=f"❄️ Flake #{i + 1} (seed {opened})"), width='stretch')
+        add_flake_details(points, seed=opened)
+
+    # Thumbnails appear as flakes finish; a widget change stops the loop.
+    drawn = set()
+    while True:
+        finished = gallery.finished is not None
+        for i in sorted((gallery.ready.keys() | gallery.errors.keys()) - drawn):
+            with cells[i].container():
+                if i in gallery.errors:
+                    st.caption(f"⚠️ #{i + 1}: {gallery.errors[i]}")
+                else:
+                    points = generate_snowflake(**calls[i])
+                    st.image(thumbnail(points))
+                    st.button(f"🔍 #{i + 1} · {len(points)} pts", key=f"snowflake_thumb_{i}",
+                              on_click=open_flake, args=(seeds[i],), width='stretch')
+            drawn.add(i)
+        if finished:
+            break
+        status.caption(f"⏳ Growing {n_flakes} flakes on {min(gallery.workers, n_flakes)} worker processes… "
+                       f"{gallery.done}/{n_flakes}")
+        time.sleep(0.25)
+    elapsed = gallery.finished - gallery.started
+    compute_s = sum(gallery.ready.values())
+    timing = (f"in {elapsed:.1f} s ({compute_s:.1f} s of compute, ×{compute_s / elapsed:.1f} in parallel)"
+              if compute_s else "from cache")
+    status.caption(f"✅ {len(gallery.ready)} flakes {timing} — click 🔍 to open one")
+
+st.caption("🌀 Real snowflakes grow via diffusion-limited aggregation — this is a chaotic, interactive homage.")
+
+finish_trace()
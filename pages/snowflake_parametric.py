@@ -1,40 +1,35 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-from utils.plotting import plotly_config, apply_plotly_template, add_download_buttons, run_ollama_command
-from functools import lru_cache
-
-def snowflake_surface(u_steps=120, v_steps=120):
-    # Higher resolution for crisp edges
-    u = np.linspace(0, 2*np.pi, u_steps)
-    v = np.linspace(0, 2*np.pi, v_steps)
-    U, V = np.meshgrid(u, v)
-
-    # 🌨️ Snowflake-inspired modulations:
-    # - 6-fold symmetry in radial arm (sin(6V))
-    # - Delicate branching (cos(12V) * exp(-|cos(U)|))
-    # - Icicle tips (sin(U) sharpens at poles)
-    
-    R = 4 * (1 + 0.3 * np.sin(6 * V) + 0.1 * np.cos(12 * V) * np.exp(-np.abs(np.cos(U))))
-    x = R * np.cos(2 * V)
-    y = R * np.sin(2 * V)
-    z = np.sin(U) * (1 + 0.4 * np.cos(6 * V))  # 6-point vertical ripple
-
-    return x, y, z
+from utils.plotting import (plotly_chart, apply_plotly_template, add_download_buttons, add_mesh_download_buttons,
+                            add_curvature_controls)
+from compute.surfaces import snowflake_surface
+from utils.instrument import start_trace, finish_trace, timed_kernel
+from utils.array_cache import disk_cache
 
 # Generate
-x, y, z = snowflake_surface()
-
-# 🎨 Winter palette + realistic ice lighting
-fig = go.Figure(data=[go.Surface(
-    x=x, y=y, z=z,
+start_trace("snowflake_parametric", u_steps=120, v_steps=120)
+x, y, z = timed_kernel(snowflake_surface, cache=disk_cache)()
+values, style, overlays = add_curvature_controls(x, y, z, key="snowflake_surface")
+# 🎨 Winter palette by height, unless a curvature field is picked
+colour = dict(
     colorscale=[
         [0.0, 'rgb(200, 230, 255)'],   # pale sky blue (core)
         [0.4, 'rgb(180, 220, 255)'],
         [0.7, 'rgb(150, 200, 255)'],
         [1.0, 'rgb(255, 255, 255)']    # pure white tips
     ],
-    showscale=False,
+    showscale=False
+)
+colour.update(style)
+
+# ❄️ Realistic ice lighting; the grids go out as float32 (typed arrays), and
+# the surface stays a grid so its height contours can be drawn
+if values is not None:
+    colour["surfacecolor"] = values
+fig = go.Figure(data=[go.Surface(
+    x=x.astype(np.float32), y=y.astype(np.float32), z=z.astype(np.float32),
+    **colour,
     lighting=dict(
         ambient=0.6,
         diffuse=0.8,
@@ -48,7 +43,7 @@ fig = go.Figure(data=[go.Surface(
         "x": {"show": False},
         "y": {"show": False}
     }
-)])
+), *overlays])
 apply_plotly_template(fig)
 fig.update_layout(
     title=dict(
@@ -108,5 +103,13 @@ for i in range(0, 360, 5):
     ))
 
 fig.frames = frames
-st.plotly_chart(fig, width='content', config=plotly_config())
-#fig.show()
\ No newline at end of file
+plotly_chart(fig, width='content')
+
+# --- Export ---
+st.divider()
+st.subheader("📁 Export & Info")
+add_download_buttons({"u_steps": 120, "v_steps": 120}, "snowflake_surface", arrays={"x": x, "y": y, "z": z})
+add_mesh_download_buttons(x, y, z, "snowflake_surface")
+#fig.show()
+
+finish_trace()
@@ -1,15 +1,13 @@
 import streamlit as st
 import plotly.graph_objects as go
-import numpy as np
-from utils.plotting import plotly_config, apply_plotly_template
+from utils.plotting import plotly_chart, apply_plotly_template, add_download_buttons
+from compute.surfaces import spiral_surface
+from utils.instrument import start_trace, finish_trace, timed_kernel
 
 st.title("🌀 3D Archimedes Spiral Surface")
 # Generate data points
-t = np.linspace(0, 4*np.pi, 100)
-r = 1 + 0.5 * np.sin(3*t)
-x = r * np.cos(t)
-y = r * np.sin(t)
-z = t / (2*np.pi)
+start_trace("spiral", n_points=100)
+t, x, y, z = timed_kernel(spiral_surface)(100)
 
 # Create the 3D surface plot
 fig = go.Figure(data=[go.Surface(
@@ -40,4 +38,11 @@ fig.update_layout(
 )
 
 # Show the plot
-st.plotly_chart(fig, width='stretch', config=plotly_config())
+plotly_chart(fig, width='stretch')
+
+# --- Export ---
+st.divider()
+st.subheader("📁 Export & Info")
+add_download_buttons({"points": len(t)}, "spiral", arrays={"t": t, "x": x, "y": y, "z": z})
+
+finish_trace()
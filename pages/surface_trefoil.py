@@ -1,37 +1,35 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-from utils.plotting import plotly_config, apply_plotly_template, add_download_buttons, run_ollama_command
-from functools import lru_cache
+from utils.plotting import (plotly_chart, apply_plotly_template, add_download_buttons, add_mesh_download_buttons,
+                            surface_mesh3d, add_curvature_controls)
+from compute.surfaces import trefoil_surface
+from utils.instrument import start_trace, finish_trace, timed_kernel
+from utils.array_cache import disk_cache
 
 st.title("🌀 Trefoil Knot")
 
-# Define the parametric equations
-def parametric_surface(u_range=(0, 2*np.pi), v_range=(0, 2*np.pi), u_steps=50, v_steps=50):
-    # Create parameter grids
-    u = np.linspace(u_range[0], u_range[1], u_steps)
-    v = np.linspace(v_range[0], v_range[1], v_steps)
-    U, V = np.meshgrid(u, v)
-    
-    # Parametric equations
-    x = (4 * (1 + 0.25 * np.sin(3 * V)) + np.cos(U)) * np.cos(2 * V)
-    y = (4 * (1 + 0.25 * np.sin(3 * V)) + np.cos(U)) * np.sin(2 * V)
-    z = np.sin(U) + 2 * np.cos(3 * V)
-    
-    return x, y, z
-
 # Generate the surface
-x, y, z = parametric_surface(u_steps=100, v_steps=100)
+start_trace("surface_trefoil", u_steps=100, v_steps=100)
+x, y, z = timed_kernel(trefoil_surface, cache=disk_cache)(u_steps=100, v_steps=100)
+values, style, overlays = add_curvature_controls(x, y, z, key="trefoil")
+weld_seams = st.toggle("🧵 Weld seams", value=False,
+                       help="An indexed mesh with the seam vertices merged: smooth shading across the seams, twice the download")
+# Coloured by height unless a curvature field is picked
+colour = dict(colorscale='Viridis', colorbar=dict(title="Z-Value"), showscale=True)
+colour.update(style)
 
-# Create the 3D surface plot
-fig = go.Figure(data=[go.Surface(
-    x=x, y=y, z=z,
-    colorscale='Viridis',
-    colorbar=dict(title="Z-Value"),
-    showscale=True,
-    lighting=dict(ambient=0.8, diffuse=0.8, specular=0.2),
-    lightposition=dict(x=100, y=100, z=100)
-)])
+# Create the 3D surface plot: the grid as float32 (typed arrays), or, with
+# the tube's seams welded, an indexed mesh
+lighting = dict(lighting=dict(ambient=0.8, diffuse=0.8, specular=0.2), lightposition=dict(x=100, y=100, z=100))
+if weld_seams:
+    surface = surface_mesh3d(x, y, z, intensity=values, **colour, **lighting)
+else:
+    if values is not None:
+        colour["surfacecolor"] = values
+    surface = go.Surface(x=x.astype(np.float32), y=y.astype(np.float32), z=z.astype(np.float32),
+                         **colour, **lighting)
+fig = go.Figure(data=[surface, *overlays])
 
 apply_plotly_template(fig)
 # Update layout
@@ -48,5 +46,13 @@ fig.update_layout(
 )
 
 # Show the plot
-st.plotly_chart(fig, width='stretch', config=plotly_config())
+plotly_chart(fig, width='stretch')
+
+# --- Export ---
+st.divider()
+st.subheader("📁 Export & Info")
+add_download_buttons({"u_steps": 100, "v_steps": 100}, "trefoil", arrays={"x": x, "y": y, "z": z})
+add_mesh_download_buttons(x, y, z, "trefoil")
 #fig.show()
+
+finish_trace()
@@ -1,9 +1,13 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-from utils.plotting import plotly_config, apply_plotly_template
-from utils.plotting import run_ollama_command
-import re
+from utils.plotting import plotly_chart, apply_plotly_template, add_download_buttons
+from utils.llm import run_ollama_command
+from compute.surfaces import function_surface
+from utils.instrument import start_trace, finish_trace, timed_kernel
+from utils.array_cache import disk_cache
+from utils.sandbox import SandboxError, sandboxed
+from utils.progressive import stream, refine, preview_to
 
 st.title("🌊 Parametric Surface Explorer")
 
@@ -65,100 +69,116 @@ with st.expander("🎨 Visual Style", expanded=False):
         wire_step = st.slider("Wire step", 1, 10, 3, help="Larger = sparser wires")
         animate = st.toggle("🔄 Auto-rotate", value=False)
 
-# --- Compute surface ---
-@st.cache_data(ttl=300)
-def compute_surface(expr, x_range, y_range, resolution):
-    try:
-        x = np.linspace(-x_range, x_range, resolution)
-        y = np.linspace(-y_range, y_range, resolution)
-        X, Y = np.meshgrid(x, y)
-        # Safe eval — only allow numpy & basic ops
-        allowed_names = {"np": np, "x": X, "y": Y, "sin": np.sin, "cos": np.cos, "exp": np.exp, "log": np.log}
-        Z = eval(expr, {"__builtins__": {}}, allowed_names)
-        return X, Y, Z
-    except Exception as e:
-        st.error(f"⚠️ Invalid expression: {e}")
-        # Fallback
-        X, Y = np.meshgrid(np.linspace(-3,3,20), np.linspace(-3,3,20))
-        Z = np.sin(X) * np.cos(Y)
-        return X, Y, Z
-
-X, Y, Z = compute_surface(expr, x_range, y_range, resolution)
+# --- Compute surface (disk-cached; failures raise and are never cached) ---
+# Expressions are evaluated in a time- and memory-limited worker process.
+compute_surface = timed_kernel(sandboxed(function_surface), cache=disk_cache)
 
 # --- Build figure ---
-fig = go.Figure()
-
-# Surface
-if show_surface:
-    fig.add_trace(go.Surface(
-        x=X, y=Y, z=Z,
-        colorscale=colorscale,
-        opacity=opacity,
-        showscale=False,
-        lighting=dict(ambient=0.6, diffuse=0.8, specular=0.3, roughness=0.4),
-        lightposition=dict(x=100, y=200, z=150)
-    ))
-
-# Wireframe
-if show_wire:
-    # Efficient wireframe: only every `wire_step` line
-    for i in range(0, X.shape[0], wire_step):
-        fig.add_trace(go.Scatter3d(
-            x=X[i, :], y=Y[i, :], z=Z[i, :],
-            mode='lines',
-            line=dict(color='white', width=1),
-            showlegend=False
-        ))
-    for j in range(0, X.shape[1], wire_step):
-        fig.add_trace(go.Scatter3d(
-            x=X[:, j], y=Y[:, j], z=Z[:, j],
-            mode='lines',
-            line=dict(color='white', width=1),
-            showlegend=False
+def build_figure(surface):
+    X, Y, Z = surface
+    fig = go.Figure()
+
+    # Surface
+    if show_surface:
+        fig.add_trace(go.Surface(
+            x=X, y=Y, z=Z,
+            colorscale=colorscale,
+            opacity=opacity,
+            showscale=False,
+            lighting=dict(ambient=0.6, diffuse=0.8, specular=0.3, roughness=0.4),
+            lightposition=dict(x=100, y=200, z=150)
         ))
 
-# Corners (optional)
-fig.add_trace(go.Scatter3d(
-    x=[X[0,0], X[0,-1], X[-1,0], X[-1,-1]],
-    y=[Y[0,0], Y[0,-1], Y[-1,0], Y[-1,-1]],
-    z=[Z[0,0], Z[0,-1], Z[-1,0], Z[-1,-1]],
-    mode='markers',
-    marker=dict(size=4, color='red', symbol='circle'),
-    showlegend=False
-))
-
-# Layout
-apply_plotly_template(fig)
-fig.update_layout(
-    title=f"z = {expr}",
-    scene=dict(
-        xaxis_title='X', yaxis_title='Y', zaxis_title='Z',
-        aspectmode='manual',
-        aspectratio=dict(x=1, y=1, z=0.5),
-        camera=dict(eye=dict(x=1.6, y=1.6, z=1.0))
-    ),
-    height=650,
-    margin=dict(l=0, r=0, t=50, b=0),
-    showlegend=False
-)
-
-# Animation
-if animate:
-    frames = []
-    for theta in np.linspace(0, 2*np.pi, 40):
-        eye = dict(
-            x=1.8 * np.cos(theta),
-            y=1.8 * np.sin(theta),
-            z=1.0 + 0.3 * np.sin(2*theta)
-        )
-        frames.append(go.Frame(layout=dict(scene_camera=dict(eye=eye))))
-    fig.frames = frames
-    fig.update_layout(updatemenus=[dict(
-        type="buttons",
-        buttons=[dict(label="▶", method="animate", args=[None, {"frame": {"duration": 60}}])]
-    )])
-
-st.plotly_chart(fig, width='stretch', config=plotly_config())
+    # Wireframe
+    if show_wire:
+        # Efficient wireframe: only every `wire_step` line
+        for i in range(0, X.shape[0], wire_step):
+            fig.add_trace(go.Scatter3d(
+                x=X[i, :], y=Y[i, :], z=Z[i, :],
+                mode='lines',
+                line=dict(color='white', width=1),
+                showlegend=False
+            ))
+        for j in range(0, X.shape[1], wire_step):
+            fig.add_trace(go.Scatter3d(
+                x=X[:, j], y=Y[:, j], z=Z[:, j],
+                mode='lines',
+                line=dict(color='white', width=1),
+                showlegend=False
+            ))
+
+    # Corners (optional)
+    fig.add_trace(go.Scatter3d(
+        x=[X[0,0], X[0,-1], X[-1,0], X[-1,-1]],
+        y=[Y[0,0], Y[0,-1], Y[-1,0], Y[-1,-1]],
+        z=[Z[0,0], Z[0,-1], Z[-1,0], Z[-1,-1]],
+        mode='markers',
+        marker=dict(size=4, color='red', symbol='circle'),
+        showlegend=False
+    ))
+
+    # Layout
+    apply_plotly_template(fig)
+    fig.update_layout(
+        title=f"z = {expr}",
+        scene=dict(
+            xaxis_title='X', yaxis_title='Y', zaxis_title='Z',
+            aspectmode='manual',
+            aspectratio=dict(x=1, y=1, z=0.5),
+            camera=dict(eye=dict(x=1.6, y=1.6, z=1.0))
+        ),
+        height=650,
+        margin=dict(l=0, r=0, t=50, b=0),
+        showlegend=False
+    )
+
+    # Animation
+    if animate:
+        frames = []
+        for theta in np.linspace(0, 2*np.pi, 40):
+            eye = dict(
+                x=1.8 * np.cos(theta),
+                y=1.8 * np.sin(theta),
+                z=1.0 + 0.3 * np.sin(2*theta)
+            )
+            frames.append(go.Frame(layout=dict(scene_camera=dict(eye=eye))))
+        fig.frames = frames
+        fig.update_layout(updatemenus=[dict(
+            type="buttons",
+            buttons=[dict(label="▶", method="animate", args=[None, {"frame": {"duration": 60}}])]
+        )])
+    return fig
+
+start_trace("wireframe", expr=expr, x_range=x_range, y_range=y_range, resolution=resolution,
+            surface=show_surface, wire=show_wire, wire_step=wire_step, animate=animate)
+notice = st.empty()
+chart = st.empty()
+try:
+    # A coarse grid is drawn first if the full-resolution surface is slow
+    X, Y, Z = stream(refine(lambda n: compute_surface(expr, x_range, y_range, n), resolution, first=20),
+                     preview_to(chart, build_figure))
+except SandboxError as e:
+    if e.kind == "invalid":
+        notice.error(f"⚠️ Invalid expression: {e}")
+    elif e.kind == "runtime":
+        notice.error(f"⚠️ The expression failed while evaluating: {e}")
+    else:
+        notice.error(f"⚠️ Expression stopped ({e.kind}): {e}")
+    # Fallback
+    X, Y, Z = compute_surface("np.sin(x) * np.cos(y)", 3, 3, 20)
+
+with chart:
+    plotly_chart(build_figure((X, Y, Z)), width='stretch')
+
+# --- Export ---
+st.divider()
+st.subheader("📁 Export & Info")
+add_download_buttons({
+    "expression": expr,
+    "x_range": x_range,
+    "y_range": y_range,
+    "resolution": resolution
+}, "surface", arrays={"x": X, "y": Y, "z": Z})
 
 # --- AI Assistant ---
 st.divider()
@@ -183,4 +203,6 @@ if question and st.button("➤ Submit", type="primary"):
         st.markdown(response)
     st.session_state.messages.append({"role": "assistant", "content": response})    
 
-   
\ No newline at end of file
+   
+
+finish_trace()
@@ -1,4 +1,6 @@
 import streamlit as st
+from utils.registry import featured_pages, navigation
+from utils.warmup import render_status, start_warmup
 
 # Set page configuration
 st.set_page_config(
@@ -6,44 +8,31 @@ st.set_page_config(
     page_icon="📊",
     layout="wide"
 )
+
 # ----------------------------
 # Main App
 # ----------------------------
-st.title("🌌 Mathematical Visualisations Gallery")
-st.markdown("""
-Explore the hidden geometry of chaos, symmetry, and growth —  
-all rendered in real-time with Plotly.
-""")
+def home():
+    st.title("🌌 Mathematical Visualisations Gallery")
+    st.markdown("""
+    Explore the hidden geometry of chaos, symmetry, and growth —
+    all rendered in real-time with Plotly.
+    """)
 
-# Mini previews (static images or Plotly thumbnails)
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.image("lorenz_thumb.png", caption="Lorenz Attractor", width='stretch')
-with col2:
-    st.image("snowflake_thumb.png", caption="Snowflake Generator",  width='stretch')
-with col3:
-    st.image("fern_thumb.png", caption="Barnsley Fern",  width='stretch')
+    # Mini previews (static images or Plotly thumbnails)
+    featured = featured_pages()
+    for col, page in zip(st.columns(len(featured)), featured):
+        with col:
+            st.image(page.thumbnail, caption=page.title, width='stretch')
 
-st.divider()
-st.subheader("✨ Featured Explorations")
-st.page_link("pages/lorenz.py", label="🌀 Chaos & Attractors", icon="🌀")
-st.page_link("pages/snowflake.py", label="❄️ Symmetry & Snowflakes", icon="❄️")
-st.page_link("pages/fern.py", label="🌿 Fractals & Nature", icon="🌿")
+    st.divider()
+    st.subheader("✨ Featured Explorations")
+    for page in featured:
+        st.page_link(page.path, label=page.featured, icon=page.featured.split()[0])
 
-pages = {
-        "Visualisations": [
-           st.Page("pages/lorenz.py", title="Lorenz Attractor", icon="🔧"),
-           st.Page("pages/rossler.py", title="Rossler Attractor", icon="🔧"),
-           st.Page("pages/klein.py", title="Klein Bottle", icon="🔧"), 
-           st.Page("pages/snowflake.py", title="Snowflake Generator", icon="🔧"),
-           st.Page("pages/snowflake_parametric.py", title="3D Surface", icon="🔧"), 
-           st.Page("pages/wireframe.py", title="Wireframe", icon="🔧"),
-           st.Page("pages/bernouilli_function.py", title="Bernouilli Polynomials", icon="🔧"),
-           st.Page("pages/spiral.py", title="Archimedes Spiral", icon="🔧"),
-           st.Page("pages/surface_trefoil.py", title="Trefoil Knot", icon="🔧"),
-           st.Page("pages/helical_cylinder.py", title="Helical Cylinder", icon="🔧"),
-           st.Page("pages/fern.py", title="Barnsley Fern", icon="🔧")
-        ] 
-}
-pg = st.navigation(pages)
+# Pages are registered by path only: a page's imports and computation run
+# when it is opened, never at app start. The first run of the server process
+# starts a background thread that fills the caches behind the default views.
+render_status(start_warmup())
+pg = st.navigation(navigation(home))
 pg.run()
@@ -0,0 +1,105 @@
+import importlib
+import sys
+
+import numpy as np
+import pytest
+
+from utils.array_cache import ArrayCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArrayCache(tmp_path / "cache", max_bytes=1 << 20)
+
+
+def test_hit_is_read_only_memmap(cache):
+    calls = []
+
+    @cache.cached
+    def grid(n, scale=1.0):
+        calls.append(n)
+        return np.arange(n * n, dtype=float).reshape(n, n) * scale
+
+    first = grid(4)
+    again = grid(n=4, scale=1.0)  # same call, spelled differently
+    assert calls == [4]
+    assert isinstance(again, np.memmap) and not again.flags.writeable
+    np.testing.assert_array_equal(first, again)
+    grid(4, scale=2.0)
+    assert calls == [4, 4]
+
+
+def test_dict_and_tuple_results(cache):
+    @cache.cached
+    def named(n):
+        return {"x": np.zeros(n), "empty": np.empty(0)}
+
+    @cache.cached
+    def pair(n):
+        return np.ones(n), np.arange(n)
+
+    named(3)
+    hit = named.peek(3)
+    assert list(hit) == ["x", "empty"] and hit["empty"].size == 0
+    pair(3)
+    ones, arange = pair.peek(3)
+    np.testing.assert_array_equal(arange, np.arange(3))
+
+
+def test_editing_a_helper_invalidates_the_caller(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.array_cache.ROOT", tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "cache_helper.py").write_text("def step(n):\n    return n + 1\n")
+    (tmp_path / "cache_kernel.py").write_text(
+        "import numpy as np\nfrom cache_helper import step\n\n"
+        "def kernel(n):\n    return np.arange(step(n))\n")
+    kernel = importlib.import_module("cache_kernel").kernel
+    before = cache.key(kernel, (3,))
+
+    (tmp_path / "cache_helper.py").write_text("def step(n):\n    return n + 2\n")
+    importlib.reload(sys.modules["cache_helper"])
+    kernel = importlib.reload(sys.modules["cache_kernel"]).kernel
+    assert cache.key(kernel, (3,)) != before
+    for name in ("cache_helper", "cache_kernel"):
+        sys.modules.pop(name)
+
+
+def test_rebuilt_wrappers_share_one_function_id(cache):
+    from utils.array_cache import _function_id
+    from utils.instrument import timed_kernel
+
+    def kernel(n):
+        return np.arange(n)
+
+    _function_id.cache_clear()
+    keys = {cache.key(timed_kernel(kernel, cache=cache.cached), (3,)) for _ in range(5)}
+    assert len(keys) == 1
+    assert _function_id.cache_info().misses == 1
+
+
+def test_eviction_keeps_budget_and_bounded_lock_files(cache):
+    @cache.cached
+    def block(i):
+        return np.full(40_000, i, dtype=np.float64)  # 320 kB
+
+    for i in range(40):
+        block(i)
+    stats = cache.stats()
+    assert stats["bytes"] <= cache.max_bytes and stats["entries"] == 3
+    assert block.peek(0) is None and block.peek(39) is not None
+    locks = {p.name for p in cache.locks.glob("*.lock")}
+    assert len(locks) <= 257 and all(len(name) == len("ab.lock") for name in locks - {"evict.lock"})
+
+
+def test_nested_calls_sharing_a_lock_file_do_not_deadlock(cache, monkeypatch):
+    monkeypatch.setattr("utils.array_cache.LOCK_PREFIX", 0)  # every key on one lock file
+
+    @cache.cached
+    def inner(n):
+        return np.arange(n)
+
+    @cache.cached
+    def outer(n):
+        return inner(n) * 2
+
+    np.testing.assert_array_equal(outer(4), np.arange(4) * 2)
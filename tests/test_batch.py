@@ -0,0 +1,43 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from compute.batch import dataset_name, main, parameter_grid, parse_values
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_compute_imports_without_streamlit():
+    code = ("import sys, compute.kernels, compute.batch; "
+            "sys.exit('streamlit' in sys.modules or 'plotly' in sys.modules)")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+def test_parse_values():
+    assert parse_values("1,2,3") == [1, 2, 3]
+    assert parse_values("20:30:3") == [20, 25, 30]
+    assert parse_values("0:1:3", like=0.5) == [0.0, 0.5, 1.0]
+    assert parse_values("10", like=0.5) == [10.0]
+
+
+def test_parameter_grid_is_product_over_defaults():
+    grid = parameter_grid("lorenz", ["rho=20,28", "sigma=10:14:2"])
+    assert len(grid) == 4
+    assert {(p["rho"], p["sigma"]) for p in grid} == {(20.0, 10.0), (20.0, 14.0), (28.0, 10.0), (28.0, 14.0)}
+    assert all(p["steps"] == 10_000 for p in grid)
+
+
+def test_batch_writes_and_skips_existing(tmp_path, capsys):
+    argv = ["trefoil", "u_steps=10,12", "v_steps=10", "--workers", "1", "--out", str(tmp_path)]
+    assert main(argv) == 0
+    for params in parameter_grid("trefoil", ["u_steps=10,12", "v_steps=10"]):
+        with np.load(tmp_path / dataset_name("trefoil", params)) as npz:
+            assert json.loads(str(npz["params"])) == params
+            assert npz["x"].shape == (10, params["u_steps"])
+    capsys.readouterr()
+    main(argv)
+    assert "2 already on disk" in capsys.readouterr().out
+    assert len((tmp_path / "manifest.jsonl").read_text().splitlines()) == 2
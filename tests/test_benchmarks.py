@@ -0,0 +1,31 @@
+from benchmarks.suite import CASES, SIZES, compare, time_call
+
+
+def _run(results):
+    return {"results": results}
+
+
+def test_time_call_counts_runs():
+    calls = []
+    res = time_call(lambda: calls.append(1), repeat=3)
+    assert res["runs"] == len(calls) == 3
+    assert 0 <= res["min_s"] <= res["wall_s"]
+
+
+def test_every_case_has_every_size():
+    for name, sizes in CASES.items():
+        assert set(sizes) == set(SIZES), name
+
+
+def test_compare_flags_regressions():
+    old = _run({"kernel/a/small": {"wall_s": 1.0, "peak_mb": 10.0}})
+    new = _run({"kernel/a/small": {"wall_s": 1.5, "peak_mb": 10.5}})
+    rows = {metric: regressed for _, metric, _, _, _, regressed in compare(old, new, 0.2)}
+    assert rows == {"wall_s": True, "peak_mb": False}
+
+
+def test_compare_ignores_noise_and_new_cases():
+    old = _run({"kernel/a/small": {"wall_s": 0.001}})
+    new = _run({"kernel/a/small": {"wall_s": 0.002}, "kernel/b/small": {"wall_s": 1.0}})
+    rows = compare(old, new, 0.2)
+    assert [(case, regressed) for case, _, _, _, _, regressed in rows] == [("kernel/a/small", False)]
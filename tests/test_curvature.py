@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from compute.curvature import FLIPPED, OPEN, PERIODIC, curvature_fields, seams
+from compute.surfaces import klein_bottle
+
+R, r = 3.0, 1.0
+
+
+def torus(steps=200):
+    u, v = np.meshgrid(np.linspace(0, 2 * np.pi, steps), np.linspace(0, 2 * np.pi, steps))
+    return (R + r * np.cos(v)) * np.cos(u), (R + r * np.cos(v)) * np.sin(u), r * np.sin(v), v
+
+
+def test_torus_curvatures():
+    x, y, z, v = torus()
+    f = curvature_fields(x, y, z)
+    np.testing.assert_allclose(f["K"], np.cos(v) / (r * (R + r * np.cos(v))), atol=2e-3)
+    # k1 >= k2 are 1/r around the tube and cos v / (R + r cos v) along it, up to the normal's sign
+    principal = np.sort(np.abs([f["k1"], f["k2"]]), axis=0)
+    np.testing.assert_allclose(principal[1], 1 / r, atol=2e-3)
+    np.testing.assert_allclose(principal[0], np.abs(np.cos(v) / (R + r * np.cos(v))), atol=2e-3)
+    assert np.all(f["k1"] >= f["k2"])
+
+
+def test_sphere_patch_is_umbilic():
+    u, v = np.meshgrid(np.linspace(0, 2 * np.pi, 120), np.linspace(0.3, np.pi - 0.3, 60))
+    rho = 3.0
+    f = curvature_fields(rho * np.sin(v) * np.cos(u), rho * np.sin(v) * np.sin(u), rho * np.cos(v))
+    np.testing.assert_allclose(f["K"], 1 / rho ** 2, rtol=2e-3)
+    np.testing.assert_allclose(np.abs(f["H"]), 1 / rho, rtol=2e-3)
+    assert np.all(f["d1"][1:-1] == 0)  # every direction is principal (open edges are one-sided)
+
+
+def test_plane_is_flat_with_orthonormal_directions():
+    x, y = np.meshgrid(np.linspace(-1, 1, 20), np.linspace(-1, 1, 30))
+    f = curvature_fields(x, y, 0.5 * x + 0.2 * y)
+    np.testing.assert_allclose(f["K"], 0, atol=1e-6)
+    np.testing.assert_allclose(f["H"], 0, atol=1e-6)
+
+
+def test_principal_directions_of_a_cylinder():
+    u, v = np.meshgrid(np.linspace(0, 2 * np.pi, 90), np.linspace(0, 2, 30))
+    f = curvature_fields(np.cos(u), np.sin(u), v)
+    # one principal direction is the axis, the other goes around it
+    axial = np.maximum(np.abs(f["d1"][..., 2]), np.abs(f["d2"][..., 2]))
+    np.testing.assert_allclose(axial, 1, atol=1e-3)
+    np.testing.assert_allclose(np.linalg.norm(f["d1"], axis=-1), 1, atol=1e-5)
+    np.testing.assert_allclose(np.einsum("...i,...i", f["d1"], f["d2"]), 0, atol=1e-5)
+
+
+def test_seam_kinds():
+    x, y, z, _ = torus(40)
+    assert seams(np.stack([x, y, z])) == (PERIODIC, PERIODIC)
+    assert seams(np.stack([x, y, z])[:, :20]) == (OPEN, PERIODIC)
+    assert FLIPPED in seams(np.stack(klein_bottle(u_steps=60, v_steps=60)))
+
+
+def test_too_small_grid_is_rejected():
+    with pytest.raises(ValueError):
+        curvature_fields(np.zeros((2, 5)), np.zeros((2, 5)), np.zeros((2, 5)))
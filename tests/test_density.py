@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from compute.attractors import solve_lorenz
+from compute.density import _lorenz_step, iter_density, iter_lorenz_density, rossler_density
+
+LORENZ = dict(sigma=10.0, rho=28.0, beta=8/3)
+
+
+@pytest.mark.parametrize("steps, walkers, chunk", [(10_000, 64, 32), (10_007, 64, 32), (50, 64, 32), (999, 7, 5)])
+def test_counts_every_sample_once(monkeypatch, steps, walkers, chunk):
+    monkeypatch.setattr("compute.density.PADDING", 1.0)  # nothing leaves the grid
+    for _, (counts, bounds) in iter_density(solve_lorenz, _lorenz_step, LORENZ, 0.01, steps, 16, mixing=1.0,
+                                            walkers=walkers, chunk=chunk):
+        pass
+    assert counts.shape == (16, 16, 16) and counts.dtype == np.int64
+    assert counts.sum() == steps
+    assert np.all(bounds[0] < bounds[1])
+
+
+def test_progress_is_monotone_and_ends_complete():
+    progress = [p for p, _ in iter_lorenz_density(steps=400_000, resolution=16)]
+    assert progress == sorted(progress) and progress[-1] == 1.0 and len(progress) > 1
+
+
+def test_density_lies_on_the_attractor():
+    counts, bounds = rossler_density(steps=200_000, resolution=32)
+    assert counts.sum() > 0.99 * 200_000
+    assert np.count_nonzero(counts) < 0.2 * counts.size  # a thin set, not a cloud
+
+
+def test_diverging_parameters_raise_before_any_counts():
+    chunks = iter_lorenz_density(sigma=30.0, rho=50.0, beta=0.5, dt=0.02, steps=10_000)
+    with pytest.raises(ValueError, match="diverges"):
+        next(chunks)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from compute.dimension import box_counts, fractal_dimensions, morton_codes
+from compute.fractals import barnsley_fern
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+def test_box_counts_match_brute_force(rng):
+    points = rng.random((5000, 2))
+    eps, counts, p2 = box_counts(points, bits=8)
+    codes, side = morton_codes(points, bits=8)
+    lo = points.min(axis=0)
+    for level in (1, 3, 5):
+        cells = np.clip(((points - lo) * (256 / side)).astype(int), 0, 255) >> (8 - level)
+        _, occupancy = np.unique(cells, axis=0, return_counts=True)
+        assert counts[level] == len(occupancy)
+        assert p2[level] == pytest.approx(np.sum(occupancy ** 2) / len(points) ** 2)
+    assert counts[0] == 1 and eps[1] == pytest.approx(side / 2)
+
+
+@pytest.mark.parametrize("shape, expected", [("square", 2.0), ("line", 1.0), ("cube", 3.0)])
+def test_box_dimension_of_simple_sets(rng, shape, expected):
+    if shape == "square":
+        points = rng.random((200_000, 2))
+    elif shape == "line":
+        t = rng.random(200_000)
+        points = np.column_stack([t, 0.5 * t])
+    else:
+        points = rng.random((200_000, 3))
+    fits = fractal_dimensions(points)
+    assert fits["box"].dimension == pytest.approx(expected, abs=0.1)
+    assert fits["correlation"].dimension == pytest.approx(expected, abs=0.1)
+
+
+def test_fern_is_fractional():
+    x, y = barnsley_fern(n_points=200_000, seed=1)
+    d0 = fractal_dimensions(np.column_stack([x, y]))["box"].dimension
+    assert 1.5 < d0 < 1.95
+
+
+def test_rejects_four_coordinates(rng):
+    with pytest.raises(ValueError):
+        morton_codes(rng.random((10, 4)))
@@ -0,0 +1,54 @@
+import csv
+import gzip
+import io
+
+import numpy as np
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from utils.export import EXPORT_FORMATS, export_file
+
+
+@pytest.fixture
+def arrays():
+    rng = np.random.default_rng(0)
+    return {"x": rng.normal(size=1000), "y": np.arange(1000.0), "z": rng.normal(size=(10, 100))}
+
+
+@pytest.mark.parametrize("fmt", EXPORT_FORMATS)
+def test_download_button_accepts_result(arrays, fmt):
+    data, _ = convert_data_to_bytes_and_infer_mime(export_file(arrays, fmt), RuntimeError("unsupported"))
+    assert len(data) > 0
+
+
+def test_npy_is_column_table(arrays, monkeypatch):
+    monkeypatch.setattr("utils.export.CHUNK_ROWS", 7)  # several blocks, the last partial
+    table = np.load(io.BytesIO(export_file(arrays, "npy")))
+    np.testing.assert_array_equal(table, np.column_stack([a.ravel() for a in arrays.values()]))
+
+
+def test_npz_keeps_names_and_shapes(arrays):
+    with np.load(io.BytesIO(export_file(arrays, "npz"))) as npz:
+        for name, a in arrays.items():
+            np.testing.assert_array_equal(npz[name], a)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "csv.gz"])
+def test_csv_round_trip(arrays, fmt):
+    data = export_file(arrays, fmt)
+    if fmt == "csv.gz":
+        data = gzip.decompress(data)
+    rows = list(csv.reader(io.StringIO(data.decode())))
+    assert rows[0] == list(arrays)
+    np.testing.assert_allclose(np.array(rows[1:], dtype=float),
+                               np.column_stack([a.ravel() for a in arrays.values()]), rtol=1e-9)
+
+
+def test_unequal_sizes_rejected():
+    with pytest.raises(ValueError, match="equally sized"):
+        export_file({"a": np.zeros(3), "b": np.zeros(4)}, "csv")
+
+
+def test_unknown_format_rejected(arrays):
+    with pytest.raises(ValueError, match="unknown export format"):
+        export_file(arrays, "xlsx")
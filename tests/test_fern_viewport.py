@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from compute.fractals import FERN_BOUNDS, barnsley_fern, fern_viewport
+
+
+@pytest.mark.parametrize("half_width", [1.0, 0.05, 1e-4])
+def test_points_fill_the_viewport_at_any_depth(half_width):
+    fx, fy = barnsley_fern(1000, seed=0)
+    cx, cy = fx[500], fy[500]  # a point on the attractor
+    x, y = fern_viewport(cx - half_width, cx + half_width, cy - half_width, cy + half_width, target=20_000)
+    assert len(x) > 1000
+    assert np.all(np.abs(x - cx) <= half_width) and np.all(np.abs(y - cy) <= half_width)
+
+
+def test_full_view_matches_chaos_game():
+    x, y = fern_viewport(*FERN_BOUNDS, target=50_000)
+    fx, fy = barnsley_fern(50_000, seed=3)
+    bins = [np.linspace(FERN_BOUNDS[0], FERN_BOUNDS[1], 11), np.linspace(FERN_BOUNDS[2], FERN_BOUNDS[3], 11)]
+    occupied = np.histogram2d(x, y, bins)[0] > 0
+    reference = np.histogram2d(fx, fy, bins)[0] > 0
+    assert (occupied == reference).mean() > 0.9
+
+
+def test_empty_viewport_and_seed():
+    x, _ = fern_viewport(10, 11, 10, 11, target=1000)
+    assert len(x) == 0
+    a = fern_viewport(-1, 1, 2, 4, target=5000, seed=7)
+    b = fern_viewport(-1, 1, 2, 4, target=5000, seed=7)
+    np.testing.assert_array_equal(a[0], b[0])
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from utils.array_cache import ArrayCache
+from utils.gallery import Gallery, spawn_seeds
+
+
+def test_spawn_seeds_are_reproducible():
+    assert spawn_seeds(0, 8) == spawn_seeds(0, 8)
+    assert spawn_seeds(0, 4) == spawn_seeds(0, 8)[:4]
+
+
+def test_spawn_seeds_are_distinct():
+    seeds = spawn_seeds(0, 64) + spawn_seeds(1, 64)
+    assert len(set(seeds)) == len(seeds)
+    assert all(isinstance(s, int) and s >= 0 for s in seeds)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Point the parent and the worker process at one empty cache."""
+    monkeypatch.setenv("MATHSVIS_ARRAY_CACHE", str(tmp_path))
+    cache = ArrayCache(tmp_path)
+    monkeypatch.setattr("utils.array_cache.default_cache", lambda: cache)
+    return cache
+
+
+def _wait(gallery, timeout=60):
+    deadline = time.time() + timeout
+    while gallery.finished is None:
+        assert time.time() < deadline, "gallery did not finish"
+        time.sleep(0.05)
+
+
+def _group_members(pgid):
+    """Live (non-zombie) processes in process group ``pgid``."""
+    members = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[2]) == pgid and fields[0] != "Z":
+            members.append(stat.parent.name)
+    return members
+
+
+def test_gallery_fills_the_cache(cache):
+    from compute.fractals import generate_snowflake
+
+    calls = [{"n_particles": 50, "seed": seed} for seed in spawn_seeds(0, 4)]
+    calls.append({"n_particles": 50, "symmetry": 0, "seed": 1})  # fails in the worker
+    gallery = Gallery("snowflake", calls, workers=2).start()
+    _wait(gallery)
+    assert sorted(gallery.ready) == [0, 1, 2, 3]
+    assert list(gallery.errors) == [4] and "ZeroDivisionError" in gallery.errors[4]
+    assert gallery.done == 5
+    # the worker wrote what a direct call reads back
+    hit = cache.cached(generate_snowflake).peek(**calls[0])
+    np.testing.assert_array_equal(hit, generate_snowflake(**calls[0]))
+
+    again = Gallery("snowflake", calls[:4]).start()
+    assert again.finished is not None and again._process is None
+    assert again.ready == {i: 0.0 for i in range(4)}
+
+
+@pytest.mark.skipif(not hasattr(os, "killpg") or not sys.platform.startswith("linux"), reason="needs /proc")
+def test_stop_kills_the_worker_and_its_pool(cache):
+    calls = [{"n_particles": 3000, "seed": seed} for seed in spawn_seeds(0, 2)]
+    gallery = Gallery("snowflake", calls, workers=2).start()
+    pgid = gallery._process.pid
+    deadline = time.time() + 30
+    while len(_group_members(pgid)) < 3:  # the worker and its two pool processes
+        assert time.time() < deadline, "pool did not start"
+        time.sleep(0.05)
+    gallery.stop()
+    _wait(gallery)
+    assert gallery.errors == {0: "worker exited with status -9", 1: "worker exited with status -9"}
+    deadline = time.time() + 10
+    while _group_members(pgid):
+        assert time.time() < deadline, f"left behind: {_group_members(pgid)}"
+        time.sleep(0.05)
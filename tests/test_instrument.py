@@ -0,0 +1,64 @@
+import json
+import logging
+import time
+from functools import lru_cache
+
+import pytest
+
+from utils import instrument
+from utils.instrument import current_trace, finish_trace, start_trace, timed_kernel
+
+
+@pytest.fixture
+def log_path(tmp_path, monkeypatch):
+    path = tmp_path / "reruns.jsonl"
+    monkeypatch.setattr(instrument, "LOG_PATH", str(path))
+    instrument._logger.cache_clear()
+    yield path
+    logger = logging.getLogger("mathsvis.reruns")
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
+    instrument._logger.cache_clear()
+
+
+def test_kernel_cache_status_and_log(log_path):
+    @timed_kernel
+    def plain(n):
+        time.sleep(0.01)
+        return n
+
+    def square(n):
+        return n * n
+    cached = timed_kernel(square, cache=lru_cache(maxsize=None))
+
+    start_trace("demo", n=3)
+    assert plain(3) == 3 and cached(3) == 9
+    assert current_trace().cache == {"square": "miss"}
+    rec = finish_trace()
+    assert current_trace() is None
+    assert rec["page"] == "demo" and rec["params"] == {"n": 3}
+    assert rec["phases_ms"]["kernel"] >= 10
+
+    start_trace("demo", n=3)
+    cached(3)
+    assert finish_trace()["cache"] == {"square": "hit"}
+
+    lines = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [line["cache"] for line in lines] == [{"square": "miss"}, {"square": "hit"}]
+
+
+def test_nested_phases_count_once():
+    trace = start_trace("demo")
+    with trace.phase("kernel"):
+        with trace.phase("kernel"):
+            time.sleep(0.05)
+    assert 50 <= trace.phases["kernel"] < 100  # not twice
+    trace.mark("figure")
+    assert set(trace.phases) == {"kernel", "figure"}
+    instrument._current.set(None)
+
+
+def test_untraced_calls_pass_through():
+    assert finish_trace() is None
+    assert timed_kernel(abs)(-2) == 2
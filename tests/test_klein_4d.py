@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from compute.surfaces import ROTATION_PLANES, klein_bottle_4d, rotation_frames
+
+STEPS = 61  # u = pi, where the 3D shadow crosses itself, is on the grid
+
+
+def close_pairs(points, radius):
+    """Index pairs ``i < j`` closer than ``radius``, by brute force in row blocks."""
+    pairs = []
+    for start in range(0, len(points), 500):
+        d = np.linalg.norm(points[start:start + 500, None] - points[None], axis=-1)
+        i, j = np.nonzero(d < radius)
+        i += start
+        pairs.append(np.stack([i[i < j], j[i < j]]))
+    return np.concatenate(pairs, axis=1)
+
+
+def interior_coincidences(points, shape):
+    i, j = close_pairs(points, 1e-2)  # grid spacing is about 0.1
+    row, col = np.unravel_index(np.concatenate([i, j]), shape)
+    on_seam = (row == 0) | (row == shape[0] - 1) | (col == 0) | (col == shape[1] - 1)
+    pair_on_seam = on_seam[:len(i)] & on_seam[len(i):]
+    return int(np.count_nonzero(~pair_on_seam))
+
+
+def test_embedding_has_no_self_intersection():
+    x, y, z, w = klein_bottle_4d(u_steps=STEPS, v_steps=STEPS)
+    shape = x.shape
+    assert interior_coincidences(np.column_stack([x.ravel(), y.ravel(), z.ravel()]), shape) > 0
+    assert interior_coincidences(np.column_stack([x.ravel(), y.ravel(), z.ravel(), w.ravel()]), shape) == 0
+
+
+@pytest.mark.parametrize("plane", ROTATION_PLANES)
+def test_first_frame_is_unrotated(plane):
+    x, y, z, w = klein_bottle_4d(u_steps=20, v_steps=20)
+    frames = rotation_frames((x, y, z, w), plane, n_frames=8, distance=3.0)
+    assert frames.shape == (8, 3, 20, 20) and frames.dtype == np.float32
+    eye = 3.0 * np.sqrt(x ** 2 + y ** 2 + z ** 2 + w ** 2).max()
+    np.testing.assert_allclose(frames[0], np.stack([x, y, z]) * eye / (eye - w), rtol=1e-5, atol=1e-5)
+
+
+def test_rotation_within_3d_preserves_lengths():
+    rng = np.random.default_rng(0)
+    x, y, z = rng.normal(size=(3, 50))
+    frames = rotation_frames((x, y, z, np.zeros(50)), "xy", n_frames=12)
+    np.testing.assert_allclose(np.linalg.norm(frames, axis=1), np.broadcast_to(np.sqrt(x**2 + y**2 + z**2), (12, 50)),
+                               rtol=1e-5)
+    np.testing.assert_allclose(frames[:, 2], np.broadcast_to(z, (12, 50)), rtol=1e-5)
@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.load import ROOT, run_level, session, shared_runtime
+
+
+def test_session_opens_and_scrubs():
+    samples = []
+    session(ROOT / "pages" / "lorenz.py", seed=0, scrubs=2, think_s=0, timeout=60, samples=samples)
+    assert [s["kind"] for s in samples] == ["open", "scrub", "scrub"]
+    assert all(s["error"] is None and s["ms"] > 0 for s in samples)
+
+
+@pytest.mark.parametrize("page", ["lorenz", "rossler"])
+def test_overlapping_sessions_share_the_runtime(page):
+    with shared_runtime():
+        row = run_level(ROOT / "pages" / f"{page}.py", sessions=2, scrubs=3, think_s=0.05, timeout=60, seed=0)
+    assert row["first_error"] is None
+    assert row["sessions"] == 2 and row["errors"] == 0
+    assert row["reruns"] == 2 * (1 + 3)
@@ -0,0 +1,97 @@
+import io
+from collections import Counter
+
+import numpy as np
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from utils.mesh import MESH_FORMATS, export_mesh, surface_mesh, write_obj
+
+
+def torus(steps=40, R=3.0, r=1.0):
+    u, v = np.meshgrid(np.linspace(0, 2 * np.pi, steps), np.linspace(0, 2 * np.pi, steps))
+    return (R + r * np.cos(v)) * np.cos(u), (R + r * np.cos(v)) * np.sin(u), r * np.sin(v)
+
+
+def trefoil(steps=40):
+    u, v = np.meshgrid(np.linspace(0, 2 * np.pi, steps), np.linspace(0, 2 * np.pi, steps))
+    ring = 4 * (1 + 0.25 * np.sin(3 * v)) + np.cos(u)
+    return ring * np.cos(2 * v), ring * np.sin(2 * v), np.sin(u) + 2 * np.cos(3 * v)
+
+
+def klein(steps=40, radius=2.0):
+    """The figure-8 immersion, whose u seam closes up reversed."""
+    u, v = np.meshgrid(np.linspace(0, 2 * np.pi, steps), np.linspace(0, 2 * np.pi, steps))
+    tube = radius + np.cos(u / 2) * np.sin(v) - np.sin(u / 2) * np.sin(2 * v)
+    return tube * np.cos(u), tube * np.sin(u), np.sin(u / 2) * np.sin(v) + np.cos(u / 2) * np.sin(2 * v)
+
+
+def edge_counts(faces):
+    edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1)
+    return Counter(map(tuple, edges.tolist()))
+
+
+@pytest.mark.parametrize("grids", [torus(), trefoil()], ids=["torus", "trefoil"])
+def test_welded_mesh_is_closed_manifold(grids):
+    vertices, faces, normals = surface_mesh(*grids)
+    assert set(edge_counts(faces).values()) == {2}
+    assert len(vertices) - len(edge_counts(faces)) + len(faces) == 0  # Euler characteristic of a torus
+    np.testing.assert_allclose(np.linalg.norm(normals, axis=1), 1, rtol=1e-5)
+
+
+def test_unwelded_mesh_has_open_seams():
+    vertices, faces, _ = surface_mesh(*torus(), weld=False)
+    assert len(vertices) == 40 * 40
+    assert 1 in edge_counts(faces).values()
+
+
+def test_klein_bottle_welds_across_flipped_seam():
+    _, faces, _ = surface_mesh(*klein())
+    assert set(edge_counts(faces).values()) == {2}
+
+
+def test_return_index_maps_grid_values():
+    x, y, z = torus()
+    vertices, _, _, index = surface_mesh(x, y, z, return_index=True)
+    np.testing.assert_array_equal(vertices[:, 2], z.ravel()[index].astype(np.float32))
+
+
+@pytest.mark.parametrize("fmt", MESH_FORMATS)
+def test_download_button_accepts_result(fmt):
+    data, _ = convert_data_to_bytes_and_infer_mime(export_mesh(*torus(), fmt), RuntimeError("unsupported"))
+    assert len(data) > 0
+
+
+def test_stl_record_count():
+    _, faces, _ = surface_mesh(*torus())
+    data = export_mesh(*torus(), "stl")
+    assert np.frombuffer(data[80:84], dtype="<u4")[0] == len(faces)
+    assert len(data) == 84 + 50 * len(faces)
+
+
+def test_ply_header():
+    vertices, faces, _ = surface_mesh(*torus())
+    header = export_mesh(*torus(), "ply").split(b"end_header\n")[0].decode()
+    assert f"element vertex {len(vertices)}" in header
+    assert f"element face {len(faces)}" in header
+    assert "property float nx" in header
+
+
+@pytest.mark.parametrize("with_normals", [True, False])
+def test_obj_matches_printf(with_normals):
+    vertices, faces, normals = surface_mesh(*torus(steps=120, R=300.0, r=100.0))
+    vertices[0] = [-1e-7, 999.9999996, -12.5]  # "-0.000000", a carry into the integer part
+    vertices[1, 0] = np.nan
+    normals = normals if with_normals else None
+    out = io.BytesIO()
+    write_obj(out, vertices, faces, normals, chunk_rows=1000)
+
+    lines = ["# MathsVisuals surface"]
+    lines += ["v %.6f %.6f %.6f" % tuple(p) for p in vertices.tolist()]
+    if with_normals:
+        lines += ["vn %.5f %.5f %.5f" % tuple(p) for p in normals.tolist()]
+        lines += ["f %d//%d %d//%d %d//%d" % tuple(np.repeat(np.add(f, 1), 2)) for f in faces.tolist()]
+    else:
+        lines += ["f %d %d %d" % tuple(np.add(f, 1)) for f in faces.tolist()]
+    got = out.getvalue().decode().splitlines()
+    assert got == lines
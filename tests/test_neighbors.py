@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from compute.attractors import solve_lorenz
+from compute.neighbors import (GridIndex, correlation_dimension, correlation_sum, neighbor_pairs,
+                               recurrence_image)
+
+
+def brute_pairs(points, radius):
+    points = points[:, None] if points.ndim == 1 else points
+    d = np.linalg.norm(points[:, None] - points[None], axis=-1)
+    i, j = np.nonzero(np.triu(d < radius, k=1))
+    return set(zip(i.tolist(), j.tolist())), d
+
+
+@pytest.mark.parametrize("dim", [1, 2, 3])
+def test_neighbor_pairs_match_brute_force(dim):
+    points = np.random.default_rng(dim).random((600, dim)) if dim > 1 else np.random.default_rng(1).random(600)
+    i, j = neighbor_pairs(points, 0.08, max_pairs=1000)  # many small chunks
+    assert np.all(i < j)
+    assert set(zip(i.tolist(), j.tolist())) == brute_pairs(points, 0.08)[0]
+    assert len(i) == len(set(zip(i.tolist(), j.tolist())))  # no pair twice
+
+
+def test_radius_beyond_reach_is_rejected():
+    with pytest.raises(ValueError):
+        next(GridIndex(np.zeros((3, 2)), 0.1).pairs(0.5))
+
+
+def test_correlation_sum_matches_brute_force():
+    points = np.random.default_rng(0).random((400, 2))
+    radii = [0.02, 0.05, 0.1]
+    _, c, counts = correlation_sum(points, radii, theiler=3)
+    _, d = brute_pairs(points, 1)
+    i, j = np.triu_indices(len(points), k=4)
+    for r, count in zip(radii, counts):
+        assert count == np.count_nonzero(d[i, j] < r)
+    assert c[-1] == pytest.approx(counts[-1] / len(i))
+
+
+def test_recurrence_image_is_exact_when_small():
+    points = np.random.default_rng(2).random((50, 2))
+    image, edges = recurrence_image(points, 0.2, size=64)
+    _, d = brute_pairs(points, 1)
+    np.testing.assert_array_equal(image, (d < 0.2).astype(float))
+    np.testing.assert_array_equal(edges, np.arange(51))
+
+
+def test_lorenz_correlation_dimension():
+    x, y, z = solve_lorenz(steps=60_000)
+    fit = correlation_dimension(np.column_stack([x, y, z])[5000:])
+    assert fit.dimension == pytest.approx(2.05, abs=0.2)
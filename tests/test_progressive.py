@@ -0,0 +1,61 @@
+import time
+
+import numpy as np
+
+from utils.array_cache import ArrayCache
+from utils.progressive import coarse_to_fine, progressive, refine, stream
+
+
+def test_coarse_to_fine_sizes():
+    assert coarse_to_fine(100, 20) == [20, 80, 100]
+    assert coarse_to_fine(20, 20) == [20]
+    assert coarse_to_fine(10, 20) == [10]
+
+
+def test_refine_ends_at_full_resolution():
+    steps = list(refine(lambda n: n * n, 100, 20))
+    assert steps[-1] == (1.0, 10_000)
+    assert [p for p, _ in steps] == sorted(p for p, _ in steps)
+
+
+def slow_chunks(n, delay):
+    for i in range(1, n + 1):
+        time.sleep(delay)
+        yield i / n, np.full(3, i)
+
+
+def test_stream_throttles_previews_and_returns_final(monkeypatch):
+    monkeypatch.setattr("utils.progressive.FIRST_PAINT_S", 0.0)
+    monkeypatch.setattr("utils.progressive.REFRESH_S", 10.0)
+    painted = []
+    result = stream(slow_chunks(5, 0.01), lambda r, p, i: painted.append(p))
+    assert painted == [0.2]  # the first partial result only; the final one is not rendered
+    np.testing.assert_array_equal(result, np.full(3, 5))
+
+
+def test_fast_results_are_never_previewed(monkeypatch):
+    monkeypatch.setattr("utils.progressive.FIRST_PAINT_S", 10.0)
+    painted = []
+    stream(slow_chunks(5, 0), lambda *a: painted.append(a))
+    assert painted == []
+
+
+def test_progressive_primes_the_cache(tmp_path):
+    cache = ArrayCache(tmp_path)
+
+    @cache.cached
+    def full(n):
+        return np.arange(n)
+
+    def chunks(n):
+        yield 0.5, np.arange(n // 2)
+        yield 1.0, np.arange(n)
+
+    first = progressive(full, chunks, lambda *a: None, 10)
+    np.testing.assert_array_equal(first, np.arange(10))
+    assert full.peek(10) is not None
+
+    def unreachable(n):
+        raise AssertionError("a cache hit must not stream")
+
+    np.testing.assert_array_equal(progressive(full, unreachable, lambda *a: None, 10), first)
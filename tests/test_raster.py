@@ -0,0 +1,50 @@
+import struct
+import zlib
+
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.raster import Canvas, encode_png, iter_frames, parse_color, render_figure
+
+
+def decode_png(data):
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    w, h = struct.unpack(">II", data[16:24])
+    length = struct.unpack(">I", data[33:37])[0]
+    raw = np.frombuffer(zlib.decompress(data[41:41 + length]), dtype=np.uint8).reshape(h, 1 + 3 * w)
+    return raw[:, 1:].reshape(h, w, 3)
+
+
+def test_png_round_trip():
+    img = np.random.default_rng(0).integers(0, 256, (7, 5, 3), dtype=np.uint8)
+    np.testing.assert_array_equal(decode_png(encode_png(img)), img)
+
+
+def test_nearest_fragment_wins():
+    canvas = Canvas(4, 4, background="black")
+    red, blue = parse_color("red")[0], parse_color("blue")[0]
+    canvas.splat(np.array([1, 1]), np.array([2, 2]), np.array([5.0, 1.0]), np.stack([red, blue]))
+    canvas.splat(np.array([1]), np.array([2]), np.array([3.0]), red[None])  # behind blue
+    np.testing.assert_array_equal(canvas.to_uint8()[2, 1], [0, 0, 255])
+    assert canvas.to_uint8()[0, 0].sum() == 0
+
+
+def test_render_scatter_and_surface():
+    line = go.Figure(go.Scatter(x=[0, 1], y=[0, 1], mode="lines", line=dict(color="white", width=4)),
+                     layout=dict(plot_bgcolor="black", paper_bgcolor="black"))
+    img = render_figure(line, width=60, height=40)
+    assert img.shape == (40, 60, 3) and img.dtype == np.uint8
+    assert img.max() > 100 and img.min() == 0
+
+    x, y = np.meshgrid(np.linspace(-1, 1, 20), np.linspace(-1, 1, 20))
+    fig = go.Figure(go.Surface(x=x, y=y, z=x * y), layout=dict(scene_bgcolor="black", paper_bgcolor="black"))
+    surface = render_figure(fig, width=60, height=40)
+    assert 0.1 < surface.any(axis=-1).mean() < 0.9  # the saddle covers part of the frame
+
+
+def test_iter_frames_merge_onto_base():
+    fig = go.Figure(go.Scatter(x=[0, 1], y=[0, 1], name="base"),
+                    frames=[go.Frame(data=[go.Scatter(y=[1, 0])], name="f0")])
+    (name, frame), = iter_frames(fig)
+    assert name == "f0"
+    assert list(frame["data"][0]["y"]) == [1, 0] and frame["data"][0]["name"] == "base"
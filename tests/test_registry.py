@@ -0,0 +1,35 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from utils.registry import PAGES, featured_pages, get_page
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_every_page_is_registered_once():
+    registered = [p.path for p in PAGES]
+    assert len(set(registered)) == len(registered)
+    assert set(registered) == {f"pages/{f.name}" for f in (ROOT / "pages").glob("*.py")}
+
+
+def test_featured_pages_have_thumbnails():
+    assert featured_pages()
+    for page in featured_pages():
+        assert (ROOT / page.thumbnail).is_file()
+
+
+def test_get_page_by_stem():
+    assert get_page("lorenz").title == "Lorenz Attractor"
+    with pytest.raises(KeyError):
+        get_page("nonexistent")
+
+
+def test_landing_imports_stay_light():
+    # What streamlit_app.py imports before a page is opened
+    code = ("import sys, utils.registry, utils.warmup; "
+            "heavy = [m for m in sys.modules if m == 'numpy' or m.startswith('compute')]; "
+            "sys.exit(f'imported {heavy}' if heavy else 0)")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from compute.fractals import HEX_STEPS, _hex_xy, iter_reiter_snowflake, reiter_snowflake
+
+
+def reference(alpha, beta, gamma, radius, generations):
+    """The automaton on the whole disk, one dense array step per generation."""
+    m = int(np.ceil(2 * radius / np.sqrt(3))) + 2
+    i, j = np.meshgrid(np.arange(-m, m + 1), np.arange(-m, m + 1), indexing="ij")
+    x, y = _hex_xy(i, j)
+    inside = np.hypot(x, y) <= radius
+    shift = lambda a, di, dj: np.roll(a, (-di, -dj), axis=(0, 1))  # noqa: E731  a[i + di, j + dj]
+    edge = inside & ~np.logical_and.reduce([shift(inside, di, dj) for di, dj in HEX_STEPS])
+    s = np.full(i.shape, beta)
+    s[m, m] = 1.0
+    born = np.where(s >= 1, 0, -1)
+    for g in range(1, generations + 1):
+        ice = born >= 0
+        receptive = inside & (ice | np.logical_or.reduce([shift(ice, di, dj) for di, dj in HEX_STEPS]))
+        diffusing = np.where(receptive, 0.0, s)
+        total = sum(shift(diffusing, di, dj) for di, dj in HEX_STEPS)
+        s = np.where(inside, diffusing + alpha / 12 * (total - 6 * diffusing) + np.where(receptive, s + gamma, 0), beta)
+        frozen = inside & (s >= 1) & (born < 0)
+        born[frozen] = g
+        if (frozen & edge).any():
+            break
+    ice = born >= 0
+    return x[ice], y[ice], born[ice]
+
+
+def cells(x, y, generation):
+    return {(round(a, 6), round(b, 6), int(g)) for a, b, g in zip(x, y, generation)}
+
+
+@pytest.mark.parametrize("params", [
+    dict(alpha=1.0, beta=0.4, gamma=0.001, radius=20, generations=400),
+    dict(alpha=1.0, beta=0.35, gamma=0.01, radius=15, generations=2000),  # reaches the edge
+    dict(alpha=2.0, beta=0.6, gamma=0.0, radius=12, generations=300),
+])
+def test_matches_dense_automaton(params):
+    assert cells(*reiter_snowflake(**params)) == cells(*reference(**params))
+
+
+def test_crystal_has_hexagonal_symmetry():
+    x, y, generation = reiter_snowflake(beta=0.4, gamma=0.001, radius=30, generations=600)
+    assert len(x) > 7
+    start = cells(x, y, generation)
+    for angle in (np.pi / 3, np.pi):
+        c, s = np.cos(angle), np.sin(angle)
+        assert cells(c * x - s * y, s * x + c * y, generation) == start
+    assert cells(x, -y, generation) == start
+
+
+def test_progress_ends_with_final_crystal():
+    steps = list(iter_reiter_snowflake(radius=15, generations=250, every=100))
+    assert [p for p, _ in steps] == [0.4, 0.8, 1.0]
+    assert cells(*steps[-1][1]) == cells(*reiter_snowflake(radius=15, generations=250))
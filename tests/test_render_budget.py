@@ -0,0 +1,48 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.plotting import RenderBudget, fit_to_budget
+
+SMALL = RenderBudget(svg_points=100, gl_points=1000, points_3d=500, surface_cells=400,
+                     frame_points=2000, frame_cells=2000, density_bins=16)
+
+
+def test_small_figure_is_untouched():
+    fig = go.Figure([go.Scatter(x=[1, 2], y=[3, 4]), go.Surface(z=[[1, 2], [3, 4]])])
+    assert fit_to_budget(fig, SMALL) == []
+    assert [t.type for t in fig.data] == ["scatter", "surface"]
+
+
+def test_scatter_moves_to_webgl_then_density():
+    fig = go.Figure([go.Scatter(x=np.arange(500), y=np.arange(500), mode="markers"),
+                     go.Scatter(x=np.arange(5000), y=np.arange(5000), mode="markers"),
+                     go.Scatter(x=np.arange(5000), y=np.arange(5000), mode="lines")])
+    notes = fit_to_budget(fig, SMALL)
+    assert [t.type for t in fig.data] == ["scattergl", "heatmap", "scattergl"]
+    assert len(fig.data[2].x) <= SMALL.gl_points + 1
+    assert len(notes) == 3
+
+
+def test_list_built_surface_is_decimated():
+    z = np.arange(60 * 50, dtype=float).reshape(60, 50)
+    fig = go.Figure([go.Surface(z=z.tolist(), surfacecolor=z.tolist())])
+    fit_to_budget(fig, SMALL)
+    out = np.asarray(fig.data[0].z)
+    assert out.size <= 2 * SMALL.surface_cells
+    assert np.asarray(fig.data[0].surfacecolor).shape == out.shape
+
+
+def test_list_built_surface_frames_are_decimated():
+    z = np.ones((40, 40)).tolist()
+    fig = go.Figure([go.Surface(z=z)], frames=[go.Frame(data=[go.Surface(z=z)]) for _ in range(4)])
+    notes = fit_to_budget(fig, SMALL)
+    assert any("animation" in n for n in notes)
+    assert all(np.asarray(f.data[0].z).size < 40 * 40 for f in fig.frames)
+
+
+def test_scatter3d_is_strided_keeping_endpoints():
+    x = np.arange(2000.0)
+    fig = go.Figure([go.Scatter3d(x=x, y=x, z=x, mode="lines")])
+    fit_to_budget(fig, SMALL)
+    kept = np.asarray(fig.data[0].x)
+    assert len(kept) <= SMALL.points_3d + 1 and kept[0] == 0 and kept[-1] == 1999
@@ -0,0 +1,63 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from compute.surfaces import ExpressionError, function_surface
+from utils.sandbox import Sandbox, SandboxError
+
+
+@pytest.fixture(scope="module")
+def sandbox():
+    box = Sandbox(workers=1, timeout=5.0, memory_bytes=256 << 20)
+    yield box
+    box.close()
+
+
+@pytest.mark.parametrize("expr", [
+    "lambda: 1",
+    "__import__('os').system('true')",
+    "open('/etc/passwd')",
+    "x.__class__",
+    "np.load('x.npy')",
+    "x[0]",
+    "sin(x",
+    "x" + " + x" * 400,
+])
+def test_rejected_expressions_are_invalid(sandbox, expr):
+    with pytest.raises(SandboxError) as info:
+        sandbox.call(function_surface, expr, 3.0, 3.0, 20)
+    assert info.value.kind == "invalid"
+
+
+def test_evaluation_failure_is_runtime(sandbox):
+    with pytest.raises(ExpressionError):
+        function_surface("1 // 0")
+    with pytest.raises(SandboxError) as info:
+        sandbox.call(function_surface, "1 // 0", 3.0, 3.0, 20)
+    assert info.value.kind == "runtime"
+    assert str(info.value).startswith("ZeroDivisionError")
+
+
+def test_result_and_worker_reuse(sandbox):
+    X, Y, Z = sandbox.call(function_surface, "np.sin(x) * np.cos(y)", 3.0, 3.0, 20)
+    np.testing.assert_allclose(Z, np.sin(X) * np.cos(Y))
+    assert sandbox.call(os.getpid) == sandbox.call(os.getpid)
+
+
+def test_limits():
+    box = Sandbox(workers=1, timeout=0.5, memory_bytes=128 << 20)
+    try:
+        with pytest.raises(SandboxError) as info:
+            box.call(time.sleep, 5)
+        assert info.value.kind == "timeout"
+        with pytest.raises(SandboxError) as info:
+            box.call(bytearray, 1 << 30)
+        assert info.value.kind == "memory"
+        with pytest.raises(SandboxError) as info:
+            box.call(os._exit, 3)
+        assert info.value.kind == "crashed"
+        assert box.call(sum, [1, 2, 3]) == 6  # replaced workers still serve
+    finally:
+        box.close()
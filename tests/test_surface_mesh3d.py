@@ -0,0 +1,23 @@
+import numpy as np
+
+from compute.surfaces import trefoil_surface
+from utils.plotting import surface_mesh3d
+
+
+def test_trefoil_is_welded_and_compact():
+    x, y, z = trefoil_surface(u_steps=40, v_steps=30)
+    mesh = surface_mesh3d(x, y, z, colorscale="Viridis")
+    assert len(mesh.x) == 39 * 29
+    assert len(mesh.i) == 2 * 39 * 29
+    assert mesh.x.dtype == mesh.intensity.dtype == np.float32
+    assert mesh.i.dtype == np.uint16
+    assert max(mesh.i.max(), mesh.j.max(), mesh.k.max()) < len(mesh.x)
+    assert mesh.colorscale[0][1] == "#440154"
+
+
+def test_intensity_follows_the_vertices():
+    x, y, z = trefoil_surface(u_steps=20, v_steps=20)
+    np.testing.assert_allclose(surface_mesh3d(x, y, z).intensity, surface_mesh3d(x, y, z).z)
+    values = np.hypot(x, y)
+    mesh = surface_mesh3d(x, y, z, intensity=values)
+    np.testing.assert_allclose(mesh.intensity, np.hypot(mesh.x, mesh.y), rtol=1e-5)
@@ -0,0 +1,72 @@
+import threading
+
+import numpy as np
+import pytest
+
+from compute.attractors import solve_lorenz
+from compute.trajectories import TrajectoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TrajectoryStore(spill_dir=tmp_path)
+
+
+def test_incremental_run_is_bit_identical(store):
+    lorenz = store.cached(solve_lorenz)
+    for steps in (100, 1500, 4000):
+        lorenz(steps=steps)
+    full = solve_lorenz(steps=4000)
+    for stored, expected in zip(lorenz(steps=4000), full):
+        np.testing.assert_array_equal(stored, expected)
+
+
+def test_shorter_request_is_read_only_view(store):
+    lorenz = store.cached(solve_lorenz)
+    x, _, _ = lorenz(steps=2000)
+    short, _, _ = lorenz(steps=500)
+    assert len(short) == 500 and np.shares_memory(short, x)
+    assert not short.flags.writeable
+
+
+def test_spilled_chunked_run_matches(tmp_path):
+    store = TrajectoryStore(spill_steps=3000, chunk_steps=700, spill_dir=tmp_path)
+    x, y, z = store.trajectory(solve_lorenz, 5000, 0.01, (0.1, 0.0, 0.0), sigma=10.0, rho=28.0, beta=8/3)
+    assert isinstance(x.base, np.memmap) or isinstance(x, np.memmap)
+    np.testing.assert_array_equal(z, solve_lorenz(steps=5000)[2])
+    store.clear()
+    assert not any(tmp_path.iterdir())
+
+
+def test_lru_eviction_keeps_budget(store):
+    store.max_bytes = 3 * 3 * 8 * 2048  # about three 2000-step trajectories
+    lorenz = store.cached(solve_lorenz)
+    for rho in range(20, 28):
+        lorenz(rho=float(rho), steps=2000)
+    assert store.nbytes() <= store.max_bytes
+    assert 0 < len(store) < 8
+
+
+def test_other_keys_are_not_blocked_by_an_integration(store):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(scale=1.0, dt=0.1, steps=10, initial=(0.0,)):
+        started.set()
+        release.wait(5)
+        return (np.arange(steps) * scale,)
+
+    def fast(dt=0.1, steps=10, initial=(0.0,)):
+        return (np.zeros(steps),)
+
+    worker = threading.Thread(target=store.cached(slow), kwargs={"steps": 50})
+    worker.start()
+    assert started.wait(5)
+    try:
+        # would deadlock until release if the store lock were held meanwhile
+        done = threading.Event()
+        threading.Thread(target=lambda: (store.cached(fast)(steps=20), done.set())).start()
+        assert done.wait(2)
+    finally:
+        release.set()
+        worker.join(5)
+    assert len(store) == 2
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from compute.kernels import KERNELS
+from utils.warmup import CACHED_PAGES, WarmupJob, _params, load_jobs
+
+
+def test_cached_pages_name_kernels():
+    for page, (kernel, cache) in CACHED_PAGES.items():
+        assert kernel in KERNELS, page
+        assert cache in ("disk", "trajectory")
+
+
+def test_params_match_default_types():
+    params = _params({"rho": 28.0, "steps": 100}, {"rho": 30, "steps": 50})
+    assert params == {"rho": 30.0, "steps": 50}
+    assert isinstance(params["rho"], float) and isinstance(params["steps"], int)
+    with pytest.raises(ValueError, match="unknown parameter"):
+        _params({"rho": 28.0}, {"sigma": 10})
+
+
+def test_load_jobs_orders_imports_defaults_popular(tmp_path):
+    path = tmp_path / "warmup.json"
+    path.write_text(json.dumps({"klein": [{"twist": 0.5}]}))
+    jobs = load_jobs(path)
+    assert jobs[0] == WarmupJob("imports")
+    assert jobs[1:-1] == [WarmupJob(page) for page in CACHED_PAGES]
+    assert jobs[-1] == WarmupJob("klein", {"twist": 0.5})
+    assert jobs[-1].label == "klein (twist=0.5)" and jobs[-1].shared
+    assert not WarmupJob("lorenz").shared
+
+
+def test_load_jobs_without_config():
+    assert len(load_jobs("")) == 1 + len(CACHED_PAGES)
+
+
+def test_load_jobs_rejects_unknown_pages(tmp_path):
+    path = tmp_path / "warmup.json"
+    path.write_text(json.dumps({"spiral": [{}]}))
+    with pytest.raises(ValueError, match="no cached page"):
+        load_jobs(path)
@@ -0,0 +1,278 @@
+"""Content-addressed on-disk cache for functions that return NumPy arrays.
+
+Results are stored as plain ``.npy`` files under one directory per key and
+handed back as read-only ``np.memmap`` views, so a hit costs a few page
+faults instead of an unpickle-and-copy, survives restarts, and is shared by
+every server process on the machine::
+
+    from utils.array_cache import disk_cache
+
+    @disk_cache
+    def klein_bottle(...): ...
+
+Keys hash the function's name and source, the source of every repo module
+reachable from its globals (so editing a helper the kernel calls counts too)
+and its bound arguments. A global byte budget
+is enforced by evicting least-recently-used entries (hits touch the entry's
+mtime). Writers publish entries with an atomic rename and hold an ``flock``
+while computing, so concurrent processes compute each result once. Keys
+share a fixed set of lock files, picked by key prefix, so the lock directory
+stays bounded however many entries come and go; lock files are never
+deleted, since a writer blocked on one must share its inode with the next.
+Readers take no lock and treat an entry evicted under them as a miss.
+
+``MATHSVIS_ARRAY_CACHE`` sets the directory (default ``.array_cache/`` in the
+repo) and ``MATHSVIS_ARRAY_CACHE_BYTES`` the budget (default 1 GiB).
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_DIR = os.environ.get("MATHSVIS_ARRAY_CACHE", str(ROOT / ".array_cache"))
+DEFAULT_MAX_BYTES = int(os.environ.get("MATHSVIS_ARRAY_CACHE_BYTES", 1 << 30))
+
+META = "meta.json"
+LOCK_PREFIX = 2  # hex digits of the key naming its lock file: 256 lock files
+
+
+_held = threading.local()
+
+
+@contextmanager
+def _flock(path):
+    """Exclusive advisory lock on ``path`` (a no-op where fcntl is missing).
+
+    Re-entrant per thread: a cached function calling another whose key
+    shares its lock file must not wait on itself.
+    """
+    held = _held.__dict__.setdefault("paths", set())
+    if fcntl is None or path in held:
+        yield
+        return
+    with open(path, "a+") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        held.add(path)
+        try:
+            yield
+        finally:
+            held.discard(path)
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _split(result):
+    """Flatten a result into (kind, names, arrays)."""
+    if isinstance(result, np.ndarray):
+        return "array", None, [result]
+    if isinstance(result, dict):
+        return "dict", list(result), list(result.values())
+    if isinstance(result, (tuple, list)):
+        return "tuple", None, list(result)
+    raise TypeError(f"cannot cache {type(result).__name__}; expected an array, tuple or dict of arrays")
+
+
+def _join(kind, names, arrays):
+    if kind == "array":
+        return arrays[0]
+    if kind == "dict":
+        return dict(zip(names, arrays))
+    return tuple(arrays)
+
+
+def _encode(value):
+    """JSON fallback for key arguments; arrays hash their contents, since
+    their repr elides all but a few elements."""
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha256(np.ascontiguousarray(value).view(np.uint8)).hexdigest()
+        return f"ndarray:{value.dtype}:{value.shape}:{digest}"
+    return repr(value)
+
+
+def _repo_sources(namespace):
+    """Yield ``(name, source)`` for every module under ``ROOT`` that the
+    values of ``namespace`` come from, following each module's own globals."""
+    seen = set()
+    todo = list(namespace.values())
+    while todo:
+        value = todo.pop()
+        name = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+        if not isinstance(name, str) or name in seen:
+            continue
+        seen.add(name)
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if path and Path(path).resolve().is_relative_to(ROOT):
+            yield name, Path(path).read_bytes()
+            todo.extend(vars(sys.modules[name]).values())
+
+
+@functools.lru_cache(maxsize=256)
+def _function_id(target):
+    try:
+        source = inspect.getsource(target).encode()
+    except (OSError, TypeError):
+        source = target.__code__.co_code
+    digest = hashlib.sha256(source)
+    for name, module_source in sorted(_repo_sources(getattr(target, "__globals__", {}))):
+        digest.update(name.encode() + b"\0" + module_source)
+    return f"{target.__module__}.{target.__qualname__}:{digest.hexdigest()[:16]}"
+
+
+def _entry_bytes(path):
+    return sum(f.stat().st_size for f in path.iterdir())
+
+
+class ArrayCache:
+    """A directory of memory-mapped results with an LRU byte budget."""
+
+    def __init__(self, root=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.locks = self.root / ".locks"
+        self.locks.mkdir(parents=True, exist_ok=True)
+
+    # --- keys ---------------------------------------------------------
+    @staticmethod
+    def _func_id(func):
+        # Pages rebuild their wrappers on every rerun; the function underneath stays
+        return _function_id(inspect.unwrap(func))
+
+    def key(self, func, args=(), kwargs=None):
+        """Stable key for ``func(*args, **kwargs)``; defaults are bound, so
+        positional and keyword spellings of the same call agree."""
+        bound = inspect.signature(inspect.unwrap(func)).bind(*args, **(kwargs or {}))
+        bound.apply_defaults()
+        payload = json.dumps([self._func_id(func), bound.arguments], sort_keys=True, default=_encode)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    # --- storage ------------------------------------------------------
+    def get(self, key):
+        """Return the cached result as read-only memmaps, or None on a miss."""
+        path = self.root / key
+        try:
+            meta = json.loads((path / META).read_text())
+            arrays = [np.load(path / f"{i}.npy", mmap_mode="r" if size else None)
+                      for i, size in enumerate(meta["sizes"])]
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        return _join(meta["kind"], meta["names"], arrays)
+
+    def put(self, key, result):
+        """Store ``result`` and return it re-opened from disk."""
+        kind, names, arrays = _split(result)
+        arrays = [np.asarray(a) for a in arrays]
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.root))
+        try:
+            for i, arr in enumerate(arrays):
+                np.save(tmp / f"{i}.npy", arr, allow_pickle=False)
+            (tmp / META).write_text(json.dumps({"kind": kind, "names": names,
+                                                "sizes": [int(a.size) for a in arrays]}))
+            try:
+                os.rename(tmp, self.root / key)
+            except OSError:  # another process published the same key first
+                shutil.rmtree(tmp, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict()
+        stored = self.get(key)
+        return result if stored is None else stored
+
+    def evict(self, max_bytes=None):
+        """Delete least-recently-used entries until the cache fits the budget."""
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        with _flock(self.locks / "evict.lock"):
+            entries = []
+            for path in self.root.iterdir():
+                if path.name.startswith(".") or not path.is_dir():
+                    continue
+                try:
+                    entries.append((path.stat().st_mtime, _entry_bytes(path), path))
+                except FileNotFoundError:
+                    continue
+            total = sum(e[1] for e in entries)
+            for _, size, path in sorted(entries):
+                if total <= budget:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+        return total
+
+    def clear(self):
+        self.evict(max_bytes=0)
+
+    def stats(self):
+        entries = [p for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".")]
+        return {"entries": len(entries), "bytes": sum(_entry_bytes(p) for p in entries),
+                "max_bytes": self.max_bytes, "root": str(self.root)}
+
+    # --- decorator ----------------------------------------------------
+    def cached(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = self.key(func, args, kwargs)
+            hit = self.get(key)
+            if hit is not None:
+                return hit
+            with _flock(self.locks / f"{key[:LOCK_PREFIX]}.lock"):
+                hit = self.get(key)  # computed by another process while we waited
+                if hit is not None:
+                    return hit
+                return self.put(key, func(*args, **kwargs))
+
+        def peek(*args, **kwargs):
+            """The stored result for these arguments, or None; never computes."""
+            return self.get(self.key(func, args, kwargs))
+
+        def prime(result, *args, **kwargs):
+            """Store a result computed elsewhere (e.g. streamed) for these arguments."""
+            return self.put(self.key(func, args, kwargs), result)
+
+        wrapper.cache = self
+        wrapper.peek = peek
+        wrapper.prime = prime
+        return wrapper
+
+
+@functools.lru_cache(maxsize=1)
+def default_cache():
+    return ArrayCache()
+
+
+def disk_cache(func):
+    """Cache ``func`` in the shared default ``ArrayCache``."""
+    return default_cache().cached(func)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspect or clear the on-disk array cache.")
+    parser.add_argument("--clear", action="store_true", help="delete every entry")
+    args = parser.parse_args(argv)
+    cache = default_cache()
+    if args.clear:
+        cache.clear()
+    s = cache.stats()
+    print(f"{s['root']}: {s['entries']} entries, {s['bytes'] / 1e6:.1f} MB "
+          f"of {s['max_bytes'] / 1e6:.0f} MB budget")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
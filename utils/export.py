@@ -0,0 +1,85 @@
+import gzip
+import io
+
+import numpy as np
+
+# Rows serialised per block; bounds the extra memory used while exporting.
+CHUNK_ROWS = 1 << 16
+
+# format -> (button label, mime type)
+EXPORT_FORMATS = {
+    "npy": ("NumPy .npy", "application/octet-stream"),
+    "npz": ("Compressed .npz", "application/zip"),
+    "csv": ("CSV", "text/csv"),
+    "csv.gz": ("CSV (gzip)", "application/gzip"),
+}
+
+
+def _columns(arrays):
+    """Flatten every array to 1-D (a view for contiguous arrays, no copy)."""
+    cols = {name: np.ravel(np.asarray(a)) for name, a in arrays.items()}
+    sizes = {c.size for c in cols.values()}
+    if len(sizes) != 1:
+        raise ValueError(f"tabular export needs equally sized arrays, got sizes {sorted(sizes)}")
+    return cols, sizes.pop()
+
+
+def iter_row_chunks(arrays, chunk_rows=CHUNK_ROWS):
+    """Yield (rows, n_columns) blocks of the column-stacked arrays.
+
+    Only one block is materialised at a time, so a 1M-point trajectory never
+    exists as a second full-size table.
+    """
+    cols, n = _columns(arrays)
+    for start in range(0, n, chunk_rows):
+        yield np.column_stack([c[start:start + chunk_rows] for c in cols.values()])
+
+
+def write_npy(arrays, fh, chunk_rows=CHUNK_ROWS):
+    """Write the arrays as one (n, k) .npy table, streamed block by block."""
+    cols, n = _columns(arrays)
+    dtype = np.result_type(*cols.values())
+    np.lib.format.write_array_header_1_0(fh, {
+        "descr": np.lib.format.dtype_to_descr(dtype),
+        "fortran_order": False,
+        "shape": (n, len(cols)),
+    })
+    for block in iter_row_chunks(cols, chunk_rows):
+        fh.write(np.ascontiguousarray(block, dtype=dtype).data)
+
+
+def write_npz(arrays, fh):
+    """Write each array under its own name, keeping its shape (zip-deflated)."""
+    np.savez_compressed(fh, **{name: np.asarray(a) for name, a in arrays.items()})
+
+
+def write_csv(arrays, fh, chunk_rows=CHUNK_ROWS, fmt="%.10g"):
+    """Write a header line then the rows, formatted one block at a time."""
+    fh.write((",".join(arrays) + "\n").encode())
+    row_fmt = ",".join([fmt] * len(arrays)) + "\n"
+    for block in iter_row_chunks(arrays, chunk_rows):
+        # One %-format per block is far faster than np.savetxt's per-row loop
+        fh.write(((row_fmt * len(block)) % tuple(block.ravel().tolist())).encode())
+
+
+def export_file(arrays, fmt):
+    """Serialise ``arrays`` and return the file's bytes.
+
+    Streamlit keeps a download in memory as ``bytes`` whatever it is given,
+    so the file is built in a ``BytesIO`` whose buffer is handed over
+    without a copy. The writers fill it block by block, so no second
+    full-size table of the arrays exists on the way.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}; expected one of {list(EXPORT_FORMATS)}")
+    fh = io.BytesIO()
+    if fmt == "npy":
+        write_npy(arrays, fh)
+    elif fmt == "npz":
+        write_npz(arrays, fh)
+    elif fmt == "csv":
+        write_csv(arrays, fh)
+    else:
+        with gzip.GzipFile(fileobj=fh, mode="wb", compresslevel=3) as gz:
+            write_csv(arrays, gz)
+    return fh.getvalue()
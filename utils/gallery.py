@@ -0,0 +1,142 @@
+"""Grow many seeded variants of a kernel across worker processes.
+
+A gallery is one parameter set repeated with independent seeds: ``spawn_seeds``
+derives them from a single gallery seed with NumPy's ``SeedSequence``, so the
+streams do not overlap and the same gallery seed always gives the same
+flakes. ``Gallery`` hands the calls to a ``python -m utils.gallery``
+subprocess that runs them on a process pool. Results go through the
+``disk_cache`` of the kernel, so the page reads each one from the cache once
+the worker reports it done::
+
+    gallery = Gallery("snowflake", [{**params, "seed": s} for s in spawn_seeds(0, 16)]).start()
+    while not gallery.finished:
+        ...  # gallery.ready: indices of finished calls
+
+The worker is a plain subprocess rather than a pool started from the page:
+Streamlit installs the page script as ``__main__``, which spawned pool
+processes would re-run. ``MATHSVIS_GALLERY_WORKERS`` caps the pool size
+(default: CPU count).
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+
+WORKERS = int(os.environ.get("MATHSVIS_GALLERY_WORKERS", 0)) or os.cpu_count() or 1
+
+
+def spawn_seeds(seed, count):
+    """``count`` independent integer seeds derived from ``seed``."""
+    return [int(child.generate_state(1, np.uint64)[0]) for child in np.random.SeedSequence(seed).spawn(count)]
+
+
+def _grow(kernel_name, params):
+    """Compute one call into the disk cache; runs in a pool process."""
+    from compute.kernels import KERNELS
+    from utils.array_cache import disk_cache
+
+    t0 = time.perf_counter()
+    disk_cache(KERNELS[kernel_name].func)(**params)
+    return time.perf_counter() - t0
+
+
+class Gallery:
+    """One batch of calls of a cached kernel, computed by a worker process.
+
+    ``ready`` maps the index of every finished call to its compute time
+    (0 for calls that were already cached) and ``errors`` holds failures.
+    """
+
+    def __init__(self, kernel_name, calls, workers=WORKERS):
+        self.kernel_name = kernel_name
+        self.calls = calls
+        self.workers = workers
+        self.ready = {}
+        self.errors = {}
+        self.started = None
+        self.finished = None
+        self._process = None
+
+    def start(self):
+        from compute.kernels import KERNELS
+        from utils.array_cache import disk_cache
+
+        self.started = time.time()
+        cached = disk_cache(KERNELS[self.kernel_name].func)
+        todo = []
+        for i, params in enumerate(self.calls):
+            if cached.peek(**params) is None:
+                todo.append(i)
+            else:
+                self.ready[i] = 0.0
+        if not todo:
+            self.finished = time.time()
+            return self
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "utils.gallery", self.kernel_name, "--workers", str(min(self.workers, len(todo)))],
+            cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+            start_new_session=hasattr(os, "killpg"))
+        self._process.stdin.write(json.dumps([self.calls[i] for i in todo]))
+        self._process.stdin.close()
+        threading.Thread(target=self._collect, args=(todo,), name="mathsvis-gallery", daemon=True).start()
+        return self
+
+    def _collect(self, todo):
+        for line in self._process.stdout:
+            result = json.loads(line)
+            index = todo[result["index"]]
+            if result["error"]:
+                self.errors[index] = result["error"]
+            else:
+                self.ready[index] = result["seconds"]
+        returncode = self._process.wait()
+        for index in todo:
+            if index not in self.ready and index not in self.errors:
+                self.errors[index] = f"worker exited with status {returncode}"
+        self.finished = time.time()
+
+    @property
+    def done(self):
+        return len(self.ready) + len(self.errors)
+
+    def stop(self):
+        """Abandon unfinished calls (the pool processes go too)."""
+        if self._process is None or self._process.poll() is not None:
+            return
+        if hasattr(os, "killpg"):
+            os.killpg(self._process.pid, signal.SIGKILL)
+        else:
+            self._process.kill()
+
+
+def main(argv=None):
+    """Worker: run the JSON list of calls on stdin, one JSON line per result."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Compute kernel calls into the disk cache on a process pool.")
+    parser.add_argument("kernel")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args(argv)
+    calls = json.load(sys.stdin)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(_grow, args.kernel, params): i for i, params in enumerate(calls)}
+        for fut in as_completed(futures):
+            try:
+                seconds, error = fut.result(), None
+            except Exception as exc:  # one failed call must not lose the others
+                seconds, error = None, f"{type(exc).__name__}: {exc}"
+            print(json.dumps({"index": futures[fut], "seconds": seconds, "error": error}), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(ROOT))
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Per-rerun timings: kernel, figure build, chart payload, LLM and cache status.
+
+A page opens a trace once its parameters are known and closes it at the end
+of the script::
+
+    trace = start_trace("fern", n_points=n_points)
+    ...
+    finish_trace()
+
+In between, kernels wrapped with ``timed_kernel``, ``utils.plotting.plotly_chart``
+and ``utils.llm.run_ollama_command`` record into the current trace. Each
+finished trace is appended to a rotating JSONL log (``logs/reruns.jsonl``,
+override with ``MATHSVIS_TRACE_LOG``, empty string disables) and shown in a
+debug expander when the page is opened with ``?debug=1``.
+"""
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+LOG_PATH = os.environ.get("MATHSVIS_TRACE_LOG", str(ROOT / "logs" / "reruns.jsonl"))
+LOG_MAX_BYTES = 5_000_000
+LOG_BACKUPS = 5
+
+# Each Streamlit session runs its script in its own thread, so a context
+# variable keeps concurrent sessions' traces apart.
+_current = ContextVar("rerun_trace", default=None)
+
+
+class RerunTrace:
+    """Wall-clock phases of one script run, in milliseconds.
+
+    Time between recorded phases is attributed to the next ``mark``; this is
+    how figure construction (everything between the kernel and the chart)
+    is measured without wrapping page code.
+    """
+
+    def __init__(self, page, params):
+        self.page = page
+        self.params = params
+        self.phases = {}
+        self.cache = {}
+        self.payload_bytes = 0
+        self._open = set()
+        self._t0 = self._last = time.perf_counter()
+
+    def _add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds * 1000
+
+    def mark(self, name):
+        """Attribute the time since the last phase to ``name``."""
+        now = time.perf_counter()
+        self._add(name, now - self._last)
+        self._last = now
+
+    @contextmanager
+    def phase(self, name):
+        """Time the block as ``name``; nested blocks of the same name count once."""
+        if name in self._open:
+            yield self
+            return
+        self._open.add(name)
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self._open.discard(name)
+            self._last = time.perf_counter()
+            self._add(name, self._last - t0)
+
+    def record(self):
+        return {
+            "page": self.page,
+            "session": _session_id(),
+            "params": self.params,
+            "total_ms": round((time.perf_counter() - self._t0) * 1000, 2),
+            "phases_ms": {k: round(v, 2) for k, v in self.phases.items()},
+            "cache": self.cache,
+            "payload_bytes": self.payload_bytes,
+        }
+
+
+def current_trace():
+    return _current.get()
+
+
+def start_trace(page, **params):
+    trace = RerunTrace(page, params)
+    _current.set(trace)
+    return trace
+
+
+def finish_trace():
+    """Log the current trace and, in debug mode, show it in an expander."""
+    trace = _current.get()
+    if trace is None:
+        return None
+    _current.set(None)
+    rec = trace.record()
+    logger = _logger()
+    if logger is not None:
+        logger.info(json.dumps({"ts": round(time.time(), 3), **rec}, default=str))
+    if debug_enabled():
+        _render(rec)
+    return rec
+
+
+def timed_kernel(func, cache=None):
+    """Time calls to ``func`` as the trace's ``kernel`` phase.
+
+    ``cache`` is an optional caching decorator (``st.cache_data(ttl=...)``,
+    ``lru_cache(maxsize=...)``) applied underneath the timer; calls through
+    it are reported as hits unless the wrapped body actually ran.
+    """
+    name = func.__name__
+    inner = func
+    if cache is not None:
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            trace = _current.get()
+            if trace is not None:
+                trace.cache[name] = "miss"
+            return func(*args, **kwargs)
+        inner = cache(body)
+
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        trace = _current.get()
+        if trace is None:
+            return inner(*args, **kwargs)
+        if cache is not None:
+            trace.cache[name] = "hit"
+        with trace.phase("kernel"):
+            return inner(*args, **kwargs)
+    return call
+
+
+def timed_phase(name):
+    """Decorator recording each call as phase ``name`` of the current trace."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with trace.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def debug_enabled():
+    import streamlit as st
+    try:
+        return st.query_params.get("debug", "0") not in ("", "0", "false")
+    except Exception:
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def _logger():
+    if not LOG_PATH:
+        return None
+    path = Path(LOG_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    logger = logging.getLogger("mathsvis.reruns")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    return logger
+
+
+def _render(rec):
+    import streamlit as st
+    with st.expander(f"🐞 Performance — {rec['total_ms']:.0f} ms", expanded=False):
+        cols = st.columns(len(rec["phases_ms"]) + 1)
+        for col, (name, ms) in zip(cols, rec["phases_ms"].items()):
+            col.metric(name, f"{ms:.1f} ms")
+        cols[-1].metric("payload", f"{rec['payload_bytes'] / 1024:.0f} KB")
+        if rec["cache"]:
+            st.caption(" · ".join(f"{k}: {v}" for k, v in rec["cache"].items()))
+        st.json(rec, expanded=False)
@@ -0,0 +1,198 @@
+import io
+
+import numpy as np
+
+# format -> (button label, mime type)
+MESH_FORMATS = {
+    "stl": ("Binary STL", "model/stl"),
+    "ply": ("Binary PLY", "application/octet-stream"),
+    "obj": ("Wavefront OBJ", "model/obj"),
+}
+
+OBJ_CHUNK_ROWS = 1 << 16  # lines formatted per block of OBJ text
+
+STL_DTYPE = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("vertices", "<f4", (3, 3)),
+    ("attr", "<u2"),
+])
+
+
+def grid_faces(n_rows, n_cols, index=None):
+    """Triangulate an (n_rows, n_cols) vertex grid: two triangles per quad.
+
+    Vertex (i, j) has index ``i * n_cols + j`` unless an ``index`` grid is
+    given (e.g. after welding); the result is an (F, 3) int32 array.
+    """
+    if index is None:
+        index = np.arange(n_rows * n_cols, dtype=np.int32).reshape(n_rows, n_cols)
+    a = index[:-1, :-1].ravel()
+    b = index[:-1, 1:].ravel()
+    c = index[1:, :-1].ravel()
+    d = index[1:, 1:].ravel()
+    faces = np.empty((2 * a.size, 3), dtype=np.int32)
+    faces[0::2, 0], faces[0::2, 1], faces[0::2, 2] = a, b, d
+    faces[1::2, 0], faces[1::2, 1], faces[1::2, 2] = a, d, c
+    return faces
+
+
+def seam_map(vertices, shape, tol=1e-6):
+    """Map each grid vertex to the representative it is welded to.
+
+    Closed (u, v) surfaces sample both ends of their parameter ranges, so the
+    first/last rows and columns duplicate each other (possibly reversed, as on
+    the Klein bottle). Only boundary vertices are compared: they are quantised
+    to ``tol`` times the bounding-box diagonal and grouped with ``np.unique``.
+    """
+    n_rows, n_cols = shape
+    idx = np.arange(n_rows * n_cols).reshape(n_rows, n_cols)
+    boundary = np.unique(np.concatenate([idx[0], idx[-1], idx[:, 0], idx[:, -1]]))
+
+    extent = float(np.linalg.norm(vertices.max(axis=0) - vertices.min(axis=0))) or 1.0
+    keys = np.round(vertices[boundary] / (tol * extent)).astype(np.int64)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+
+    rep = np.arange(n_rows * n_cols)
+    rep[boundary] = boundary[first][inverse.ravel()]
+    return rep
+
+
+def drop_degenerate(faces):
+    """Remove triangles that reference the same vertex twice."""
+    return faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+
+
+def _cross(a, b):
+    # np.cross is several times slower than spelling out the components
+    out = np.empty_like(a)
+    out[..., 0] = a[..., 1] * b[..., 2] - a[..., 2] * b[..., 1]
+    out[..., 1] = a[..., 2] * b[..., 0] - a[..., 0] * b[..., 2]
+    out[..., 2] = a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+    return out
+
+
+def _normalize(n):
+    n /= np.maximum(np.sqrt(np.einsum("...i,...i->...", n, n)), 1e-12)[..., None]
+    return n
+
+
+def face_normals(vertices, faces, normalize=True):
+    """Per-face normals; left unnormalised they are weighted by twice the area."""
+    v0, v1, v2 = (vertices[faces[:, k]] for k in range(3))
+    n = _cross(v1 - v0, v2 - v0)
+    return _normalize(n) if normalize else n
+
+
+def vertex_normals(vertices, faces):
+    """Area-weighted per-vertex normals for an arbitrary triangle list."""
+    fn = face_normals(vertices, faces, normalize=False)
+    flat = faces.ravel()
+    n = np.column_stack([
+        np.bincount(flat, weights=np.repeat(fn[:, k], 3), minlength=len(vertices))
+        for k in range(3)
+    ])
+    return _normalize(n)
+
+
+def surface_mesh(x, y, z, weld=True, return_index=False):
+    """Turn (u, v) grids into ``(vertices, faces, normals)``.
+
+    Normals are accumulated on the grid itself with slicing (each quad adds
+    its two triangle normals to its corners), then the contributions of
+    welded duplicates are folded onto their representative so shading stays
+    continuous across the seams. With ``return_index`` the flat grid index
+    of every kept vertex is returned too, for carrying other per-vertex
+    grids (colours, intensities) over: ``values.ravel()[index]``.
+    """
+    P = np.stack([np.asarray(x), np.asarray(y), np.asarray(z)], axis=-1).astype(np.float32)
+    n_rows, n_cols = P.shape[:2]
+    a, b, c, d = P[:-1, :-1], P[:-1, 1:], P[1:, :-1], P[1:, 1:]
+    n1 = _cross(b - a, d - a)
+    n2 = _cross(d - a, c - a)
+    acc = np.zeros_like(P)
+    acc[:-1, :-1] += n1 + n2
+    acc[:-1, 1:] += n1
+    acc[1:, 1:] += n1 + n2
+    acc[1:, :-1] += n2
+
+    vertices = P.reshape(-1, 3)
+    normals = acc.reshape(-1, 3)
+    if not weld:
+        mesh = vertices, grid_faces(n_rows, n_cols), _normalize(normals)
+        return (*mesh, np.arange(len(vertices))) if return_index else mesh
+
+    # Remap on the (n_rows, n_cols) index grid, not on the 2x larger face list
+    rep = seam_map(vertices, (n_rows, n_cols))
+    moved = np.flatnonzero(rep != np.arange(rep.size))
+    np.add.at(normals, rep[moved], normals[moved])
+    keep = np.ones(rep.size, dtype=bool)
+    keep[moved] = False
+    new_index = (np.cumsum(keep) - 1).astype(np.int32)
+    faces = drop_degenerate(grid_faces(n_rows, n_cols, new_index[rep].reshape(n_rows, n_cols)))
+    mesh = vertices[keep], faces, _normalize(normals[keep])
+    return (*mesh, np.flatnonzero(keep)) if return_index else mesh
+
+
+def write_stl(fh, vertices, faces):
+    """Binary STL: an 80-byte header, a count, then one structured record per triangle."""
+    tri = np.take(vertices, faces, axis=0)
+    records = np.empty(len(faces), dtype=STL_DTYPE)
+    records["normal"] = _normalize(_cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]))
+    records["vertices"] = tri
+    records["attr"] = 0
+    fh.write(b"MathsVisuals binary STL".ljust(80, b"\0"))
+    fh.write(np.uint32(len(faces)).tobytes())
+    fh.write(records.data)
+
+
+def write_ply(fh, vertices, faces, normals=None):
+    """Binary little-endian PLY with optional per-vertex normals."""
+    fields = [("x", "<f4"), ("y", "<f4"), ("z", "<f4")]
+    if normals is not None:
+        fields += [("nx", "<f4"), ("ny", "<f4"), ("nz", "<f4")]
+    verts = np.empty(len(vertices), dtype=fields)
+    verts["x"], verts["y"], verts["z"] = vertices.T
+    if normals is not None:
+        verts["nx"], verts["ny"], verts["nz"] = normals.T
+    tris = np.empty(len(faces), dtype=[("n", "u1"), ("idx", "<i4", (3,))])
+    tris["n"] = 3
+    tris["idx"] = faces
+
+    header = ["ply", "format binary_little_endian 1.0", f"element vertex {len(vertices)}"]
+    header += [f"property float {name}" for name, _ in fields]
+    header += [f"element face {len(faces)}", "property list uchar int vertex_indices", "end_header"]
+    fh.write(("\n".join(header) + "\n").encode())
+    fh.write(verts.data)
+    fh.write(tris.data)
+
+
+def write_obj(fh, vertices, faces, normals=None, chunk_rows=OBJ_CHUNK_ROWS):
+    """Wavefront OBJ text, %-formatted ``chunk_rows`` lines at a time."""
+    fh.write(b"# MathsVisuals surface\n")
+    sections = [("v %.6f %.6f %.6f\n", vertices)]
+    if normals is not None:
+        sections.append(("vn %.5f %.5f %.5f\n", normals))
+        # vertex i has normal i: each face index is written twice
+        sections.append(("f %d//%d %d//%d %d//%d\n", np.repeat(faces + 1, 2, axis=1)))
+    else:
+        sections.append(("f %d %d %d\n", faces + 1))
+    for line, rows in sections:
+        for start in range(0, len(rows), chunk_rows):
+            block = rows[start:start + chunk_rows]
+            # One %-format per block, as in utils.export.write_csv
+            fh.write(((line * len(block)) % tuple(block.ravel().tolist())).encode())
+
+
+def export_mesh(x, y, z, fmt, weld=True):
+    """Mesh the surface grids and return the file's bytes (see ``utils.export.export_file``)."""
+    if fmt not in MESH_FORMATS:
+        raise ValueError(f"unknown mesh format {fmt!r}; expected one of {list(MESH_FORMATS)}")
+    vertices, faces, normals = surface_mesh(x, y, z, weld=weld)
+    fh = io.BytesIO()
+    if fmt == "stl":
+        write_stl(fh, vertices, faces)
+    elif fmt == "ply":
+        write_ply(fh, vertices, faces, normals)
+    else:
+        write_obj(fh, vertices, faces, normals)
+    return fh.getvalue()
@@ -1,7 +1,10 @@
+import math
 import streamlit as st
-import plotly.graph_objects as go
-import subprocess
-import os
+from dataclasses import dataclass
+from functools import partial
+from utils.export import EXPORT_FORMATS, export_file
+from utils.mesh import MESH_FORMATS, export_mesh, surface_mesh
+from utils.instrument import current_trace
 
 def plotly_config():
     """Standard config for clean, dark-friendly, minimal UI."""
@@ -21,86 +24,450 @@ def apply_plotly_template(fig):
     )
     return fig
 
-def add_download_buttons(data_dict, filename_base="data"):
-    """Add CSV/JSON download for computed data."""
+@dataclass(frozen=True)
+class RenderBudget:
+    """How much a single chart may ask the browser to draw."""
+    svg_points: int = 10_000       # 2D scatter above this switches to WebGL
+    gl_points: int = 500_000       # WebGL markers above this become a density heatmap
+    points_3d: int = 200_000       # scatter3d is decimated above this
+    surface_cells: int = 250_000   # surface grids are decimated above this
+    frame_points: int = 100_000    # points across all animation frames
+    frame_cells: int = 1_500_000   # surface cells across all animation frames
+    density_bins: int = 512
+
+RENDER_BUDGET = RenderBudget()
+
+def _length(d):
+    for axis in ("x", "y", "z"):
+        if d.get(axis) is not None:
+            return len(d[axis])
+    return 0
+
+def _take(d, n, idx):
+    """Index every per-point array (length ``n``) in trace dict ``d``, recursively."""
+    import numpy as np
+    out = {}
+    for k, v in d.items():
+        if isinstance(v, dict):
+            out[k] = _take(v, n, idx)
+        elif isinstance(v, (list, tuple, np.ndarray)) and not isinstance(v, str) and len(v) == n:
+            out[k] = np.asarray(v)[idx]
+        else:
+            out[k] = v
+    return out
+
+def _stride(n, limit):
+    """Evenly strided indices keeping both endpoints, at most about ``limit``."""
+    import numpy as np
+    step = math.ceil(n / limit)
+    return np.unique(np.r_[np.arange(0, n, step), n - 1]), step
+
+def _decimate_grid(d, limit):
+    import numpy as np
+    z = np.asarray(d["z"])
+    rows, cols = z.shape
+    step = math.ceil(math.sqrt(rows * cols / limit))
+    ri, ci = _stride(rows, rows / step)[0], _stride(cols, cols / step)[0]
+    out = dict(d)
+    for k, v in d.items():
+        if isinstance(v, (list, tuple, np.ndarray)) and not isinstance(v, str):
+            a = np.asarray(v)
+            if a.shape == (rows, cols):
+                out[k] = a[np.ix_(ri, ci)]
+            elif a.shape == (cols,) and k == "x":
+                out[k] = a[ci]
+            elif a.shape == (rows,) and k == "y":
+                out[k] = a[ri]
+    return out, (rows, cols), (len(ri), len(ci))
+
+def _grid_cells(z):
+    """Cells of a 2D ``z`` grid, whether an array or nested lists; 0 otherwise."""
+    import numpy as np
+    try:
+        z = np.asarray(z) if z is not None else None
+    except ValueError:  # ragged rows
+        return 0
+    return z.size if z is not None and z.ndim == 2 else 0
+
+def _density(d, bins):
+    """Aggregate 2D markers into a log-count heatmap tinted with the marker colour."""
+    import numpy as np
+    import plotly.graph_objects as go
+    x, y = np.asarray(d["x"], dtype=float), np.asarray(d["y"], dtype=float)
+    counts, xe, ye = np.histogram2d(x, y, bins=bins)
+    z = np.where(counts > 0, np.log1p(counts), np.nan).T
+    color = (d.get("marker") or {}).get("color")
+    scale = [[0, "rgba(0,0,0,0)"], [0.05, color], [1, color]] if isinstance(color, str) else "Viridis"
+    return go.Heatmap(x=(xe[:-1] + xe[1:]) / 2, y=(ye[:-1] + ye[1:]) / 2, z=z, colorscale=scale,
+                      showscale=False, hoverinfo="skip", name=d.get("name"))
+
+def fit_to_budget(fig, budget=RENDER_BUDGET):
+    """Rewrite traces that exceed ``budget`` and note what was done on the figure.
+
+    2D scatter moves to WebGL past ``svg_points`` and, for markers, to a
+    density heatmap past ``gl_points`` (lines are decimated instead);
+    scatter3d and animation frames are stride-decimated and surfaces are
+    resampled on a coarser grid. Animated surfaces share ``frame_cells``
+    between their frames, and the base surface is resampled to the same grid
+    so per-trace arrays such as ``surfacecolor`` still line up. Returns the
+    list of notes.
+    """
+    import plotly.graph_objects as go
+    notes = []
+    frame_surfaces = sum(t.type == "surface" for f in fig.frames for t in f.data)
+    surface_cells = min(budget.surface_cells, budget.frame_cells // frame_surfaces) \
+        if frame_surfaces else budget.surface_cells
+    traces = []
+    changed = False
+    for trace in fig.data:
+        kind = trace.type
+        d = trace.to_plotly_json() if kind in ("scatter", "scattergl", "scatter3d", "surface") else None
+        n = _length(d) if d else 0
+        new = trace
+        if kind in ("scatter", "scattergl") and n > budget.gl_points:
+            if "lines" in (d.get("mode") or "") and "markers" not in (d.get("mode") or ""):
+                idx, step = _stride(n, budget.gl_points)
+                new = go.Scattergl({**_take(d, n, idx), "type": "scattergl"}, skip_invalid=True)
+                notes.append(f"{n:,} points → WebGL, 1 in {step} kept")
+            else:
+                new = _density(d, budget.density_bins)
+                notes.append(f"{n:,} points → density ({budget.density_bins}² bins)")
+        elif kind == "scatter" and n > budget.svg_points:
+            new = go.Scattergl({**d, "type": "scattergl"}, skip_invalid=True)
+            notes.append(f"{n:,} points → WebGL")
+        elif kind == "scatter3d" and n > budget.points_3d:
+            idx, step = _stride(n, budget.points_3d)
+            new = go.Scatter3d(_take(d, n, idx))
+            notes.append(f"{n:,} points → 1 in {step} kept")
+        elif kind == "surface" and _grid_cells(d.get("z")) > surface_cells:
+            grid, before, after = _decimate_grid(d, surface_cells)
+            new = go.Surface(grid)
+            notes.append(f"surface {before[0]}×{before[1]} → {after[0]}×{after[1]}")
+        changed |= new is not trace
+        traces.append(new)
+    if changed:
+        fig.data = ()
+        fig.add_traces(traces)
+
+    frame_traces = [t for f in fig.frames for t in f.data if t.type in ("scatter", "scattergl", "scatter3d")]
+    total = sum(len(t.x) for t in frame_traces if t.x is not None)
+    if total > budget.frame_points:
+        step = math.ceil(total / budget.frame_points)
+        frames = []
+        for f in fig.frames:
+            spec = f.to_plotly_json()
+            spec["data"] = [_take(t, _length(t), _stride(_length(t), max(_length(t) // step, 1))[0])
+                            if t.get("type") in ("scatter", "scattergl", "scatter3d") and _length(t) else t
+                            for t in spec.get("data", [])]
+            frames.append(go.Frame(spec))
+        fig.frames = frames
+        notes.append(f"animation {total:,} points → 1 in {step} kept")
+
+    cells = sum(_grid_cells(t.z) for f in fig.frames for t in f.data if t.type == "surface")
+    if cells > budget.frame_cells:
+        frames = []
+        for f in fig.frames:
+            spec = f.to_plotly_json()
+            spec["data"] = [_decimate_grid(t, surface_cells)[0]
+                            if t.get("type") == "surface" and _grid_cells(t.get("z")) else t
+                            for t in spec.get("data", [])]
+            frames.append(go.Frame(spec))
+        fig.frames = frames
+        notes.append(f"animation {cells:,} surface cells → about {surface_cells:,} per frame")
+
+    if notes:
+        fig.add_annotation(text="⚡ " + " · ".join(notes), xref="paper", yref="paper", x=1, y=0,
+                           xanchor="right", yanchor="bottom", showarrow=False,
+                           font=dict(size=10, color="gray"))
+    return notes
+
+def surface_mesh3d(x, y, z, intensity=None, **kwargs):
+    """An indexed ``go.Mesh3d`` for a closed (u, v) surface grid.
+
+    Duplicate seam rows and columns are welded (``utils.mesh.surface_mesh``),
+    so the browser shades across the seams and uploads every vertex once,
+    where ``go.Surface`` expands each grid quad into six. Positions and the
+    colour ``intensity`` (a per-vertex grid, default ``z``) are sent as
+    float32 and indices as uint16 when they fit. The JSON is still about
+    twice that of a float32 ``go.Surface`` of the same grid, because the
+    indices are sent too, so pages draw the float32 grid by default and
+    offer this for the seam shading. Other keyword arguments are
+    ``go.Mesh3d`` properties.
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+    vertices, faces, _, index = surface_mesh(x, y, z, return_index=True)
+    values = np.asarray(z if intensity is None else intensity).ravel()[index].astype(np.float32)
+    faces = faces.astype(np.uint16 if len(vertices) <= 1 << 16 else np.uint32)
+    return go.Mesh3d(x=vertices[:, 0], y=vertices[:, 1], z=vertices[:, 2],
+                     i=faces[:, 0], j=faces[:, 1], k=faces[:, 2], intensity=values, **kwargs)
+
+def density_volume_figure(counts, bounds, labels=("X", "Y", "Z"), **kwargs):
+    """A ``go.Volume`` of voxel visit ``counts`` (indexed ``[x, y, z]``)
+    over the box ``bounds`` (lower and upper corners).
+
+    Shells are drawn at levels of ``log(1 + counts)``, so sparse filaments
+    show next to dense sheets. Voxel positions are sent as uint8 grid
+    indices, with axis ticks in data units, and levels as uint8, so the
+    payload is four bytes per voxel whatever the number of samples. Other
+    keyword arguments are ``go.Volume`` properties.
+    """
+    import numpy as np
+    import plotly.graph_objects as go
+    counts = np.asarray(counts)
+    n = counts.shape[0]
+    level = np.log1p(counts.astype(np.float32))
+    level *= 255 / max(float(level.max()), 1e-9)
+    index = np.indices(counts.shape, dtype=np.uint8).reshape(3, -1)
+    volume = dict(isomin=32, isomax=255, opacity=0.15, surface_count=12, colorscale="Inferno",
+                  showscale=False, hoverinfo="skip")
+    fig = go.Figure(go.Volume(x=index[0], y=index[1], z=index[2], value=level.astype(np.uint8).ravel(),
+                              **{**volume, **kwargs}))
+    lo, hi = np.asarray(bounds, dtype=float)
+    ticks = np.linspace(0, n - 1, 5)
+    axes = {}
+    for k, (axis, label) in enumerate(zip("xyz", labels)):
+        centres = lo[k] + (ticks + 0.5) * (hi[k] - lo[k]) / n
+        axes[f"{axis}axis"] = dict(title=label, tickvals=ticks, ticktext=[f"{v:.3g}" for v in centres])
+    extent = (hi - lo) / (hi - lo).max()
+    fig.update_layout(scene=dict(**axes, aspectmode="manual", aspectratio=dict(zip("xyz", extent))))
+    return fig
+
+def plotly_chart(fig, width='stretch', **kwargs):
+    """``st.plotly_chart`` with the standard config and render budget, timed
+    for the rerun trace.
+
+    Time since the kernel finished is recorded as figure build; the chart
+    call itself (Streamlit serialises the figure there) and the JSON payload
+    size, which costs one more serialisation, are recorded too.
+    """
+    trace = current_trace()
+    if trace is None:
+        fit_to_budget(fig)
+        return st.plotly_chart(fig, width=width, config=plotly_config(), **kwargs)
+    import plotly.io as pio
+    trace.mark("figure")
+    with trace.phase("budget"):
+        fit_to_budget(fig)
+    with trace.phase("chart"):
+        out = st.plotly_chart(fig, width=width, config=plotly_config(), **kwargs)
+    with trace.phase("serialize"):
+        trace.payload_bytes += len(pio.to_json(fig, validate=False))
+    return out
+
+def _params_csv(data_dict):
+    return "\n".join([f"{k},{v}" for k, v in data_dict.items() if isinstance(v, (int, float))])
+
+def _params_json(data_dict):
+    import json
+    return json.dumps(data_dict, indent=2)
+
+def add_download_buttons(data_dict, filename_base="data", arrays=None):
+    """Add CSV/JSON download for parameters, plus full array export if given.
+
+    Every button receives a callable, so nothing is serialised until the user
+    clicks and a rerun pays nothing for export.
+    """
     col1, col2 = st.columns(2)
     with col1:
         st.download_button(
             "📥 Download CSV",
-            data="\n".join([f"{k},{v}" for k, v in data_dict.items() if isinstance(v, (int, float))]),
+            data=partial(_params_csv, data_dict),
             file_name=f"{filename_base}_params.csv",
-            mime="text/csv"
+            mime="text/csv",
+            key=f"{filename_base}_params_csv",
+            on_click="ignore"
         )
     with col2:
-        import json
         st.download_button(
             "📥 Download JSON",
-            data=json.dumps(data_dict, indent=2),
+            data=partial(_params_json, data_dict),
             file_name=f"{filename_base}_config.json",
-            mime="application/json"
+            mime="application/json",
+            key=f"{filename_base}_config_json",
+            on_click="ignore"
         )
 
+    if arrays:
+        cols = st.columns(len(EXPORT_FORMATS))
+        for col, (fmt, (label, mime)) in zip(cols, EXPORT_FORMATS.items()):
+            with col:
+                st.download_button(
+                    f"💾 {label}",
+                    data=partial(export_file, arrays, fmt),
+                    file_name=f"{filename_base}.{fmt}",
+                    mime=mime,
+                    key=f"{filename_base}_export_{fmt}",
+                    on_click="ignore"
+                )
 
-def run_ollama_command(prompt: str, model: str = "qwen3:8b") -> str:
-    """Fast, synchronous Ollama call — returns final output only. No spinner delay."""
-    try:
-        # Use smaller, faster model by default (qwen3:8b ~2GB VRAM; ideal for RTX 4060)
-        # Skip progress/status lines and decode safely
-        result = subprocess.run(
-            ["ollama", "run", model, prompt],
-            capture_output=True,
-            text=False,  # ← decode manually to avoid None/stdout issues
-            timeout=120,  # tighter timeout — 2 mins max
-            env={**os.environ, "NO_COLOR": "1", "OLLAMA_DEBUG": "0"}
-        )
+def add_mesh_download_buttons(x, y, z, filename_base="surface"):
+    """Add STL/PLY/OBJ downloads for a (u, v) surface grid.
 
-        # Safely decode stdout/stderr
-        stdout = result.stdout.decode('utf-8', errors='ignore').strip() if result.stdout else ""
-        stderr = result.stderr.decode('utf-8', errors='ignore').strip() if result.stderr else ""
-
-        if result.returncode == 0:
-            # Remove common non-response lines (Ollama's chatter)
-            clean_lines = [
-                line for line in stdout.splitlines()
-                if not line.startswith((">>>", "Sending", "Loading", "time=", "Generating"))
-            ]
-            response = "\n".join(clean_lines).strip()
-            return response if response else "✅ OK (no output)"
-        else:
-            return f"❌ Error {result.returncode}: {stderr or 'unknown'}"
-
-    except subprocess.TimeoutExpired:
-        return "⏱️ Timeout — try a shorter question or smaller model (e.g., `phi3`)."
-    except FileNotFoundError:
-        return "⚠️ Ollama not found — check `ollama --version` in terminal."
-    except Exception as e:
-        return f"💥 {type(e).__name__}: {e}"     
-    
-import json
-
-def run_ollama_stream(prompt: str, model: str = "qwen3:8b"):
-    """Yields tokens as they arrive — ideal for st.chat_message + st.write_stream"""
-    try:
-        proc = subprocess.Popen(
-            ["ollama", "run", model, prompt],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=False,
-            env={**os.environ, "NO_COLOR": "1"}
-        )
-        
-        while True:
-            output = proc.stdout.readline()
-            if not output and proc.poll() is not None:
-                break
-            if output:
-                decoded = output.decode('utf-8', errors='replace').strip()
-                # Skip status lines
-                if not decoded.startswith((">>>", "Loading")):
-                    yield decoded + "\n"
-        
-        stderr = proc.stderr.read().decode('utf-8', errors='replace')
-        if proc.returncode != 0 and stderr.strip():
-            yield f"\n❌ Error: {stderr.strip()}"
-    except Exception as e:
-        yield f"💥 Error: {e}"    
\ No newline at end of file
+    Triangulation, seam welding and normals run only when a button is clicked.
+    """
+    cols = st.columns(len(MESH_FORMATS))
+    for col, (fmt, (label, mime)) in zip(cols, MESH_FORMATS.items()):
+        with col:
+            st.download_button(
+                f"🧊 {label}",
+                data=partial(export_mesh, x, y, z, fmt),
+                file_name=f"{filename_base}.{fmt}",
+                mime=mime,
+                key=f"{filename_base}_mesh_{fmt}",
+                on_click="ignore"
+            )
+
+def add_dimension_report(points, key="dimension"):
+    """Box-counting and correlation dimension of ``points`` with their log-log fit."""
+    import numpy as np
+    import plotly.graph_objects as go
+    from compute.dimension import fractal_dimensions
+
+    trace = current_trace()
+    if trace is None:
+        fits = fractal_dimensions(points)
+    else:
+        with trace.phase("dimension"):
+            fits = fractal_dimensions(points)
+    box, corr = fits["box"], fits["correlation"]
+    if np.isnan(box.dimension):
+        st.caption(f"📐 {len(points):,} points are too few to estimate a fractal dimension")
+        return fits
+
+    col1, col2 = st.columns(2)
+    col1.metric("📐 Box-counting dimension D₀", f"{box.dimension:.3f}",
+                help=f"Slope of log N(ε) over {box.fit.sum()} scales, R² = {box.r2:.4f}")
+    col2.metric("🔗 Correlation dimension D₂", f"{corr.dimension:.3f}",
+                help=f"Slope of log Σp² over {corr.fit.sum()} scales, R² = {corr.r2:.4f}")
+    with st.expander("📈 Log-log fit", expanded=False):
+        scale = -np.log2(box.eps)
+        fig = go.Figure()
+        # Both curves rise with log₂ 1/ε at slope D (faded points lie outside the fit)
+        for fit, sign, name in ((box, 1, "log₂ N(ε)"), (corr, -1, "−log₂ Σp²")):
+            fig.add_trace(go.Scatter(x=scale, y=sign * np.log2(fit.values), mode="markers", name=name,
+                                     marker=dict(size=8, opacity=np.where(fit.fit, 1.0, 0.3))))
+            line = scale[fit.fit]
+            fig.add_trace(go.Scatter(x=line, y=fit.dimension * line + sign * fit.intercept,
+                                     mode="lines", name=f"slope {fit.dimension:.3f}"))
+        apply_plotly_template(fig)
+        fig.update_layout(xaxis_title="log₂ 1/ε (ε relative to the bounding box)", yaxis_title="log₂", height=400)
+        plotly_chart(fig, key=f"{key}_loglog")
+    return fits
+
+def add_recurrence_report(points, key="recurrence", pixels=384):
+    """Opt-in recurrence plot and Grassberger–Procaccia correlation dimension of a trajectory."""
+    if not st.toggle("🔁 Recurrence analysis", value=False, key=f"{key}_recurrence"):
+        return None
+    import numpy as np
+    import plotly.graph_objects as go
+    from compute.neighbors import correlation_dimension, diameter, recurrence_image
+
+    percent = st.slider("Recurrence radius ε (% of the attractor diameter)", 0.1, 2.0, 1.0, step=0.1,
+                        key=f"{key}_recurrence_radius")
+    radius = percent / 100 * diameter(points)
+    trace = current_trace()
+    if trace is None:
+        fit = correlation_dimension(points)
+        image, edges = recurrence_image(points, radius, size=pixels)
+    else:
+        with trace.phase("recurrence"):
+            fit = correlation_dimension(points)
+            image, edges = recurrence_image(points, radius, size=pixels)
+
+    col1, col2 = st.columns(2)
+    col1.metric("🔗 Correlation dimension D₂", "—" if np.isnan(fit.dimension) else f"{fit.dimension:.3f}",
+                help=f"Slope of log C(ε) over {fit.fit.sum()} radii, R² = {fit.r2:.4f}")
+    col2.metric("🔁 Recurrence rate", f"{image.mean():.2%}", help=f"Pairs of points closer than ε = {radius:.3g}")
+    col1, col2 = st.columns(2)
+    with col1:
+        steps = edges[:-1]
+        fig = go.Figure(go.Heatmap(x=steps, y=steps, z=image.astype(np.float32), colorscale="Greys",
+                                   reversescale=True, showscale=False,
+                                   hovertemplate="i=%{x}, j=%{y}: %{z:.1%}<extra></extra>"))
+        apply_plotly_template(fig)
+        fig.update_layout(title="Recurrence plot", xaxis_title="step i", yaxis_title="step j", height=420)
+        fig.update_yaxes(scaleanchor="x")
+        plotly_chart(fig, key=f"{key}_recurrence_plot")
+    with col2:
+        log_eps, log_c = np.log2(fit.eps), np.log2(np.where(fit.values > 0, fit.values, np.nan))
+        fig = go.Figure(go.Scatter(x=log_eps, y=log_c, mode="markers", name="log₂ C(ε)",
+                                   marker=dict(size=8, opacity=np.where(fit.fit, 1.0, 0.3))))
+        line = log_eps[fit.fit]
+        fig.add_trace(go.Scatter(x=line, y=fit.dimension * line + fit.intercept, mode="lines",
+                                 name=f"slope {fit.dimension:.3f}"))
+        apply_plotly_template(fig)
+        fig.update_layout(title="Correlation sum", xaxis_title="log₂ ε", yaxis_title="log₂ C(ε)", height=420)
+        plotly_chart(fig, key=f"{key}_correlation_sum")
+    return fit
+
+# Surface colour modes: label -> field of ``compute.curvature.curvature_fields`` (None: the height z)
+CURVATURE_MODES = {
+    "Height z": None,
+    "Gaussian curvature K": "K",
+    "Mean curvature H": "H",
+    "Principal curvature k₁": "k1",
+    "Principal curvature k₂": "k2",
+}
+
+def _principal_glyphs(x, y, z, fields, count):
+    """Short segments along both principal directions at about ``count``
+    grid points, as two ``go.Scatter3d`` line traces broken by NaNs."""
+    import numpy as np
+    import plotly.graph_objects as go
+    P = np.stack([np.asarray(x), np.asarray(y), np.asarray(z)], axis=-1)
+    rows, cols = P.shape[:2]
+    step = max(1, math.ceil(math.sqrt(rows * cols / count)))
+    sample = P[::step, ::step]
+    # Half a segment: under half the distance between neighbouring glyphs
+    spacing = [np.median(np.linalg.norm(np.diff(sample, axis=a), axis=-1)) for a in (0, 1) if sample.shape[a] > 1]
+    half = 0.4 * float(min(spacing)) if spacing else 1.0
+    traces = []
+    for name, color in (("d1", "rgba(255, 255, 255, 0.9)"), ("d2", "rgba(20, 20, 20, 0.9)")):
+        d = fields[name][::step, ::step].reshape(-1, 3)
+        p = sample.reshape(-1, 3)
+        keep = np.abs(d).sum(axis=1) > 0  # umbilics and degenerate points have no direction
+        seg = np.full((int(keep.sum()), 3, 3), np.nan, dtype=np.float32)
+        seg[:, 0], seg[:, 1] = p[keep] - half * d[keep], p[keep] + half * d[keep]
+        seg = seg.reshape(-1, 3)
+        label = "k₁ direction" if name == "d1" else "k₂ direction"
+        traces.append(go.Scatter3d(x=seg[:, 0], y=seg[:, 1], z=seg[:, 2], mode="lines", name=label,
+                                   line=dict(color=color, width=3), hoverinfo="skip", showlegend=False))
+    return traces
+
+def add_curvature_controls(x, y, z, key="curvature", glyphs=900):
+    """Colour-by picker and principal-direction glyphs for a (u, v) surface grid.
+
+    Returns ``(values, style, overlays)``: the per-vertex grid to colour by
+    (None for the page's own height colouring), trace properties to go with
+    it (a diverging colorscale, symmetric about zero and clipped at the
+    98th percentile of ``|values|``) and the glyph traces to add (empty
+    unless switched on). Fields go through the disk cache keyed by the grid
+    contents, so switching mode reads them back instead of recomputing.
+    """
+    col1, col2 = st.columns([2, 1])
+    mode = col1.selectbox("🎨 Colour by", list(CURVATURE_MODES), key=f"{key}_colour",
+                          help="Curvatures from the first and second fundamental forms of the (u, v) grid")
+    show_glyphs = col2.toggle("➕ Principal directions", value=False, key=f"{key}_glyphs",
+                              help="White along k₁, black along k₂")
+    field = CURVATURE_MODES[mode]
+    if field is None and not show_glyphs:
+        return None, {}, []
+    import numpy as np
+    from compute.curvature import curvature_fields
+    from utils.array_cache import disk_cache
+
+    trace = current_trace()
+    if trace is None:
+        fields = disk_cache(curvature_fields)(x, y, z)
+    else:
+        with trace.phase("curvature"):
+            fields = disk_cache(curvature_fields)(x, y, z)
+    overlays = _principal_glyphs(x, y, z, fields, glyphs) if show_glyphs else []
+    if field is None:
+        return None, {}, overlays
+    values = np.nan_to_num(fields[field])  # no tangent plane: neutral colour
+    limit = float(np.percentile(np.abs(values), 98)) or 1.0
+    style = dict(colorscale="RdBu_r", cmin=-limit, cmax=limit, showscale=True,
+                 colorbar=dict(title=mode.split()[-1]))
+    return values, style, overlays
@@ -0,0 +1,105 @@
+"""Coarse-to-fine rendering for pages whose result takes a while to compute.
+
+A page hands over a generator of ``(progress, result)`` pairs, successively
+finer partial results with ``progress`` rising to 1.0, and a function that
+draws one. Partial results are drawn into a single placeholder
+as they arrive (throttled), and the page then draws the final result in the
+same place::
+
+    chart = st.empty()
+    points = progressive(generate_snowflake, iter_snowflake, preview_to(chart, build_figure), *args)
+    with chart:
+        plotly_chart(build_figure(points))
+
+Cancellation needs no bookkeeping: when a widget changes mid-run, Streamlit
+stops the script at its next ``st`` call, which is the next preview.
+"""
+import time
+
+import streamlit as st
+
+from utils.instrument import current_trace
+from utils.plotting import fit_to_budget, plotly_config
+
+# Show a preview only once computing has taken this long (a result ready
+# sooner is simply drawn once), then at most once per REFRESH_S.
+FIRST_PAINT_S = 0.05
+REFRESH_S = 0.3
+
+
+def coarse_to_fine(final, first, factor=4):
+    """Sizes ``first, first*factor, ...`` capped by and ending at ``final``."""
+    sizes = []
+    n = first
+    while n < final:
+        sizes.append(n)
+        n *= factor
+    return sizes + [final]
+
+
+def refine(compute, final, first, factor=4):
+    """``(progress, compute(n))`` for ``n`` in ``coarse_to_fine(final, first, factor)``."""
+    for n in coarse_to_fine(final, first, factor):
+        yield n / final, compute(n)
+
+
+def _timed(chunks, trace):
+    """Yield from ``chunks``, recording the time spent producing each item."""
+    it = iter(chunks)
+    while True:
+        with trace.phase("kernel"):
+            item = next(it, StopIteration)
+        if item is StopIteration:
+            return
+        yield item
+
+
+def stream(chunks, render):
+    """Consume ``(progress, result)`` pairs, passing partial results to
+    ``render(result, progress, i)`` as they become due; returns the final
+    result (``progress == 1``) without rendering it."""
+    trace = current_trace()
+    if trace is not None:
+        chunks = _timed(chunks, trace)
+    t0 = time.perf_counter()
+    last_paint = None
+    result = None
+    for i, (progress, result) in enumerate(chunks):
+        if progress >= 1:
+            break
+        now = time.perf_counter()
+        if last_paint is None:
+            due = now - t0 >= FIRST_PAINT_S
+        else:
+            due = now - last_paint >= REFRESH_S
+        if due:
+            if trace is None:
+                render(result, progress, i)
+            else:
+                with trace.phase("preview"):
+                    render(result, progress, i)
+            last_paint = time.perf_counter()
+    return result
+
+
+def progressive(cached, chunks, render, *args, **kwargs):
+    """``cached(*args, **kwargs)`` for a ``disk_cache`` function, streaming
+    ``chunks(*args, **kwargs)`` through ``render`` if it is not stored yet."""
+    trace = current_trace()
+    hit = cached.peek(*args, **kwargs)
+    if trace is not None:
+        trace.cache[cached.__name__] = "miss" if hit is None else "hit"
+    if hit is not None:
+        return hit
+    return cached.prime(stream(chunks(*args, **kwargs), render), *args, **kwargs)
+
+
+def preview_to(slot, build_figure, width='stretch'):
+    """A ``render`` callback drawing ``build_figure(result)`` into ``slot``."""
+    def render(result, progress, i):
+        with slot.container():
+            st.caption(f"⏳ Refining… {progress:.0%}")
+            fig = build_figure(result)
+            fit_to_budget(fig)
+            st.plotly_chart(fig, width=width, config=plotly_config(), key=f"preview-{i}")
+    return render
@@ -0,0 +1,439 @@
+import base64
+import struct
+import zlib
+
+import numpy as np
+
+from utils.mesh import grid_faces, vertex_normals
+
+# Plotly's dark template background, used when a figure sets none.
+DEFAULT_BACKGROUND = "rgb(17,17,17)"
+
+# The handful of CSS names the pages use; anything else falls back to white.
+NAMED_COLORS = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0),
+    "green": (0, 128, 0), "blue": (0, 0, 255), "gold": (255, 215, 0),
+    "goldenrod": (218, 165, 32), "orange": (255, 165, 0), "cyan": (0, 255, 255),
+    "magenta": (255, 0, 255), "yellow": (255, 255, 0), "gray": (128, 128, 128),
+    "grey": (128, 128, 128), "lightblue": (173, 216, 230), "skyblue": (135, 206, 235),
+}
+
+# Fragments rasterised per batch; bounds memory for large surfaces.
+MAX_FRAGMENTS = 1 << 22
+
+
+# ----------------------------
+# Colours
+# ----------------------------
+def parse_color(color):
+    """Parse '#rrggbb', 'rgb(...)', 'rgba(...)' or a CSS name to (rgb 0..1, alpha)."""
+    c = str(color).strip().lower()
+    if c.startswith("#"):
+        c = c[1:]
+        if len(c) == 3:
+            c = "".join(ch * 2 for ch in c)
+        return np.array([int(c[k:k + 2], 16) for k in (0, 2, 4)]) / 255.0, 1.0
+    if c.startswith("rgb"):
+        parts = [float(p) for p in c[c.index("(") + 1:c.index(")")].split(",")]
+        return np.array(parts[:3]) / 255.0, (parts[3] if len(parts) > 3 else 1.0)
+    return np.array(NAMED_COLORS.get(c, (255, 255, 255))) / 255.0, 1.0
+
+
+def colorscale_rgb(values, colorscale, cmin=None, cmax=None):
+    """Map scalar values through a Plotly-style colorscale to (n, 3) RGB."""
+    if isinstance(colorscale, str) or not colorscale:
+        import plotly.colors
+        colorscale = plotly.colors.get_colorscale(colorscale or "Viridis")
+    stops = np.array([float(s) for s, _ in colorscale])
+    rgb = np.array([parse_color(c)[0] for _, c in colorscale])
+    values = np.asarray(values, dtype=float)
+    lo = np.nanmin(values) if cmin is None else cmin
+    hi = np.nanmax(values) if cmax is None else cmax
+    t = np.clip((values - lo) / ((hi - lo) or 1.0), 0.0, 1.0)
+    t = np.nan_to_num(t)
+    return np.column_stack([np.interp(t, stops, rgb[:, k]) for k in range(3)])
+
+
+def resolve_colors(color, n, colorscale=None, cmin=None, cmax=None, default="white"):
+    """Per-element colours for a trace property that may be a string or an array."""
+    if color is None:
+        color = default
+    if isinstance(color, str):
+        return np.tile(parse_color(color)[0], (n, 1))
+    color = _array(color)
+    if color.dtype.kind in "OUS":
+        return np.array([parse_color(c)[0] for c in color.ravel()[:n]])
+    return colorscale_rgb(np.broadcast_to(color.ravel(), (n,)) if color.size == 1 else color.ravel()[:n],
+                          colorscale, cmin, cmax)
+
+
+# ----------------------------
+# Canvas & projection
+# ----------------------------
+class Canvas:
+    """An RGB float image with a depth buffer; fragments are z-tested in bulk."""
+
+    def __init__(self, width, height, background=DEFAULT_BACKGROUND):
+        self.width, self.height = width, height
+        self.rgb = np.empty((height, width, 3), dtype=np.float32)
+        self.rgb[...] = parse_color(background)[0]
+        self.depth = np.full(height * width, np.inf, dtype=np.float32)
+
+    def splat(self, px, py, depth, colors, opacity=1.0):
+        """Write fragments at pixel coordinates, keeping the nearest per pixel."""
+        ix = np.rint(px).astype(np.int64)
+        iy = np.rint(py).astype(np.int64)
+        inside = (ix >= 0) & (ix < self.width) & (iy >= 0) & (iy < self.height)
+        if not inside.any():
+            return
+        flat = iy[inside] * self.width + ix[inside]
+        depth = np.asarray(depth, dtype=np.float32)[inside]
+        colors = np.asarray(colors)[inside]
+
+        # Z-buffer in one pass: the nearest fragment per pixel survives
+        before = self.depth[flat]
+        np.minimum.at(self.depth, flat, depth)
+        win = (depth <= self.depth[flat]) & (depth < before)
+        pix = flat[win]
+        out = self.rgb.reshape(-1, 3)
+        out[pix] = opacity * colors[win] + (1.0 - opacity) * out[pix]
+
+    def to_uint8(self, ssaa=1):
+        """Box-downsample by ``ssaa`` and convert to 8-bit RGB."""
+        img = self.rgb
+        if ssaa > 1:
+            h, w = self.height // ssaa, self.width // ssaa
+            img = img[:h * ssaa, :w * ssaa].reshape(h, ssaa, w, ssaa, 3).mean(axis=(1, 3))
+        return (np.clip(img, 0.0, 1.0) * 255 + 0.5).astype(np.uint8)
+
+
+class Camera:
+    """Perspective camera looking from ``eye`` at ``center`` (Plotly scene units)."""
+
+    def __init__(self, eye=(1.25, 1.25, 1.25), center=(0.0, 0.0, 0.0), up=(0.0, 0.0, 1.0)):
+        self.eye = np.asarray(eye, dtype=float)
+        center = np.asarray(center, dtype=float)
+        forward = center - self.eye
+        forward /= np.linalg.norm(forward) or 1.0
+        up = np.asarray(up, dtype=float)
+        if np.linalg.norm(np.cross(forward, up)) < 1e-6:  # looking straight along "up"
+            up = np.array([0.0, 1.0, 0.0])
+        right = np.cross(forward, up)
+        right /= np.linalg.norm(right)
+        self.basis = np.stack([right, np.cross(right, forward), forward])
+
+    def project(self, points):
+        """Return (sx, sy, depth); screen y grows upwards."""
+        cam = (np.asarray(points) - self.eye) @ self.basis.T
+        depth = np.maximum(cam[:, 2], 1e-6)
+        return cam[:, 0] / depth, cam[:, 1] / depth, depth
+
+
+class Viewport:
+    """Fits projected coordinates into the canvas, preserving aspect ratio."""
+
+    def __init__(self, sx, sy, width, height, margin=0.06):
+        lo = np.array([np.nanmin(sx), np.nanmin(sy)])
+        hi = np.array([np.nanmax(sx), np.nanmax(sy)])
+        span = np.maximum(hi - lo, 1e-9)
+        self.scale = min(width * (1 - 2 * margin) / span[0], height * (1 - 2 * margin) / span[1])
+        self.offset = np.array([width, height]) / 2 - self.scale * (lo + hi) / 2
+        self.height = height
+
+    def __call__(self, sx, sy):
+        px = sx * self.scale + self.offset[0]
+        py = self.height - 1 - (sy * self.scale + self.offset[1])
+        return px, py
+
+
+# ----------------------------
+# Primitives
+# ----------------------------
+def _kernel(size):
+    r = max(int(size), 1)
+    off = np.arange(r) - (r - 1) / 2
+    dx, dy = np.meshgrid(off, off)
+    return dx.ravel(), dy.ravel()
+
+
+def draw_points(canvas, px, py, depth, colors, size=1, opacity=1.0):
+    """Square point sprites of ``size`` pixels."""
+    dx, dy = _kernel(size)
+    k = dx.size
+    canvas.splat((px[:, None] + dx).ravel(), (py[:, None] + dy).ravel(),
+                 np.repeat(depth, k), np.repeat(colors, k, axis=0), opacity)
+
+
+def draw_polyline(canvas, px, py, depth, colors, width=1, opacity=1.0):
+    """Connected line strip, sampled at roughly one fragment per pixel."""
+    if px.size < 2:
+        return draw_points(canvas, px, py, depth, colors, width, opacity)
+    length = np.hypot(np.diff(px), np.diff(py))
+    n = np.ceil(np.nan_to_num(length)).astype(np.int64) + 1
+    seg = np.repeat(np.arange(n.size), n)
+    start = np.cumsum(n) - n
+    t = (np.arange(seg.size) - start[seg]) / n[seg]
+    lerp = lambda a: a[seg] + (a[seg + 1] - a[seg]) * t  # noqa: E731
+    col = colors[seg] + (colors[seg + 1] - colors[seg]) * t[:, None]
+    draw_points(canvas, lerp(px), lerp(py), lerp(depth), col, width, opacity)
+
+
+def draw_triangles(canvas, px, py, depth, faces, colors, opacity=1.0):
+    """Fill triangles with barycentric interpolation of depth and colour.
+
+    Triangles are expanded to pixel rows and each row to its covered span in
+    ragged ``np.repeat`` expansions, so only covered pixels become fragments
+    (long slivers cost their area, not their bounding box). Work is batched
+    to roughly MAX_FRAGMENTS bounding-box pixels at a time.
+    """
+    x = px[faces]
+    y = py[faces]
+    den = (y[:, 1] - y[:, 2]) * (x[:, 0] - x[:, 2]) + (x[:, 2] - x[:, 1]) * (y[:, 0] - y[:, 2])
+    ylo = np.clip(np.ceil(y.min(axis=1)), 0, canvas.height - 1).astype(np.int64)
+    yhi = np.clip(np.floor(y.max(axis=1)), -1, canvas.height - 1).astype(np.int64)
+    on_screen = (x.max(axis=1) >= 0) & (x.min(axis=1) <= canvas.width - 1) & (yhi >= ylo)
+    valid = np.flatnonzero(on_screen & (np.abs(den) > 1e-12))
+    if valid.size == 0:
+        return
+    x, y, den, faces = x[valid], y[valid], den[valid], faces[valid]
+    ylo, yhi = ylo[valid], yhi[valid]
+
+    # Barycentric weights as affine functions of the pixel: l = a*qx + b*qy + c
+    a0, b0 = (y[:, 1] - y[:, 2]) / den, (x[:, 2] - x[:, 1]) / den
+    a1, b1 = (y[:, 2] - y[:, 0]) / den, (x[:, 0] - x[:, 2]) / den
+    coef = np.column_stack([a0, b0, -(a0 * x[:, 2] + b0 * y[:, 2]),
+                            a1, b1, -(a1 * x[:, 2] + b1 * y[:, 2])])
+
+    area = (yhi - ylo + 1) * (np.ceil(x.max(axis=1)) - np.floor(x.min(axis=1)) + 1)
+    cum = np.cumsum(area)
+    start = 0
+    while start < len(faces):
+        done = cum[start - 1] if start else 0
+        stop = max(int(np.searchsorted(cum, done + MAX_FRAGMENTS, side="right")), start + 1)
+        tri = np.arange(start, stop)
+        _fill_batch(canvas, tri, x, y, ylo, yhi, coef, depth, faces, colors, opacity)
+        start = stop
+
+
+def _fill_batch(canvas, tri, x, y, ylo, yhi, coef, depth, faces, colors, opacity):
+    # triangle -> pixel rows
+    rows = yhi[tri] - ylo[tri] + 1
+    rt = np.repeat(tri, rows)
+    qy = ylo[rt] + np.arange(rt.size) - np.repeat(np.cumsum(rows) - rows, rows)
+
+    # row -> covered span, from the crossings of the row with the three edges
+    xa, ya = x[rt], y[rt]
+    xb, yb = xa[:, [1, 2, 0]], ya[:, [1, 2, 0]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = (qy[:, None] - ya) / (yb - ya)
+    hit = (s >= 0) & (s <= 1)
+    xi = xa + s * (xb - xa)
+    xmin = np.ceil(np.where(hit, xi, np.inf).min(axis=1))
+    xmax = np.floor(np.where(hit, xi, -np.inf).max(axis=1))
+    xmin = np.clip(xmin, 0, canvas.width).astype(np.int64)
+    xmax = np.clip(xmax, -1, canvas.width - 1).astype(np.int64)
+    span = np.maximum(xmax - xmin + 1, 0)
+
+    # span -> pixels
+    pr = np.repeat(np.arange(rt.size), span)
+    qx = xmin[pr] + np.arange(pr.size) - np.repeat(np.cumsum(span) - span, span)
+    qy = qy[pr]
+    t = rt[pr]
+    c = coef[t]
+    l0 = (c[:, 0] * qx + c[:, 1] * qy + c[:, 2])[:, None]
+    l1 = (c[:, 3] * qx + c[:, 4] * qy + c[:, 5])[:, None]
+    l2 = 1.0 - l0 - l1
+    f = faces[t]
+    d = (l0 * depth[f[:, :1]] + l1 * depth[f[:, 1:2]] + l2 * depth[f[:, 2:]]).ravel()
+    col = l0 * colors[f[:, 0]] + l1 * colors[f[:, 1]] + l2 * colors[f[:, 2]]
+    canvas.splat(qx, qy, d, col, opacity)
+
+
+# ----------------------------
+# PNG
+# ----------------------------
+def encode_png(img, level=6):
+    """Encode an (h, w, 3) uint8 image as PNG bytes using only zlib."""
+    h, w, _ = img.shape
+    raw = np.zeros((h, 1 + 3 * w), dtype=np.uint8)  # filter byte 0 per row
+    raw[:, 1:] = img.reshape(h, -1)
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), level))
+            + chunk(b"IEND", b""))
+
+
+def write_png(path, img, level=6):
+    with open(path, "wb") as fh:
+        fh.write(encode_png(img, level))
+
+
+# ----------------------------
+# Plotly figures
+# ----------------------------
+def _array(value):
+    """Decode Plotly typed-array JSON ({dtype, bdata, shape}) or pass arrays through."""
+    if isinstance(value, dict) and "bdata" in value:
+        arr = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+        if "shape" in value:
+            arr = arr.reshape([int(s) for s in str(value["shape"]).split(",")])
+        return arr
+    return np.asarray(value)
+
+
+def figure_dict(fig):
+    """Accept a go.Figure, its JSON string or an already-parsed dict."""
+    if hasattr(fig, "to_plotly_json"):
+        return fig.to_plotly_json()
+    if isinstance(fig, (str, bytes)):
+        import json
+        return json.loads(fig)
+    return fig
+
+
+def _get(d, *keys, default=None):
+    for k in keys:
+        if not isinstance(d, dict) or d.get(k) is None:
+            return default
+        d = d[k]
+    return d
+
+
+def _background(layout, is_3d):
+    template = _get(layout, "template", "layout", default={})
+    keys = (["scene", "bgcolor"],) if is_3d else (["plot_bgcolor"],)
+    for path in keys + (["paper_bgcolor"],):
+        color = _get(layout, *path) or _get(template, *path)
+        if color:
+            return color
+    return DEFAULT_BACKGROUND
+
+
+def _scene_transform(points, scene):
+    """Centre the data and scale each axis like Plotly's ``aspectmode``."""
+    lo, hi = np.nanmin(points, axis=0), np.nanmax(points, axis=0)
+    span = np.maximum(hi - lo, 1e-12)
+    mode = scene.get("aspectmode", "auto")
+    if mode == "cube":
+        scale = 2.0 / span
+    elif mode == "manual" and scene.get("aspectratio"):
+        ratio = np.array([scene["aspectratio"].get(k, 1.0) for k in "xyz"])
+        scale = 2.0 * ratio / span
+    else:
+        scale = np.full(3, 2.0 / span.max())
+        if mode == "auto" and span.max() > 4 * span.min():
+            scale = 2.0 / span
+    center = (lo + hi) / 2
+    return lambda p: (p - center) * scale
+
+
+def _trace_geometry(trace):
+    """Return (kind, points, faces) for the trace types the rasteriser supports."""
+    kind = trace.get("type", "scatter")
+    if kind in ("scatter3d", "scatter", "scattergl"):
+        x, y = _array(trace["x"]).astype(float), _array(trace["y"]).astype(float)
+        z = _array(trace["z"]).astype(float) if "z" in trace else np.zeros_like(x)
+        return kind, np.column_stack([x.ravel(), y.ravel(), z.ravel()]), None
+    if kind == "surface":
+        z = _array(trace["z"]).astype(float)
+        x = _array(trace["x"]).astype(float) if "x" in trace else np.arange(z.shape[1], dtype=float)
+        y = _array(trace["y"]).astype(float) if "y" in trace else np.arange(z.shape[0], dtype=float)
+        if x.ndim == 1 and y.ndim == 1:
+            x, y = np.meshgrid(x, y)
+        x, y = np.broadcast_to(x, z.shape), np.broadcast_to(y, z.shape)
+        return kind, np.column_stack([x.ravel(), y.ravel(), z.ravel()]), grid_faces(*z.shape)
+    if kind == "mesh3d":
+        pts = np.column_stack([_array(trace[k]).astype(float).ravel() for k in "xyz"])
+        faces = np.column_stack([_array(trace[k]).astype(np.int64).ravel() for k in "ijk"])
+        return kind, pts, faces
+    return kind, None, None
+
+
+def _draw_trace(canvas, trace, kind, px, py, depth, faces, normals, view_dir, scale):
+    opacity = float(trace.get("opacity", 1.0))
+    n = px.size
+    if faces is not None:
+        values = _array(trace.get("surfacecolor", trace.get("intensity", _array(trace.get("z")).ravel())))
+        base = resolve_colors(values.ravel(), n, trace.get("colorscale"), trace.get("cmin"), trace.get("cmax"))
+        if kind == "mesh3d" and isinstance(trace.get("color"), str):
+            base = resolve_colors(trace["color"], n)
+        light = _get(trace, "lighting", default={})
+        shade = float(light.get("ambient", 0.6)) + float(light.get("diffuse", 0.8)) * np.abs(normals @ view_dir)
+        draw_triangles(canvas, px, py, depth, faces, base * np.clip(shade, 0, 1.2)[:, None], opacity)
+        return
+    mode = trace.get("mode", "lines" if kind == "scatter3d" else "markers")
+    if "lines" in mode:
+        line = trace.get("line", {})
+        colors = resolve_colors(line.get("color"), n, line.get("colorscale"), default="#636efa")
+        width = max(1, round(float(line.get("width", 2)) * scale))
+        draw_polyline(canvas, px, py, depth, colors, width, opacity)
+    if "markers" in mode:
+        marker = trace.get("marker", {})
+        colors = resolve_colors(marker.get("color"), n, marker.get("colorscale"),
+                                marker.get("cmin"), marker.get("cmax"), default="#636efa")
+        size = np.mean(_array(marker.get("size", 6)))
+        draw_points(canvas, px, py, depth, colors, max(1, round(size * scale)),
+                    opacity * float(marker.get("opacity", 1.0)))
+
+
+def render_figure(fig, width=300, height=200, ssaa=2, camera=None):
+    """Rasterise a Plotly figure (scatter, scatter3d, surface, mesh3d) to uint8 RGB.
+
+    Unsupported trace types are skipped. ``camera`` overrides
+    ``layout.scene.camera`` (as used by rotation frames).
+    """
+    d = figure_dict(fig)
+    layout = d.get("layout", {}) or {}
+    geoms = [(t, *_trace_geometry(t)) for t in d.get("data", [])]
+    geoms = [g for g in geoms if g[2] is not None and len(g[2])]
+    is_3d = any(kind != "scatter" and kind != "scattergl" for _, kind, _, _ in geoms)
+    W, H = width * ssaa, height * ssaa
+    canvas = Canvas(W, H, _background(layout, is_3d))
+    if not geoms:
+        return canvas.to_uint8(ssaa)
+
+    scene = layout.get("scene", {}) or {}
+    if is_3d:
+        to_scene = _scene_transform(np.concatenate([g[2] for g in geoms]), scene)
+        cam = camera or scene.get("camera", {}) or {}
+        eye = cam.get("eye", {}) or {}
+        up = cam.get("up", {}) or {}
+        view = Camera(eye=[float(eye.get(k, 1.25)) for k in "xyz"],
+                      up=[float(up.get(k, 1.0 if k == "z" else 0.0)) for k in "xyz"])
+        projected = [view.project(to_scene(pts)) for _, _, pts, _ in geoms]
+        view_dir = -view.basis[2]
+    else:
+        # Later traces are drawn on top, as in Plotly
+        projected = [(pts[:, 0], pts[:, 1], np.full(len(pts), -float(i))) for i, (_, _, pts, _) in enumerate(geoms)]
+        view_dir = np.array([0.0, 0.0, 1.0])
+
+    fit = Viewport(np.concatenate([p[0] for p in projected]), np.concatenate([p[1] for p in projected]), W, H)
+    scale = ssaa * width / 700.0  # line widths / marker sizes are in ~700px-figure pixels
+    for (trace, kind, pts, faces), (sx, sy, depth) in zip(geoms, projected):
+        px, py = fit(sx, sy)
+        normals = vertex_normals(pts, faces) if faces is not None else None
+        _draw_trace(canvas, trace, kind, px, py, depth, faces, normals, view_dir, scale)
+    return canvas.to_uint8(ssaa)
+
+
+def _merge(base, update):
+    out = dict(base)
+    for k, v in (update or {}).items():
+        out[k] = _merge(out[k], v) if isinstance(v, dict) and isinstance(out.get(k), dict) else v
+    return out
+
+
+def iter_frames(fig):
+    """Yield (name, figure dict) for each animation frame, merged onto the base figure."""
+    d = figure_dict(fig)
+    for i, frame in enumerate(d.get("frames", []) or []):
+        data = list(d.get("data", []))
+        for j, trace in enumerate(frame.get("data", []) or []):
+            if j < len(data):
+                data[j] = _merge(data[j], trace)
+        layout = _merge(d.get("layout", {}) or {}, frame.get("layout"))
+        yield frame.get("name", str(i)), {"data": data, "layout": layout}
@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PageSpec:
+    """A gallery page. Only metadata lives here — the page script itself is
+    not imported or executed until the user opens it."""
+    path: str
+    title: str
+    icon: str = "🔧"
+    featured: str | None = None      # landing-page link label, if featured
+    thumbnail: str | None = None     # landing-page preview image
+
+
+PAGES = [
+    PageSpec("pages/lorenz.py", "Lorenz Attractor",
+             featured="🌀 Chaos & Attractors", thumbnail="lorenz_thumb.png"),
+    PageSpec("pages/rossler.py", "Rossler Attractor"),
+    PageSpec("pages/klein.py", "Klein Bottle"),
+    PageSpec("pages/snowflake.py", "Snowflake Generator",
+             featured="❄️ Symmetry & Snowflakes", thumbnail="snowflake_thumb.png"),
+    PageSpec("pages/snowflake_parametric.py", "3D Surface"),
+    PageSpec("pages/wireframe.py", "Wireframe"),
+    PageSpec("pages/bernouilli_function.py", "Bernouilli Polynomials"),
+    PageSpec("pages/spiral.py", "Archimedes Spiral"),
+    PageSpec("pages/surface_trefoil.py", "Trefoil Knot"),
+    PageSpec("pages/helical_cylinder.py", "Helical Cylinder"),
+    PageSpec("pages/fern.py", "Barnsley Fern",
+             featured="🌿 Fractals & Nature", thumbnail="fern_thumb.png"),
+]
+
+
+def featured_pages():
+    return [p for p in PAGES if p.featured]
+
+
+def get_page(stem):
+    """Look a page up by its file stem, e.g. ``"lorenz"``."""
+    for p in PAGES:
+        if p.path.rsplit("/", 1)[-1][:-3] == stem:
+            return p
+    raise KeyError(stem)
+
+
+def navigation(home):
+    """Sections for ``st.navigation``; ``home`` renders the landing page."""
+    import streamlit as st
+    return {
+        "Gallery": [st.Page(home, title="Gallery", icon="🌌", default=True)],
+        "Visualisations": [st.Page(p.path, title=p.title, icon=p.icon) for p in PAGES],
+    }
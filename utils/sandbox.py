@@ -0,0 +1,222 @@
+"""Run untrusted computations in resource-limited worker processes.
+
+A ``Sandbox`` keeps a few spawned workers alive and reuses them, so a call
+costs one round trip over a pipe. Each worker caps its address space with
+``RLIMIT_AS`` (on top of what it uses after importing NumPy) and the caller
+kills it if a call outlives the wall-clock timeout; a killed, crashed or
+out-of-memory worker is replaced, and every worker is recycled after
+``max_calls`` calls. Violations raise ``SandboxError``, a ``ValueError``
+whose ``kind`` says what happened: ``invalid`` when the function raised
+ValueError (rejected input), ``runtime`` when it raised anything else, or
+a broken limit::
+
+    from utils.sandbox import sandboxed
+
+    safe_surface = sandboxed(function_surface)
+    try:
+        X, Y, Z = safe_surface(expr, 3.0, 3.0, 40)
+    except SandboxError as e:
+        ...  # e.kind in SandboxError.KINDS
+
+``sandboxed`` keeps the wrapped function's identity for ``disk_cache`` keys.
+Limits can be overridden with ``MATHSVIS_SANDBOX_TIMEOUT`` (seconds) and
+``MATHSVIS_SANDBOX_MEMORY`` (bytes).
+"""
+import functools
+import json
+import os
+import secrets
+import subprocess
+import sys
+import threading
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: timeouts only
+    resource = None
+
+ROOT = Path(__file__).resolve().parents[1]
+
+TIMEOUT_S = float(os.environ.get("MATHSVIS_SANDBOX_TIMEOUT", 2.0))
+MEMORY_BYTES = int(os.environ.get("MATHSVIS_SANDBOX_MEMORY", 512 << 20))
+WORKERS = 2
+MAX_CALLS = 200
+
+
+class SandboxError(ValueError):
+    """A sandboxed call was rejected, failed or broke a limit."""
+
+    KINDS = ("invalid", "runtime", "timeout", "memory", "crashed")
+
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+
+def _address_space():
+    """Current virtual memory size in bytes (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _limit(memory_bytes):
+    # One thread per worker: BLAS thread pools would reserve address space.
+    for var in ("OPENBLAS_NUM_THREADS", "OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = "1"
+    import numpy  # noqa: F401  (imported before the limit applies)
+    if resource is not None and memory_bytes:
+        limit = _address_space() + memory_bytes
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _serve(conn, memory_bytes):
+    """Worker loop: ``(func, args, kwargs)`` in, ``(status, value)`` out."""
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        func, args, kwargs = task
+        try:
+            conn.send(("ok", func(*args, **kwargs)))
+        except MemoryError:
+            conn.send(("memory", f"needs more than {memory_bytes / 2**20:.0f} MB"))
+        except ValueError as e:
+            conn.send(("invalid", str(e)))
+        except Exception as e:
+            cause = e.__cause__ or e  # wrappers such as ExpressionError keep the original
+            conn.send(("runtime", f"{type(cause).__name__}: {cause}"))
+
+
+class _Worker:
+    """A ``python -m utils.sandbox`` process and a connection to it.
+
+    Workers are plain subprocesses rather than ``multiprocessing`` children:
+    Streamlit installs each page script as ``__main__``, which a spawned
+    child would re-run.
+    """
+
+    def __init__(self, memory_bytes):
+        authkey = secrets.token_bytes(16)
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "utils.sandbox", str(memory_bytes)], cwd=ROOT,
+            env={**os.environ, "MATHSVIS_SANDBOX_KEY": authkey.hex()}, stdout=subprocess.PIPE, text=True)
+        with self.process.stdout:
+            line = self.process.stdout.readline()  # the worker's address, or EOF if it died
+        if not line:
+            self.process.wait()
+            raise SandboxError("crashed", "sandbox worker failed to start")
+        self.conn = Client(json.loads(line), authkey=authkey)
+        self.calls = 0
+
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.conn.close()
+
+
+class Sandbox:
+    """A small pool of reusable, resource-limited worker processes."""
+
+    def __init__(self, workers=WORKERS, timeout=TIMEOUT_S, memory_bytes=MEMORY_BYTES, max_calls=MAX_CALLS):
+        self.timeout = timeout
+        self.memory_bytes = memory_bytes
+        self.max_calls = max_calls
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers)
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _Worker(self.memory_bytes)
+
+    def _checkin(self, worker):
+        worker.calls += 1
+        if worker.calls >= self.max_calls:
+            worker.stop()
+            return
+        with self._lock:
+            self._idle.append(worker)
+
+    def call(self, func, *args, **kwargs):
+        """``func(*args, **kwargs)`` in a worker; ``func`` and its arguments
+        must be picklable (module-level functions, plain data)."""
+        with self._slots:
+            worker = self._checkout()
+            try:
+                worker.conn.send((func, args, kwargs))
+                if not worker.conn.poll(self.timeout):
+                    worker.kill()
+                    raise SandboxError("timeout", f"took longer than {self.timeout:g} s")
+                status, value = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                worker.kill()
+                raise SandboxError("crashed", f"worker died ({type(e).__name__})") from e
+            if status == "memory":
+                worker.kill()  # its heap may be left fragmented; start afresh
+            else:
+                self._checkin(worker)
+        if status != "ok":
+            raise SandboxError(status, value)
+        return value
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+
+@functools.lru_cache(maxsize=1)
+def default_sandbox():
+    return Sandbox()
+
+
+def sandboxed(func):
+    """Run calls to ``func`` in the shared default ``Sandbox``."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return default_sandbox().call(func, *args, **kwargs)
+    return wrapper
+
+
+def main(argv=None):
+    """Worker entry point: apply the limits, then serve one connection."""
+    argv = sys.argv[1:] if argv is None else argv
+    memory_bytes = int(argv[0]) if argv else MEMORY_BYTES
+    _limit(memory_bytes)
+    authkey = bytes.fromhex(os.environ.pop("MATHSVIS_SANDBOX_KEY"))
+    with Listener(authkey=authkey) as listener:
+        print(json.dumps(listener.address), flush=True)
+        sys.stdout = sys.stderr
+        with listener.accept() as conn:
+            _serve(conn, memory_bytes)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Import-time profiler and cold-start budget check for the gallery.
+
+Each script is run once through Streamlit's in-process ``AppTest`` in a fresh
+interpreter started with ``-X importtime``. Streamlit itself is imported
+(and warmed up) first, as the server would have done, so the report covers
+only what the script adds: the modules it imports and the time its first
+run takes.
+
+    python -m utils.startup                     # landing page, checked against the budget
+    python -m utils.startup --pages             # also report every registered page
+    python -m utils.startup --budget-ms 300
+
+Exits with status 1 if the landing page's cold start exceeds the budget.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cold-start budget for streamlit_app.py (imports + first run), in ms
+LANDING_BUDGET_MS = 250
+
+MARK = "@@startup-profile"
+
+_PROBE = """
+import sys, time, json
+from streamlit.testing.v1 import AppTest
+AppTest.from_string("import streamlit as st; st.write('warm')").run()
+sys.stderr.write({mark!r} + "\\n")
+t0 = time.perf_counter()
+at = AppTest.from_file({script!r}, default_timeout=300).run()
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"elapsed_ms": elapsed * 1000, "errors": [str(e.value) for e in at.exception]}}))
+"""
+
+
+def profile_script(script):
+    """Cold-run ``script`` in a fresh interpreter; return timings and per-module costs."""
+    # Cache warm-up runs off the script thread; keep its imports out of the report.
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(mark=MARK, script=str(script))],
+        cwd=ROOT, capture_output=True, text=True, timeout=600, env={**os.environ, "MATHSVIS_WARMUP": ""},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "probe failed")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    modules = []
+    after_mark = False
+    for line in proc.stderr.splitlines():
+        if line.strip() == MARK:
+            after_mark = True
+        elif after_mark and line.startswith("import time:") and "|" in line:
+            _, self_us, cum_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+            if self_us.isdigit():
+                modules.append((name, int(self_us) / 1000, int(cum_us) / 1000))
+    result["modules"] = modules
+    result["import_ms"] = sum(m[1] for m in modules)
+    return result
+
+
+def by_package(modules):
+    """Aggregate self time by top-level package (``numpy``, ``plotly``, ``utils.export`` ...)."""
+    totals = defaultdict(float)
+    for name, self_ms, _ in modules:
+        parts = name.split(".")
+        totals[".".join(parts[:2]) if parts[0] == "utils" else parts[0]] += self_ms
+    return sorted(totals.items(), key=lambda kv: -kv[1])
+
+
+def report(label, result, top=8):
+    print(f"\n{label}: {result['elapsed_ms']:.0f} ms cold start "
+          f"({result['import_ms']:.0f} ms imports, {len(result['modules'])} modules)")
+    for pkg, ms in by_package(result["modules"])[:top]:
+        print(f"    {ms:8.1f} ms  {pkg}")
+    for err in result["errors"]:
+        print(f"    ⚠️ {err}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=LANDING_BUDGET_MS,
+                        help=f"landing-page cold-start budget (default {LANDING_BUDGET_MS})")
+    parser.add_argument("--pages", action="store_true", help="also profile every registered page")
+    parser.add_argument("--top", type=int, default=8, help="packages listed per script")
+    args = parser.parse_args(argv)
+
+    landing = profile_script(ROOT / "streamlit_app.py")
+    report("streamlit_app.py", landing, args.top)
+
+    if args.pages:
+        from utils.registry import PAGES
+        for page in PAGES:
+            report(page.path, profile_script(ROOT / page.path), args.top)
+
+    ok = landing["elapsed_ms"] <= args.budget_ms and not landing["errors"]
+    print(f"\n{'✅' if ok else '❌'} landing page {landing['elapsed_ms']:.0f} ms "
+          f"(budget {args.budget_ms:.0f} ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(ROOT))
+    sys.exit(main())
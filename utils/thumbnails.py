@@ -0,0 +1,95 @@
+"""Regenerate page thumbnails (and animation frames) headlessly.
+
+Each page is executed with Streamlit's in-process ``AppTest`` runner, its
+first Plotly chart is captured and rasterised by ``utils.raster`` — no
+browser, Kaleido or network involved.
+
+    python -m utils.thumbnails                      # every page -> <page>_thumb.png
+    python -m utils.thumbnails lorenz fern --out /tmp/thumbs
+    python -m utils.thumbnails --frames             # also frames/<page>/frame_0000.png
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Toggles switched on before capturing frames (labels contain one of these)
+ANIMATION_TOGGLES = ("Animate", "Auto-rotate")
+
+
+def page_files(names=None):
+    from utils.registry import PAGES
+    files = [ROOT / p.path for p in PAGES]
+    if names:
+        files = [f for f in files if f.stem in names]
+    return files
+
+
+def capture_figure(page, animate=False, timeout=120):
+    """Run a page script headlessly and return its first chart as a figure dict."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(page), default_timeout=timeout).run()
+    if animate:
+        toggles = [t for t in at.toggle if any(s in t.label for s in ANIMATION_TOGGLES)]
+        for t in toggles:
+            t.set_value(True)
+        if toggles:
+            at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    charts = at.get("plotly_chart")
+    if not charts:
+        return None
+    return json.loads(charts[0].proto.spec)
+
+
+def main(argv=None):
+    from utils.raster import iter_frames, render_figure, write_png
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="page stems to render (default: all)")
+    parser.add_argument("--out", type=Path, default=ROOT, help="output directory (default: repo root)")
+    parser.add_argument("--width", type=int, default=300)
+    parser.add_argument("--height", type=int, default=200)
+    parser.add_argument("--ssaa", type=int, default=2, help="supersampling factor")
+    parser.add_argument("--frames", action="store_true", help="also render animation frames")
+    args = parser.parse_args(argv)
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    n_images, t_render = 0, 0.0
+    for page in page_files(args.pages):
+        try:
+            fig = capture_figure(page)
+            # Thumbnails show the static view; frames come from the animated one
+            anim = capture_figure(page, animate=True) if args.frames else None
+        except Exception as e:
+            print(f"✗ {page.stem}: {type(e).__name__}: {e}", file=sys.stderr)
+            continue
+        if fig is None:
+            print(f"- {page.stem}: no chart")
+            continue
+
+        t0 = time.perf_counter()
+        write_png(args.out / f"{page.stem}_thumb.png", render_figure(fig, args.width, args.height, args.ssaa))
+        n = 1
+        if args.frames and anim:
+            frame_dir = args.out / "frames" / page.stem
+            for i, (_, frame) in enumerate(iter_frames(anim)):
+                frame_dir.mkdir(parents=True, exist_ok=True)
+                write_png(frame_dir / f"frame_{i:04d}.png", render_figure(frame, args.width, args.height, args.ssaa))
+                n += 1
+        dt = time.perf_counter() - t0
+        n_images, t_render = n_images + n, t_render + dt
+        print(f"✓ {page.stem}: {n} image(s) in {dt:.2f}s")
+
+    if n_images:
+        print(f"{n_images} images, {60 * n_images / t_render:.0f} images/min (render only)")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(ROOT))
+    main()
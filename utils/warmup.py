@@ -0,0 +1,271 @@
+"""Background warm-up of the views first visitors see.
+
+After a deploy every cache is cold, so the first visitor to each page would
+pay its full compute. ``start_warmup`` (called by ``streamlit_app.py``)
+starts one daemon thread per server process that computes each cached
+page's default parameter set, plus any popular sets listed in
+``warmup.json``, through the same cache the page reads:
+
+* fern, snowflake, klein and wireframe -> ``utils.array_cache.disk_cache``
+  (shared with every process on the machine)
+* lorenz and rossler -> the in-process ``compute.trajectories.shared_store()``
+
+The first job imports Plotly and draws a throwaway figure, which every
+page benefits from. Disk-cached jobs run in a low-priority worker process
+and the rest on a background thread, so nothing delays the script thread
+and the server is ready as before; progress shows in the sidebar and
+per-job timings in the ``?debug=1`` expander. The disk-cached jobs can also
+run before the server starts, e.g. in a deploy step::
+
+    python -m utils.warmup
+
+``warmup.json`` maps a page stem to a list of parameter overrides::
+
+    {"klein": [{"immersion": "Figure-8", "twist": 0.5}]}
+
+``MATHSVIS_WARMUP`` points at another file; an empty value disables warm-up.
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import streamlit as st
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CONFIG_PATH = os.environ.get("MATHSVIS_WARMUP", str(ROOT / "warmup.json"))
+
+# page stem -> (kernel in compute.kernels, cache the page reads it through)
+CACHED_PAGES = {
+    "lorenz": ("lorenz", "trajectory"),
+    "rossler": ("rossler", "trajectory"),
+    "klein": ("klein", "disk"),
+    "snowflake": ("snowflake", "disk"),
+    "fern": ("fern", "disk"),
+    "wireframe": ("surface", "disk"),
+}
+
+# Pages that draw coarse-to-fine: parameter -> first size, as passed to ``refine``
+REFINED = {
+    "wireframe": ("resolution", 20),
+}
+
+
+@dataclass(frozen=True)
+class WarmupJob:
+    """One parameter set of one page; ``overrides`` apply on top of the
+    kernel defaults, which are the page's own."""
+    page: str
+    overrides: dict = field(default_factory=dict)
+
+    @property
+    def label(self):
+        if self.page not in CACHED_PAGES:
+            return self.page
+        if not self.overrides:
+            return f"{self.page} (defaults)"
+        return f"{self.page} ({', '.join(f'{k}={v}' for k, v in self.overrides.items())})"
+
+    @property
+    def shared(self):
+        """Whether the result lands in a cache other processes can read."""
+        return CACHED_PAGES.get(self.page, (None, None))[1] == "disk"
+
+
+def _like(value, default):
+    # JSON has one number type; cache keys distinguish 10 from 10.0
+    if isinstance(default, float) and isinstance(value, int):
+        return float(value)
+    return value
+
+
+def _params(defaults, overrides):
+    unknown = set(overrides) - set(defaults)
+    if unknown:
+        raise ValueError(f"unknown parameter(s) {', '.join(sorted(unknown))}")
+    return {**defaults, **{k: _like(v, defaults[k]) for k, v in overrides.items()}}
+
+
+def load_jobs(path=CONFIG_PATH):
+    """Imports first, then every cached page's defaults, then popular sets."""
+    popular = {}
+    if path and Path(path).exists():
+        popular = json.loads(Path(path).read_text())
+    unknown = set(popular) - set(CACHED_PAGES)
+    if unknown:
+        raise ValueError(f"{path}: no cached page named {', '.join(sorted(unknown))}")
+    jobs = [WarmupJob("imports")]
+    jobs += [WarmupJob(page) for page in CACHED_PAGES]
+    jobs += [WarmupJob(page, overrides) for page, sets in popular.items() for overrides in sets]
+    return jobs
+
+
+def _warm_imports():
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    import compute.kernels  # noqa: F401  (numpy and every compute module)
+    from utils.plotting import apply_plotly_template
+
+    # The first figure loads the template and validators, the first
+    # serialisation the JSON encoder.
+    fig = apply_plotly_template(go.Figure(go.Scatter(x=[0, 1], y=[0, 1])))
+    pio.to_json(fig, validate=False)
+
+
+def run_job(job):
+    """Compute ``job`` into the cache its page reads."""
+    if job.page == "imports":
+        return _warm_imports()
+    from compute.kernels import KERNELS
+
+    name, cache = CACHED_PAGES[job.page]
+    kernel = KERNELS[name]
+    params = _params(kernel.defaults, job.overrides)
+    if cache == "trajectory":
+        from compute.trajectories import shared_store
+        # The same per-process store the Lorenz and Rössler pages use
+        return shared_store().cached(kernel.func)(**params)
+
+    from utils.array_cache import disk_cache
+    from utils.progressive import coarse_to_fine
+    cached = disk_cache(kernel.func)
+    calls = [params]
+    if job.page in REFINED:
+        size, first = REFINED[job.page]
+        calls = [{**params, size: n} for n in coarse_to_fine(params[size], first)]
+    for call in calls:
+        cached(**call)
+
+
+class Warmup:
+    """Runs jobs in order, recording status and timings.
+
+    ``start`` runs the in-process jobs on a daemon thread and hands the
+    shared ones to a low-priority worker process, so pure-Python kernels
+    (the snowflake takes seconds) never compete with sessions for the GIL.
+    """
+
+    def __init__(self, jobs, config=CONFIG_PATH):
+        self.jobs = jobs
+        self.config = config
+        self.status = {job.label: "pending" for job in jobs}
+        self.seconds = {}
+        self.errors = {}
+        self.started = None
+        self.finished = None
+
+    @property
+    def done(self):
+        return sum(s in ("done", "failed") for s in self.status.values())
+
+    @property
+    def running(self):
+        return self.started is not None and self.finished is None
+
+    def record(self, label, status, seconds, error=None):
+        self.status[label] = status
+        self.seconds[label] = seconds
+        if error:
+            self.errors[label] = error
+
+    def run_one(self, job):
+        self.status[job.label] = "running"
+        t0 = time.perf_counter()
+        try:
+            run_job(job)
+        except Exception as exc:  # a broken popular set must not stop the rest
+            self.record(job.label, "failed", time.perf_counter() - t0, f"{type(exc).__name__}: {exc}")
+        else:
+            self.record(job.label, "done", time.perf_counter() - t0)
+        return job.label
+
+    def run(self, worker=True):
+        """Run every job; with ``worker``, shared ones in a separate process."""
+        self.started = time.time()
+        shared = [job for job in self.jobs if job.shared] if worker else []
+        proc = None
+        if shared:
+            proc = subprocess.Popen([sys.executable, "-m", "utils.warmup", "--worker", "--config", self.config],
+                                    cwd=ROOT, stdout=subprocess.PIPE, text=True)
+        for job in self.jobs:
+            if job not in shared:
+                self.run_one(job)
+        if proc is not None:
+            for line in proc.stdout:
+                self.record(**json.loads(line))
+            returncode = proc.wait()
+            for job in shared:
+                if self.status[job.label] == "pending":
+                    self.record(job.label, "failed", 0.0, f"worker exited with status {returncode}")
+        self.finished = time.time()
+        return self
+
+    def start(self):
+        threading.Thread(target=self.run, name="mathsvis-warmup", daemon=True).start()
+        return self
+
+
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    """Start warming this server process's caches (once); None if disabled."""
+    if not CONFIG_PATH:
+        return None
+    return Warmup(load_jobs()).start()
+
+
+def render_status(warmup):
+    """Sidebar progress while warming; per-job timings in debug mode."""
+    if warmup is None:
+        return
+    from utils.instrument import debug_enabled
+    total = len(warmup.jobs)
+    if warmup.running:
+        st.sidebar.caption(f"🔥 Warming caches… {warmup.done}/{total}")
+    if not debug_enabled():
+        return
+    elapsed = (warmup.finished or time.time()) - (warmup.started or time.time())
+    with st.sidebar.expander(f"🔥 Warm-up — {warmup.done}/{total} in {elapsed:.1f} s", expanded=False):
+        # A markdown table: st.dataframe would import pandas while the
+        # warm-up thread may be importing its dependents.
+        rows = ["| job | status | ms |", "|---|---|---:|"]
+        for label, status in warmup.status.items():
+            ms = f"{warmup.seconds[label] * 1000:.0f}" if label in warmup.seconds else ""
+            rows.append(f"| {label} | {status} | {ms} |")
+        st.markdown("\n".join(rows))
+        for label, error in warmup.errors.items():
+            st.caption(f"⚠️ {label}: {error}")
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Warm the on-disk cache with each page's default views.")
+    parser.add_argument("--config", default=CONFIG_PATH, help="popular parameter sets (default: warmup.json)")
+    parser.add_argument("--worker", action="store_true",
+                        help="run at low priority and report each job as a JSON line (used by the server)")
+    args = parser.parse_args(argv)
+    warmup = Warmup([job for job in load_jobs(args.config) if job.shared], args.config)
+    if args.worker:
+        if hasattr(os, "nice"):
+            os.nice(10)
+        for job in warmup.jobs:
+            label = warmup.run_one(job)
+            print(json.dumps({"label": label, "status": warmup.status[label], "seconds": warmup.seconds[label],
+                              "error": warmup.errors.get(label)}), flush=True)
+        return 0
+    warmup.run(worker=False)
+    for label, status in warmup.status.items():
+        error = f"  {warmup.errors[label]}" if label in warmup.errors else ""
+        print(f"  {label:48s} {status:7s} {warmup.seconds[label] * 1000:9.1f} ms{error}")
+    warmed = sum(status == "done" for status in warmup.status.values())
+    print(f"warmed {warmed} of {len(warmup.jobs)} in {warmup.finished - warmup.started:.2f}s")
+    return 1 if warmup.errors else 0
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(ROOT))
+    sys.exit(main())